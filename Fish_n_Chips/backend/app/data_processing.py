@@ -1,9 +1,12 @@
-import mne
 import numpy as np
-import pandas as pd
 import io
+from typing import List, Union
 from fastapi import HTTPException
 
+from .edf_reader import EDF_ANNOTATIONS_LABEL, read_edf_header, read_edf_signals
+from .metrics import stage_timer, timed
+from .resampling import resample
+
 REQUIRED_CHANNELS = [
     'Fp1', 'Fp2', 'F7', 'F3', 'Fz', 'F4', 'F8', 'T3',
     'C3', 'Cz', 'C4', 'T4', 'T5', 'P3', 'Pz', 'P4'
@@ -11,73 +14,91 @@ REQUIRED_CHANNELS = [
 
 TARGET_SFREQ = 256
 
-def parse_edf(file_content: bytes) -> np.ndarray:
+def match_channels(available_channels: List[str]) -> List[int]:
     """
-    Parses an EDF file content and returns a 2D numpy array [samples, channels].
+    Resolves REQUIRED_CHANNELS against the channel labels of a recording.
+
+    Returns the index of each required channel in training order.
     """
-    try:
-        # MNE reads from a file path, so we need to write to a temp file or use a BytesIO wrapper if supported.
-        # MNE's read_raw_edf strictly requires a filename.
-        # We will write to a temp file.
-        import tempfile
-        import os
-
-        with tempfile.NamedTemporaryFile(suffix=".edf", delete=False) as tmp:
-            tmp.write(file_content)
-            tmp_path = tmp.name
-
-        try:
-            raw = mne.io.read_raw_edf(tmp_path, preload=True, verbose=False)
-        finally:
-            os.remove(tmp_path)
-
-        # Pick channels
-        # MNE channel names might be case sensitive or have extra labels (e.g. "EEG Fp1-REF")
-        # We need a robust matching strategy.
-        available_channels = raw.ch_names
-        picked_channels = []
-
-        for req_ch in REQUIRED_CHANNELS:
-            # Try exact match
-            if req_ch in available_channels:
-                picked_channels.append(req_ch)
-                continue
-
-            # Try case-insensitive or substring match
-            # This is a heuristic; might need refinement based on actual data
-            match = None
-            for av_ch in available_channels:
-                if req_ch.lower() in av_ch.lower():
-                    match = av_ch
-                    break
-
-            if match:
-                picked_channels.append(match)
-            else:
-                raise HTTPException(status_code=400, detail=f"Missing required channel: {req_ch}")
+    # Channel names might be case sensitive or have extra labels (e.g. "EEG Fp1-REF")
+    # We need a robust matching strategy.
+    picked = []
+
+    for req_ch in REQUIRED_CHANNELS:
+        # Try exact match
+        if req_ch in available_channels:
+            picked.append(available_channels.index(req_ch))
+            continue
+
+        # Try case-insensitive or substring match
+        # This is a heuristic; might need refinement based on actual data
+        match = None
+        for i, av_ch in enumerate(available_channels):
+            if req_ch.lower() in av_ch.lower():
+                match = i
+                break
+
+        if match is not None:
+            picked.append(match)
+        else:
+            raise HTTPException(status_code=400, detail=f"Missing required channel: {req_ch}")
+
+    return picked
+
+def resample_to_target(data: np.ndarray, sfreq: float) -> np.ndarray:
+    """
+    Resamples [..., samples] from sfreq to TARGET_SFREQ along the last axis.
 
-        raw.pick_channels(picked_channels)
+    Chunk-wise polyphase filtering for rational rate ratios (see resampling.py).
+    """
+    if sfreq == TARGET_SFREQ:
+        return data
+    with stage_timer("resample"):
+        return resample(data, sfreq, TARGET_SFREQ)
 
-        # Reorder channels to match training order
-        raw.reorder_channels(picked_channels) # pick_channels might preserve order, but let's be safe if we mapped them
+@timed("parse")
+def parse_edf(file_content: Union[bytes, str]) -> np.ndarray:
+    """
+    Parses an EDF file (raw bytes or a path, which is memory-mapped) and
+    returns a 2D numpy array [samples, channels].
 
-        # Resample if necessary
-        if raw.info['sfreq'] != TARGET_SFREQ:
-            raw.resample(TARGET_SFREQ)
+    Only the REQUIRED_CHANNELS signals are decoded.
+    """
+    try:
+        header = read_edf_header(file_content)
+
+        # The EDF+ annotation signal is not a channel
+        available_channels = [
+            label if label != EDF_ANNOTATIONS_LABEL else "" for label in header.labels
+        ]
+        picked = match_channels(available_channels)
+
+        # Decode only the picked signals, already in training order
+        signals = read_edf_signals(file_content, header, picked)
+
+        # Resample if necessary (channels are usually recorded at one common rate)
+        rates = [header.sampling_rate(i) for i in picked]
+        if len(set(rates)) == 1:
+            data = resample_to_target(np.stack(signals), rates[0])
+        else:
+            signals = [resample_to_target(signal, sfreq) for signal, sfreq in zip(signals, rates)]
+            # Resampled lengths can differ by a sample between rates
+            n_samples = min(len(signal) for signal in signals)
+            data = np.stack([signal[:n_samples] for signal in signals])
 
-        # Get data
-        data, times = raw.get_data(return_times=True)
         # data is [channels, samples], we need [samples, channels]
         return data.T
 
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error processing EDF file: {str(e)}")
 
+@timed("parse")
 def parse_csv(file_content: str) -> np.ndarray:
     """
     Parses a CSV string and returns a 2D numpy array.
     Assumes columns are channels and rows are timepoints.
     """
+    import pandas as pd  # Only needed for CSV uploads; slow to import
     try:
         df = pd.read_csv(io.StringIO(file_content))
 
@@ -0,0 +1,175 @@
+"""
+Content-addressed cache for uploaded EEG recordings.
+
+Entries are keyed by the SHA-256 of the uploaded bytes plus a pipeline
+version, in two levels:
+    - parsed: the [samples, channels] array from parse_edf / parse_csv,
+      versioned by REQUIRED_CHANNELS and TARGET_SFREQ
+    - features: the per-window feature matrix, additionally versioned by
+      BANDS, the feature layout and the window settings
+so a re-uploaded file skips straight to scoring, and a feature change still
+reuses the parsed recording. Changing any of those settings changes the
+version, which makes old entries unreachable.
+
+Entries live in an in-memory LRU bounded by a byte budget. Entries evicted
+from memory spill to .npz files on disk (bounded by their own budget, oldest
+removed first) and are promoted back to memory on the next hit. Entries larger
+than the whole memory budget stay on disk and are read from there on every hit.
+"""
+import hashlib
+import json
+import os
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from .data_processing import REQUIRED_CHANNELS, TARGET_SFREQ
+from .feature_extraction import BANDS, CHANNEL_FEATURE_NAMES, WELCH_SEGMENT_SEC
+
+FEATURE_CACHE_DIR = os.getenv("FEATURE_CACHE_DIR", os.path.join("cache", "features"))
+FEATURE_CACHE_MEMORY_BYTES = int(os.getenv("FEATURE_CACHE_MEMORY_BYTES", 256 * 1024 ** 2))
+FEATURE_CACHE_DISK_BYTES = int(os.getenv("FEATURE_CACHE_DISK_BYTES", 2 * 1024 ** 3))
+
+# Bump when parsing or feature code changes without a settings change
+FEATURE_CACHE_VERSION = 2
+
+Entry = Dict[str, np.ndarray]
+
+
+def _version(*settings) -> str:
+    blob = json.dumps([FEATURE_CACHE_VERSION, *settings], sort_keys=True).encode("utf-8")
+    return hashlib.sha256(blob).hexdigest()[:16]
+
+
+PARSE_VERSION = _version(REQUIRED_CHANNELS, TARGET_SFREQ)
+FEATURE_VERSION = _version(PARSE_VERSION, BANDS, CHANNEL_FEATURE_NAMES, WELCH_SEGMENT_SEC)
+
+
+def content_hash(contents: bytes) -> str:
+    return hashlib.sha256(contents).hexdigest()
+
+
+def parsed_key(digest: str, file_format: str) -> str:
+    return f"{digest}-{file_format}-parsed-{PARSE_VERSION}"
+
+
+def features_key(digest: str, file_format: str, window_size_sec: float, step_size_sec: float) -> str:
+    return f"{digest}-{file_format}-features-{FEATURE_VERSION}-{window_size_sec:g}-{step_size_sec:g}"
+
+
+class FeatureCache:
+    """
+    Byte-bounded LRU of named-array entries with an on-disk spill tier.
+
+    Thread-safe; cached arrays are shared between callers and must not be
+    modified.
+    """
+
+    def __init__(
+        self,
+        directory: str = FEATURE_CACHE_DIR,
+        memory_bytes: int = FEATURE_CACHE_MEMORY_BYTES,
+        disk_bytes: int = FEATURE_CACHE_DISK_BYTES
+    ):
+        self.directory = directory
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+
+        self._entries: "OrderedDict[str, Entry]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _nbytes(entry: Entry) -> int:
+        return sum(array.nbytes for array in entry.values())
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".npz")
+
+    def get(self, key: str) -> Optional[Entry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        path = self._path(key)
+        try:
+            with np.load(path) as npz:
+                entry = {name: npz[name] for name in npz.files}
+        except (FileNotFoundError, OSError, ValueError):
+            return None
+
+        if self._nbytes(entry) > self.memory_bytes:
+            # Can't be promoted: served from disk, marked as recently used for _trim_disk()
+            self._touch(path)
+            return entry
+
+        # Promote back to memory
+        self._remove(path)
+        self.put(key, entry)
+        return entry
+
+    def put(self, key: str, entry: Entry) -> None:
+        nbytes = self._nbytes(entry)
+        if nbytes > self.memory_bytes:
+            self._spill(key, entry)
+            return
+
+        spilled = []
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._nbytes(self._entries.pop(key))
+            self._entries[key] = entry
+            self._size += nbytes
+
+            while self._size > self.memory_bytes:
+                old_key, old_entry = self._entries.popitem(last=False)
+                self._size -= self._nbytes(old_entry)
+                spilled.append((old_key, old_entry))
+
+        # Disk writes happen outside the lock
+        for old_key, old_entry in spilled:
+            self._spill(old_key, old_entry)
+
+    def _spill(self, key: str, entry: Entry) -> None:
+        if self.disk_bytes <= 0:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(key)
+            tmp_path = path + ".tmp.npz"
+            np.savez(tmp_path, **entry)
+            os.replace(tmp_path, path)
+            self._trim_disk()
+        except OSError as e:
+            print(f"Feature cache spill failed: {e}")
+
+    def _trim_disk(self) -> None:
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".npz") and not name.endswith(".tmp.npz"):
+                stat = os.stat(os.path.join(self.directory, name))
+                files.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, name in sorted(files):
+            if total <= self.disk_bytes:
+                break
+            self._remove(os.path.join(self.directory, name))
+            total -= size
+
+    @staticmethod
+    def _touch(path: str) -> None:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -1,7 +1,12 @@
 import numpy as np
-import pandas as pd
-from scipy.signal import welch
-from typing import List, Dict, Union
+from functools import lru_cache
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import TYPE_CHECKING, List, Dict, Tuple
+
+# scipy.signal, scipy.fft and pandas are imported where they are used: they
+# are most of the server's import time (see benchmarks/startup.py)
+if TYPE_CHECKING:
+    import pandas as pd
 
 # Frequency bands
 BANDS = {
@@ -12,6 +17,202 @@ BANDS = {
     "gamma": [30, 45]
 }
 
+# Welch segment length in seconds
+WELCH_SEGMENT_SEC = 2
+
+# Per-channel feature order: time-domain stats, then band powers sorted by key
+# (alpha_abs, alpha_rel, beta_abs, ...). Changing this invalidates trained models.
+BANDPOWER_KEYS = sorted([f"{band}_abs" for band in BANDS] + [f"{band}_rel" for band in BANDS])
+CHANNEL_FEATURE_NAMES = ["mean", "std", "skew", "kurtosis"] + BANDPOWER_KEYS
+
+# Cross-channel features (optional, appended after the per-channel features):
+# coherence and phase-locking value per band, then broadband correlation,
+# each for every channel pair (i < j)
+CONNECTIVITY_BAND_METRICS = ["coh", "plv"]
+
+
+def welch_nperseg(n_samples: int, fs: int) -> int:
+    """Welch segment length, shrunk to the data length like scipy.signal.welch does."""
+    return min(int(fs * WELCH_SEGMENT_SEC), n_samples)
+
+
+def compute_psd(data: np.ndarray, fs: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Welch PSD of every leading index of an array, computed along the last axis.
+
+    Args:
+        data: Array [..., n_samples].
+        fs: Sampling rate.
+
+    Returns:
+        (freqs, psd) where psd is [..., n_freqs].
+    """
+    from scipy.signal import welch
+    return welch(data, fs, nperseg=welch_nperseg(data.shape[-1], fs), axis=-1)
+
+
+@lru_cache(maxsize=16)
+def _hann(nperseg: int) -> np.ndarray:
+    """Periodic Hann window, as used by scipy.signal.welch."""
+    from scipy.signal import get_window
+    win = get_window("hann", nperseg)
+    win.setflags(write=False)
+    return win
+
+
+def compute_segment_spectra(data: np.ndarray, fs: int, nperseg: int = None) -> np.ndarray:
+    """
+    Windowed FFTs of the half-overlapping Welch segments along the last axis.
+
+    Exposes the per-segment spectra that welch() averages internally, so they
+    can be cached and reused. psd_from_spectra() of the result matches
+    compute_psd() up to floating-point rounding.
+
+    Args:
+        data: Array [..., n_samples].
+        fs: Sampling rate.
+        nperseg: Segment length, defaults to welch_nperseg().
+
+    Returns:
+        Complex array [..., n_segments, n_freqs].
+    """
+    from scipy import fft as sp_fft
+    if nperseg is None:
+        nperseg = welch_nperseg(data.shape[-1], fs)
+    step = nperseg - nperseg // 2
+
+    segments = sliding_window_view(data, nperseg, axis=-1)[..., ::step, :]
+    # Constant detrend per segment, then Hann window
+    segments = segments - np.mean(segments, axis=-1, keepdims=True)
+    return sp_fft.rfft(_hann(nperseg) * segments, axis=-1)
+
+
+def psd_from_spectra(spectra: np.ndarray, fs: int, nperseg: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    One-sided Welch PSD (density scaling) averaged over the segment axis.
+
+    Args:
+        spectra: Array [..., n_segments, n_freqs] from compute_segment_spectra().
+        fs: Sampling rate.
+        nperseg: Segment length the spectra were computed with.
+
+    Returns:
+        (freqs, psd) where psd is [..., n_freqs].
+    """
+    from scipy import fft as sp_fft
+    win = _hann(nperseg)
+
+    power = (np.conjugate(spectra) * spectra).real * (1.0 / (fs * (win * win).sum()))
+    if nperseg % 2:
+        power[..., 1:] *= 2
+    else:
+        # Last point is the unpaired Nyquist bin, don't double
+        power[..., 1:-1] *= 2
+
+    return sp_fft.rfftfreq(nperseg, 1 / fs), power.mean(axis=-2)
+
+
+def compute_band_powers(freqs: np.ndarray, psd: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Absolute and relative band powers for every leading index of a PSD.
+
+    Args:
+        freqs: Frequency bins of the PSD.
+        psd: Array [..., n_freqs].
+
+    Returns:
+        (absolute, relative), each [..., n_bands] in BANDS order.
+    """
+    # Frequency resolution
+    freq_res = freqs[1] - freqs[0]
+
+    absolute = np.empty(psd.shape[:-1] + (len(BANDS),))
+    total_power = np.zeros(psd.shape[:-1])
+
+    for i, (low, high) in enumerate(BANDS.values()):
+        idx_band = np.logical_and(freqs >= low, freqs <= high)
+        # Integral approximation (sum * resolution); contiguous so every row
+        # is summed in the same order as a 1D channel would be
+        absolute[..., i] = np.sum(np.ascontiguousarray(psd[..., idx_band]), axis=-1) * freq_res
+        total_power = total_power + absolute[..., i]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        relative = np.where(total_power[..., None] > 0, absolute / total_power[..., None], 0.0)
+
+    return absolute, relative
+
+
+def _band_masks(freqs: np.ndarray) -> List[np.ndarray]:
+    """Boolean frequency-bin mask of every band, in BANDS order (same bins as compute_band_powers)."""
+    return [np.logical_and(freqs >= low, freqs <= high) for low, high in BANDS.values()]
+
+
+def compute_connectivity(data: np.ndarray, spectra: np.ndarray, freqs: np.ndarray) -> np.ndarray:
+    """
+    Cross-channel coherence, phase-locking value (PLV) and correlation.
+
+    Coherence and PLV come from the same segment spectra as the band powers:
+    for every frequency bin one cross-spectral matrix is accumulated over the
+    Welch segments with a single batched matrix product (instead of one
+    scipy.signal.coherence call per channel pair), then averaged over the
+    bins of each band. Per bin, coherence equals scipy.signal.coherence with
+    the same Welch settings; PLV is the length of the mean unit phase
+    difference across segments.
+
+    Args:
+        data: Array [..., n_channels, n_samples] the spectra were computed from.
+        spectra: Array [..., n_channels, n_segments, n_freqs] from compute_segment_spectra().
+        freqs: Frequency bins of the spectra.
+
+    Returns:
+        Array [..., n_features] in connectivity_feature_names() order.
+    """
+    n_channels, n_segments = spectra.shape[-3], spectra.shape[-2]
+    rows, cols = np.triu_indices(n_channels, k=1)
+
+    # Only bins inside a band are needed: [..., n_bins, n_channels, n_segments]
+    masks = _band_masks(freqs)
+    in_bands = np.logical_or.reduce(masks)
+    X = np.moveaxis(spectra[..., in_bands], -1, -3)
+
+    # Cross-spectral matrix per bin, summed over segments: [..., n_bins, C, C]
+    csd = X @ np.conjugate(X).swapaxes(-1, -2)
+    power = np.diagonal(csd, axis1=-2, axis2=-1).real
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        denominator = power[..., rows] * power[..., cols]
+        coherence = np.where(denominator > 0, np.abs(csd[..., rows, cols]) ** 2 / denominator, 0.0)
+
+        # Unit phasors: the same product then sums phase differences only
+        magnitude = np.abs(X)
+        phasors = np.where(magnitude > 0, X / magnitude, 0)
+        plv = np.abs((phasors @ np.conjugate(phasors).swapaxes(-1, -2))[..., rows, cols]) / n_segments
+
+    features = []
+    for metric in (coherence, plv):
+        for mask in masks:
+            features.append(metric[..., mask[in_bands], :].mean(axis=-2))
+
+    # Pearson correlation of the raw signals
+    centered = data - data.mean(axis=-1, keepdims=True)
+    covariance = centered @ centered.swapaxes(-1, -2)
+    variance = np.diagonal(covariance, axis1=-2, axis2=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scale = np.sqrt(variance[..., rows] * variance[..., cols])
+        features.append(np.where(scale > 0, covariance[..., rows, cols] / scale, 0.0))
+
+    return np.concatenate(features, axis=-1)
+
+
+def connectivity_feature_names(channel_names: List[str]) -> List[str]:
+    """Names of the compute_connectivity() outputs, e.g. "coh_alpha_Fp1-Fp2", "corr_Fp1-Fp2"."""
+    rows, cols = np.triu_indices(len(channel_names), k=1)
+    pairs = [f"{channel_names[i]}-{channel_names[j]}" for i, j in zip(rows, cols)]
+
+    names = [f"{metric}_{band}_{pair}" for metric in CONNECTIVITY_BAND_METRICS for band in BANDS for pair in pairs]
+    return names + [f"corr_{pair}" for pair in pairs]
+
+
 def compute_bandpower(data: np.ndarray, fs: int, method: str = 'welch') -> Dict[str, float]:
     """
     Compute absolute bandpower for a single channel.
@@ -24,68 +225,158 @@ def compute_bandpower(data: np.ndarray, fs: int, method: str = 'welch') -> Dict[
     Returns:
         Dictionary of bandpowers.
     """
-    # Compute PSD
-    freqs, psd = welch(data, fs, nperseg=fs*2) # 2 second window for Welch
-
-    # Frequency resolution
-    freq_res = freqs[1] - freqs[0]
+    freqs, psd = compute_psd(data, fs) # 2 second window for Welch
+    absolute, relative = compute_band_powers(freqs, psd)
 
     bandpowers = {}
-    total_power = 0
-
-    for band, (low, high) in BANDS.items():
-        # Find indices corresponding to the band
-        idx_band = np.logical_and(freqs >= low, freqs <= high)
-        # Integral approximation (sum * resolution)
-        power = np.sum(psd[idx_band]) * freq_res
-        bandpowers[f"{band}_abs"] = power
-        total_power += power
+    for i, band in enumerate(BANDS.keys()):
+        bandpowers[f"{band}_abs"] = absolute[i]
 
     # Add relative powers
-    for band in BANDS.keys():
-        bandpowers[f"{band}_rel"] = bandpowers[f"{band}_abs"] / total_power if total_power > 0 else 0
+    for i, band in enumerate(BANDS.keys()):
+        bandpowers[f"{band}_rel"] = relative[i]
 
     return bandpowers
 
-def extract_features_from_segment(segment: np.ndarray, fs: int = 256, channel_names: List[str] = None) -> np.ndarray:
+
+def _zero_out_fperr(values: np.ndarray, tolerance: np.ndarray) -> np.ndarray:
+    return np.where(np.abs(values) < tolerance, 0, values)
+
+
+def compute_moments(data: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
     """
-    Extract features from a multi-channel EEG segment.
+    Mean, std, and bias-corrected skewness/excess kurtosis along the last axis.
+
+    Skewness and kurtosis follow pandas' Series.skew()/Series.kurtosis()
+    formulas, including their treatment of (near-)constant signals.
+
+    Returns:
+        (mean, std, skew, kurtosis), each of shape data.shape[:-1].
+    """
+    count = float(data.shape[-1])
+
+    mean = np.mean(data, axis=-1)
+    std = np.std(data, axis=-1)
+
+    adjusted = data - (data.sum(axis=-1, dtype=np.float64) / count)[..., None]
+    adjusted2 = adjusted ** 2
+    m2 = adjusted2.sum(axis=-1, dtype=np.float64)
+    m3 = (adjusted2 * adjusted).sum(axis=-1, dtype=np.float64)
+    m4 = (adjusted2 ** 2).sum(axis=-1, dtype=np.float64)
+
+    # Guard against rounding noise on constant signals (see pandas.core.nanops)
+    eps_max = np.finfo(np.float64).eps * np.abs(data).max(axis=-1, initial=0.0)
+    m2 = _zero_out_fperr(m2, (eps_max ** 2) * count)
+    m3 = _zero_out_fperr(m3, (eps_max ** 3) * count)
+    m4 = _zero_out_fperr(m4, (eps_max ** 4) * count)
+
+    # Scalar pow per channel: numpy's vectorized power/square round differently
+    # from the libm pow() the per-channel pandas computation goes through
+    m2_values = m2.ravel().tolist()
+    m2_pow15 = np.array([v ** 1.5 for v in m2_values]).reshape(m2.shape)
+    m2_pow2 = np.array([v ** 2 for v in m2_values]).reshape(m2.shape)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        skew = (count * (count - 1) ** 0.5 / (count - 2)) * (m3 / m2_pow15)
+        adj = 3 * (count - 1) ** 2 / ((count - 2) * (count - 3))
+        numerator = count * (count + 1) * (count - 1) * m4
+        denominator = (count - 2) * (count - 3) * m2_pow2
+        kurtosis = numerator / denominator - adj
+
+    skew = np.where(m2 == 0, 0.0, skew)
+    kurtosis = np.where(denominator == 0, 0.0, kurtosis)
+
+    return mean, std, skew, kurtosis
+
+
+def stack_channel_features(moments: Tuple[np.ndarray, ...], absolute: np.ndarray, relative: np.ndarray) -> np.ndarray:
+    """
+    Interleave per-channel stats and band powers into the model's feature layout.
 
     Args:
-        segment: 2D array [n_samples, n_channels]
+        moments: (mean, std, skew, kurtosis) from compute_moments(), each [..., n_channels].
+        absolute, relative: Band powers from compute_band_powers(), each [..., n_channels, n_bands].
+
+    Returns:
+        Array [..., n_channels * len(CHANNEL_FEATURE_NAMES)], channel by channel.
+    """
+    mean, std, skew, kurtosis = moments
+    columns = {"mean": mean, "std": std, "skew": skew, "kurtosis": kurtosis}
+    for i, band in enumerate(BANDS.keys()):
+        columns[f"{band}_abs"] = absolute[..., i]
+        columns[f"{band}_rel"] = relative[..., i]
+
+    features = np.stack([columns[name] for name in CHANNEL_FEATURE_NAMES], axis=-1)
+    return features.reshape(features.shape[:-2] + (-1,))
+
+
+def extract_features_batch(segments: np.ndarray, fs: int = 256, connectivity: bool = False) -> np.ndarray:
+    """
+    Extract features from a batch of multi-channel EEG segments in one pass.
+
+    All channels of all segments share a single Welch call and vectorized
+    moment computation. Row i equals extract_features_from_segment(segments[i]).
+
+    Args:
+        segments: 3D array [n_segments, n_samples, n_channels]
         fs: Sampling rate
-        channel_names: List of channel names (optional, for structured return if needed)
+        connectivity: Append cross-channel features (compute_connectivity()).
+            The segment FFTs are then computed once and shared by the band
+            powers and the connectivity; band powers match the default path
+            up to floating-point rounding.
 
     Returns:
-        1D feature vector.
+        2D feature matrix [n_segments, n_channels * len(CHANNEL_FEATURE_NAMES)
+        (+ connectivity features)].
     """
-    n_samples, n_channels = segment.shape
+    segments = np.asarray(segments, dtype=np.float64)
+    if segments.ndim != 3:
+        raise ValueError(f"Expected segments [n_segments, n_samples, n_channels], got shape {segments.shape}")
 
-    features = []
+    n_segments, _, n_channels = segments.shape
+    if n_segments == 0:
+        # compute_band_powers() needs the frequency grid of at least one segment
+        n_features = n_channels * len(CHANNEL_FEATURE_NAMES)
+        if connectivity:
+            n_features += len(connectivity_feature_names([""] * n_channels))
+        return np.empty((0, n_features))
 
-    # Per-channel features
-    for ch in range(n_channels):
-        ch_data = segment[:, ch]
+    # Channel-major layout so every reduction runs over a contiguous time axis
+    data = np.ascontiguousarray(segments.transpose(0, 2, 1))
 
-        # Time domain stats
-        features.append(np.mean(ch_data))
-        features.append(np.std(ch_data))
-        features.append(pd.Series(ch_data).skew())
-        features.append(pd.Series(ch_data).kurtosis())
+    if not connectivity:
+        freqs, psd = compute_psd(data, fs)
+        return stack_channel_features(compute_moments(data), *compute_band_powers(freqs, psd))
 
-        # Frequency domain features
-        bp = compute_bandpower(ch_data, fs)
-        # Order: delta_abs, theta_abs, ..., delta_rel, ...
-        # We sort by keys to be deterministic
-        for key in sorted(bp.keys()):
-            features.append(bp[key])
+    # [n_segments, n_channels, n_welch_segments, n_freqs], shared below
+    spectra = compute_segment_spectra(data, fs)
+    freqs, psd = psd_from_spectra(spectra, fs, welch_nperseg(data.shape[-1], fs))
+
+    channel_features = stack_channel_features(compute_moments(data), *compute_band_powers(freqs, psd))
+    return np.concatenate([channel_features, compute_connectivity(data, spectra, freqs)], axis=-1)
+
+
+def extract_features_from_segment(
+    segment: np.ndarray, fs: int = 256, channel_names: List[str] = None, connectivity: bool = False
+) -> np.ndarray:
+    """
+    Extract features from a multi-channel EEG segment.
+
+    Args:
+        segment: 2D array [n_samples, n_channels]
+        fs: Sampling rate
+        channel_names: List of channel names (optional, for structured return if needed)
+        connectivity: Append cross-channel features (not used by the current models)
 
-    # Global features (ratios, etc.) - Simplified for now
-    # TODO: Add cross-channel features if needed
+    Returns:
+        1D feature vector.
+    """
+    # Per-channel features, in CHANNEL_FEATURE_NAMES order, then optionally
+    # cross-channel features in connectivity_feature_names() order
+    return extract_features_batch(np.asarray(segment)[np.newaxis], fs=fs, connectivity=connectivity)[0]
 
-    return np.array(features)
 
-def segment_data(df: pd.DataFrame, window_size_sec: int = 4, step_size_sec: int = 2, fs: int = 256):
+def segment_data(df: "pd.DataFrame", window_size_sec: int = 4, step_size_sec: int = 2, fs: int = 256):
     """
     Generator that yields segments of data.
     """
@@ -98,3 +389,26 @@ def segment_data(df: pd.DataFrame, window_size_sec: int = 4, step_size_sec: int
         end = start + window_size_samples
         segment = df.iloc[start:end]
         yield segment
+
+def segment_array(data: np.ndarray, window_size_sec: int = 4, step_size_sec: int = 2, fs: int = 256) -> np.ndarray:
+    """
+    All windows of a recording as a strided view (no copy).
+
+    Same window/step semantics as segment_data().
+
+    Args:
+        data: 2D array [n_samples, n_channels]
+
+    Returns:
+        3D view [n_windows, window_size_samples, n_channels]; empty if the
+        recording is shorter than one window.
+    """
+    window_size_samples = window_size_sec * fs
+    step_size_samples = step_size_sec * fs
+
+    if len(data) < window_size_samples:
+        return np.empty((0, window_size_samples, data.shape[1]), dtype=data.dtype)
+
+    # [n_starts, n_channels, window] -> every step-th start, time axis second
+    windows = sliding_window_view(data, window_size_samples, axis=0)[::step_size_samples]
+    return windows.transpose(0, 2, 1)
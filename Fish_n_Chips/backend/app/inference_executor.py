@@ -0,0 +1,228 @@
+"""
+Off-event-loop EEG inference.
+
+Feature extraction runs in a process pool (it is CPU-bound numpy/scipy work and
+would otherwise hold the GIL of the server process). Model scoring of single
+feature rows is micro-batched across every live session and request: rows
+submitted within the latency budget are scored with one predict_proba call on
+a dedicated scoring thread, and each caller gets its own row back.
+
+If a feature worker dies (e.g. OOM-killed on a large upload), the broken pool
+is replaced and the affected work is retried once; readiness reports
+eeg_workers as loading until the new workers are up.
+
+Live /ws/simulate ticks are micro-batched the same way on their way to the
+process pool: the new Welch segments of concurrent sessions (usually one per
+session, see StreamingFeatureEngine) become one compute_segment_spectra task,
+so a tick pickles only the new samples and the FFTs run off the server's GIL.
+"""
+import asyncio
+import multiprocessing
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from . import readiness
+from .feature_extraction import compute_segment_spectra, extract_features_batch
+from .metrics import INFERENCE_BATCH_SIZE, stage_timer
+
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+INFERENCE_MAX_BATCH = int(os.getenv("INFERENCE_MAX_BATCH", 64))
+INFERENCE_MAX_DELAY_MS = float(os.getenv("INFERENCE_MAX_DELAY_MS", 10))
+
+# Windows per task sent to a feature worker
+FEATURE_CHUNK_SIZE = 64
+
+
+class InferenceExecutor:
+    def __init__(
+        self,
+        model,
+        workers: int = INFERENCE_WORKERS,
+        max_batch_size: int = INFERENCE_MAX_BATCH,
+        max_delay_ms: float = INFERENCE_MAX_DELAY_MS
+    ):
+        self.model = model
+        self.workers = workers
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay_ms / 1000
+
+        self._processes = self._new_pool()
+        self._pool_lock: Optional[asyncio.Lock] = None
+        self._restart_task: Optional[asyncio.Task] = None
+        # One scoring thread: batches are scored one after another
+        self._scorer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="eeg-scorer")
+        self._queue: Optional[asyncio.Queue] = None
+        self._segment_queue: Optional[asyncio.Queue] = None
+        self._batchers: List[asyncio.Task] = []
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # spawn: forking a server process that already runs threads is unsafe
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    async def start(self):
+        self._pool_lock = asyncio.Lock()
+        self._queue = asyncio.Queue()
+        self._segment_queue = asyncio.Queue()
+        self._batchers = [
+            asyncio.create_task(self._run_batcher(self._queue, self._score_rows)),
+            asyncio.create_task(self._run_batcher(self._segment_queue, self._segment_spectra)),
+        ]
+
+    async def warm_up(self, fs: int = 256, window_sec: int = 4, n_channels: int = 16):
+        """
+        Starts every feature worker (spawn and imports) and scores once, so
+        the first request does not pay for them.
+        """
+        features = await self._start_workers(fs, window_sec, n_channels)
+        await asyncio.get_running_loop().run_in_executor(self._scorer, self.model.predict_proba, features)
+
+    async def _start_workers(self, fs: int = 256, window_sec: int = 4, n_channels: int = 16) -> np.ndarray:
+        """Runs one small task on every feature worker; returns its features."""
+        loop = asyncio.get_running_loop()
+        window = np.random.default_rng(0).standard_normal((1, window_sec * fs, n_channels))
+        features = await asyncio.gather(*[
+            loop.run_in_executor(self._processes, extract_features_batch, window, fs) for _ in range(self.workers)
+        ])
+        return features[0]
+
+    async def shutdown(self):
+        for task in self._batchers + [self._restart_task]:
+            if task is not None:
+                task.cancel()
+        # Waits for running tasks, like signal_analysis.shutdown_pool()
+        await asyncio.to_thread(self._processes.shutdown, wait=True, cancel_futures=True)
+        self._scorer.shutdown(wait=False)
+
+    async def extract_features(self, windows: np.ndarray, fs: int) -> np.ndarray:
+        """
+        Features of [n_windows, samples, channels] computed in the process pool.
+
+        Chunks are spread over the workers, with at most one chunk per worker
+        in flight so long recordings are never copied to the pool all at once.
+        """
+        starts = range(0, len(windows), FEATURE_CHUNK_SIZE)
+
+        features: List[np.ndarray] = []
+        with stage_timer("features"):
+            for i in range(0, len(starts), self.workers):
+                wave = [
+                    self._run_in_pool(extract_features_batch, windows[start:start + FEATURE_CHUNK_SIZE], fs)
+                    for start in starts[i:i + self.workers]
+                ]
+                features.extend(await asyncio.gather(*wave))
+
+        return np.concatenate(features)
+
+    async def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        """Scores an already batched feature matrix on the scoring thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._scorer, self._score_batch, features)
+
+    def _score_batch(self, features: np.ndarray) -> np.ndarray:
+        INFERENCE_BATCH_SIZE.labels().observe(len(features))
+        with stage_timer("score"):
+            return self.model.predict_proba(features)
+
+    async def score(self, features: np.ndarray) -> np.ndarray:
+        """
+        Class probabilities of one feature vector, micro-batched with
+        concurrent callers. Waits at most max_delay_ms for a batch to fill.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((features, future))
+        return await future
+
+    async def segment_spectra(self, segments: np.ndarray, fs: int) -> np.ndarray:
+        """
+        compute_segment_spectra() of whole segments [n, n_channels, nperseg]
+        as [n, n_channels, n_freqs], computed in the process pool together
+        with the segments of concurrent sessions.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._segment_queue.put(((segments, fs), future))
+        return await future
+
+    async def _score_rows(self, rows: List[np.ndarray]) -> np.ndarray:
+        return await self.predict_proba(np.stack(rows))
+
+    async def _segment_spectra(self, items: List[Tuple[np.ndarray, int]]) -> List[np.ndarray]:
+        """One pool task per (fs, segment shape) in the batch, run concurrently."""
+        groups: Dict[Tuple[int, tuple], List[int]] = {}
+        for i, (segments, fs) in enumerate(items):
+            groups.setdefault((fs, segments.shape[1:]), []).append(i)
+
+        tasks = [
+            self._run_in_pool(compute_segment_spectra, np.concatenate([items[i][0] for i in indices]), fs, shape[-1])
+            for (fs, shape), indices in groups.items()
+        ]
+        results: List[Optional[np.ndarray]] = [None] * len(items)
+        for indices, spectra in zip(groups.values(), await asyncio.gather(*tasks)):
+            # One Welch segment per input segment: drop that axis, split per caller
+            spectra = spectra[:, :, 0]
+            bounds = np.cumsum([len(items[i][0]) for i in indices])[:-1]
+            for i, part in zip(indices, np.split(spectra, bounds)):
+                results[i] = part
+        return results
+
+    async def _run_in_pool(self, fn: Callable, *args):
+        """
+        fn(*args) in the process pool. If the pool is broken (a worker died),
+        it is replaced and fn is retried once on the new pool.
+        """
+        loop = asyncio.get_running_loop()
+        processes = self._processes
+        try:
+            return await loop.run_in_executor(processes, fn, *args)
+        except BrokenProcessPool:
+            await self._replace_pool(processes)
+            return await loop.run_in_executor(self._processes, fn, *args)
+
+    async def _replace_pool(self, broken: ProcessPoolExecutor):
+        """Replaces a broken pool once, however many callers saw it break."""
+        async with self._pool_lock:
+            if self._processes is not broken:
+                return
+            print("EEG feature worker died; restarting the process pool")
+            readiness.set_state("eeg_workers", readiness.LOADING, "restarting after a worker died")
+            self._processes = self._new_pool()
+            broken.shutdown(wait=False)
+            # A previous restart still starting workers was on the broken pool
+            if self._restart_task is not None:
+                self._restart_task.cancel()
+            self._restart_task = asyncio.create_task(readiness.track("eeg_workers", self._start_workers()))
+
+    async def _run_batcher(self, queue: asyncio.Queue, process: Callable[[list], Awaitable]):
+        """Collects queued (item, future) pairs into batches for process(items)."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch: List[Tuple[object, asyncio.Future]] = [await queue.get()]
+            deadline = loop.time() + self.max_delay
+
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Callers that went away while queued don't need a result
+            batch = [(item, future) for item, future in batch if not future.done()]
+            if not batch:
+                continue
+
+            try:
+                results = await process([item for item, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for result, (_, future) in zip(results, batch):
+                if not future.done():
+                    future.set_result(result)
@@ -1,20 +1,43 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File, WebSocket
+from fastapi import FastAPI, HTTPException, UploadFile, File, WebSocket, Request, Query, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-import joblib
 import numpy as np
 import os
 import asyncio
 import json
+from typing import Optional
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 
 load_dotenv()
 
-from .schemas import EEGSampleRequest, PredictionResponse, SaveEEGResultRequest
-from .feature_extraction import extract_features_from_segment
+from pydantic import BaseModel, ValidationError
+from .schemas import (
+    EEGSampleRequest, EEGBatchRequest, PredictionResponse, BatchPredictionResponse,
+    WindowedPredictionResponse, SaveEEGResultRequest
+)
+from .wire_format import is_binary_content_type, decode_binary_eeg, SHAPE_HEADER, BINARY_CONTENT_TYPES
+from .feature_extraction import segment_array
+from .inference_executor import InferenceExecutor
+from .tree_ensemble import compile_model
+from .feature_cache import FeatureCache, content_hash, features_key, parsed_key
+from .streaming_features import StreamingFeatureEngine
+from .recordings import list_recordings, load_recording, replay_chunks
+from .ws_framing import FRAME_DTYPES, LatestFrameSender, decimate_minmax, encode_binary_frame
 from .data_processing import parse_edf, parse_csv
-from backend.app.routers import speech_analysis, cognitive_games, unified_analysis
-from backend.app.database import get_db
+from .resampling import resample
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, instrument_sessions, render_metrics, stage_timer
+from . import readiness
+from .readiness import ComponentUnavailable
+from backend.app.routers import speech_analysis, speech_stream, cognitive_games, unified_analysis
+from backend.app.services.speech.feature_extractor import get_nlp
+from backend.app.services.speech.signal_analysis import shutdown_pool as shutdown_speech_pool, warm_up_pool as warm_up_speech_pool
+from backend.app.services.speech.speech_scorer import load_ml_model as load_speech_model
+from backend.app.services.speech.transcription import DummyBackend, LocalWhisperBackend
+from backend.app.services.speech.vad_service import detect_speech_start
+from backend.app.services.speech.whisper_service import get_backend as get_transcription_backend, shutdown as shutdown_transcription
+from backend.app.utils.audio_utils import AudioBuffer
+from backend.app.database import get_db, SessionLocal
 from sqlalchemy.orm import Session
 from fastapi import Depends
 
@@ -28,31 +51,129 @@ from fastapi import Depends
 # Global variables for model and scaler
 model = None
 scaler = None
+# Off-event-loop feature extraction and micro-batched scoring (set up with the model)
+executor = None
+# Parsed uploads and their window features, keyed by file content
+feature_cache = FeatureCache()
+
+# Fastest /ws/simulate update rate (seconds between ticks)
+MIN_STREAM_HOP_SEC = 0.125
+# Fastest accelerated replay (multiple of real time)
+MAX_REPLAY_SPEED = 64
+
+# Whole-recording inference windows (same as segment_data defaults used in training)
+WINDOW_SIZE_SEC = 4
+STEP_SIZE_SEC = 2
+
+# Load the speech models and start the worker pools right after startup (0:
+# on first use instead). The EEG model is always loaded in the background.
+STARTUP_WARM_UP = os.getenv("STARTUP_WARM_UP", "1") != "0"
+# Longest an EEG request waits for the model if it arrives while it is loading
+MODEL_LOAD_TIMEOUT_SEC = float(os.getenv("MODEL_LOAD_TIMEOUT_SEC", 60))
+
+MODEL_PATH = os.path.join("models", "eeg_best_model.joblib")
+
+# Background model load started by the lifespan
+model_task: Optional[asyncio.Task] = None
+
+def load_model():
+    """Loads and flattens the EEG model (blocking; runs in a thread)."""
+    # Check if model exists (it might not if notebooks haven't run)
+    if not os.path.exists(MODEL_PATH):
+        print(f"Warning: Model not found at {MODEL_PATH}. Inference will fail.")
+        raise ComponentUnavailable(f"{MODEL_PATH} not found")
+
+    import joblib
+    # Flattened tree ensemble (or the model itself if it can't be flattened)
+    loaded = compile_model(joblib.load(MODEL_PATH))
+    print(f"Model loaded from {MODEL_PATH}")
+    return loaded
+
+async def start_model():
+    global model, executor
+    loaded = await asyncio.to_thread(load_model)
+    started = InferenceExecutor(loaded)
+    await started.start()
+    # Published together, so a request never sees the model without its executor
+    model, executor = loaded, started
+
+def warm_up_eeg_in_process():
+    """Resampling of EDF uploads, which runs in the server process (scipy.signal)."""
+    resample(np.zeros((16, 512)), 512, 256)
+
+async def warm_up_eeg_workers():
+    await model_task
+    if model is None:
+        readiness.set_state("eeg_workers", readiness.UNAVAILABLE, "no EEG model")
+    else:
+        await readiness.track("eeg_workers", asyncio.gather(executor.warm_up(), asyncio.to_thread(warm_up_eeg_in_process)))
+
+def load_speech_scorer():
+    if load_speech_model()[0] is None:
+        raise ComponentUnavailable("speech model not found")
+
+def warm_up_speech_in_process():
+    """Decoding, resampling and VAD, which run in the server process."""
+    sr = 44100
+    t = np.arange(sr) / sr
+    tone = (0.1 * np.sin(2 * np.pi * 150 * t) * (t > 0.3)).astype(np.float32)
+    detect_speech_start(AudioBuffer(tone, sr))
+
+async def warm_up_speech_workers():
+    await asyncio.gather(warm_up_speech_pool(), asyncio.to_thread(warm_up_speech_in_process))
+
+def load_transcription():
+    backend = get_transcription_backend()
+    if isinstance(backend, DummyBackend):
+        raise ComponentUnavailable("TRANSCRIPTION_BACKEND=dummy (fixed test transcriptions)")
+    if isinstance(backend, LocalWhisperBackend):
+        backend.warm_up()
+
+async def warm_up():
+    """Worker pools and speech components, loaded concurrently with each other and the EEG model."""
+    await asyncio.gather(
+        warm_up_eeg_workers(),
+        readiness.track("speech_model", asyncio.to_thread(load_speech_scorer)),
+        readiness.track("speech_workers", warm_up_speech_workers()),
+        readiness.track("nlp", asyncio.to_thread(get_nlp)),
+        readiness.track("transcription", asyncio.to_thread(load_transcription)),
+    )
+
+async def wait_for_model():
+    """
+    Holds a request that arrives while the model is still loading, for at
+    most MODEL_LOAD_TIMEOUT_SEC, rather than rejecting it.
+    """
+    if model_task is not None and not model_task.done():
+        await asyncio.wait([model_task], timeout=MODEL_LOAD_TIMEOUT_SEC)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Load model on startup
-    global model, scaler
-    model_path = os.path.join("models", "eeg_best_model.joblib")
-    # scaler_path = os.path.join("models", "eeg_scaler.joblib") # If scaler is separate
-
-    try:
-        # Check if model exists (it might not if notebooks haven't run)
-        if os.path.exists(model_path):
-            model = joblib.load(model_path)
-            print(f"Model loaded from {model_path}")
-        else:
-            print(f"Warning: Model not found at {model_path}. Inference will fail.")
-
-    except Exception as e:
-        print(f"Error loading model: {e}")
+    # The server accepts requests immediately; models load in the background
+    global model_task
+    model_task = asyncio.create_task(readiness.track("eeg_model", start_model()))
+    if STARTUP_WARM_UP:
+        warm_up_task = asyncio.create_task(warm_up())
+    else:
+        warm_up_task = None
+        for component in readiness.COMPONENTS:
+            if component != "eeg_model":
+                readiness.set_state(component, readiness.ON_DEMAND)
 
     yield
-    # Clean up if needed
+
+    for task in (model_task, warm_up_task):
+        if task is not None:
+            task.cancel()
+    if executor is not None:
+        await executor.shutdown()
+    await asyncio.to_thread(shutdown_speech_pool)
+    shutdown_transcription()
 
 app = FastAPI(title="CogniSafe EEG Screener", lifespan=lifespan)
 
 app.include_router(speech_analysis.router)
+app.include_router(speech_stream.router)
 app.include_router(cognitive_games.router)
 app.include_router(unified_analysis.router)
 
@@ -64,74 +185,177 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Added last so it is outermost and also times CORS handling
+app.add_middleware(MetricsMiddleware)
+instrument_sessions(SessionLocal)
+
+def simulated_chunks(first_size: int, hop_size: int, n_channels: int):
+    """Random noise source for /ws/simulate: one full window, then hop-sized chunks."""
+    yield np.random.randn(first_size, n_channels)
+    while True:
+        # We generate slightly different noise to vary the probability
+        noise_level = np.random.uniform(0.5, 2.0)
+        yield np.random.randn(hop_size, n_channels) * noise_level
 
 @app.websocket("/ws/simulate")
-async def websocket_endpoint(websocket: WebSocket):
+async def websocket_endpoint(
+    websocket: WebSocket,
+    hop_sec: float = 1.0,
+    frame_format: str = Query("json", alias="format"),
+    dtype: str = "float32",
+    preview_width: int = 0,
+    replay: Optional[str] = None,
+    speed: float = 1.0,
+    loop: bool = True
+):
+    """
+    Live EEG simulation, or replay of a stored recording.
+
+    Query parameters:
+        hop_sec: seconds of signal between updates (>= MIN_STREAM_HOP_SEC).
+        format: "json" (text frames, default) or "binary" (see ws_framing).
+        dtype: sample encoding of binary frames: float32, float16 or int16
+            (float16 and int16 are peak-scaled; see ws_framing.encode_samples).
+        preview_width: if > 0, send a min/max decimated preview of about this
+            many points per channel instead of every sample of the window.
+        replay: name of a recording in RECORDINGS_DIR to stream instead of noise.
+        speed: playback speed multiplier (1 = real time, up to MAX_REPLAY_SPEED).
+        loop: restart the recording when it ends (otherwise close the stream).
+    """
     await websocket.accept()
-    try:
-        # Simulate a session
-        # In a real app, we might receive a file ID to stream, or stream from a device
-        # Here we generate dummy data on the fly to simulate a live feed
 
+    if frame_format not in ("json", "binary") or dtype not in FRAME_DTYPES:
+        await websocket.send_text(json.dumps({"error": f"Unsupported format/dtype: {frame_format}/{dtype}"}))
+        await websocket.close()
+        return
+
+    # Frames are produced on every tick but only the latest unsent one is kept
+    sender = LatestFrameSender(websocket)
+    sender_task = asyncio.create_task(sender.run())
+
+    try:
         fs = 256
-        window_size = 4 * fs # 4 seconds
         n_channels = 16
 
-        while True:
-            # Generate dummy chunk (replace with real file reading logic if needed)
-            # We generate slightly different noise to vary the probability
-            noise_level = np.random.uniform(0.5, 2.0)
-            chunk = np.random.randn(window_size, n_channels) * noise_level
+        # Each tick advances the 4-second analysis window by hop_sec (sub-second
+        # rates are supported); the engine buffers the latest window
+        engine = StreamingFeatureEngine(n_channels=n_channels, fs=fs, window_size_sec=4)
+        hop_size = int(min(max(hop_sec, MIN_STREAM_HOP_SEC), 4) * fs)
+        tick_sec = hop_size / fs / min(max(speed, 0.1), MAX_REPLAY_SPEED)
 
-            # Run inference on this chunk
+        if replay:
+            # Decoded once per process and shared (memory-mapped) by all viewers
+            try:
+                recording = await run_in_threadpool(load_recording, replay)
+                chunks = replay_chunks(recording, engine.window_size, hop_size, loop)
+            except (ValueError, HTTPException) as e:
+                await websocket.send_text(json.dumps({"error": f"Cannot replay {replay}: {e}"}))
+                return
+        else:
+            # Here we generate dummy data on the fly to simulate a live feed
+            chunks = simulated_chunks(engine.window_size, hop_size, n_channels)
+
+        # Fill the first window so the first tick can be scored immediately
+        engine.push(next(chunks))
+        await wait_for_model()
+
+        # Stops when the client goes away (the sender fails on send) or a
+        # non-looping replay ends
+        while not sender_task.done():
+            chunk = next(chunks, None)
+            if chunk is None:
+                break
+            engine.push(chunk)
+
+            # Run inference on the current window
             # We need to handle the potential errors gracefully inside the loop
             try:
-                features = extract_features_from_segment(chunk, fs=fs)
-                features_reshaped = features.reshape(1, -1)
-
                 if model:
-                    status_class = int(model.predict(features_reshaped)[0])
-                    probability = float(model.predict_proba(features_reshaped)[0][1])
-
-                    if probability < 0.3:
-                        risk_level = "Low"
-                    elif probability < 0.7:
-                        risk_level = "Medium"
-                    else:
-                        risk_level = "High"
-
-                    response = {
-                        "timestamp": np.random.randint(0, 10000), # Mock timestamp
-                        "status_class": status_class,
-                        "probability": probability,
-                        "risk_level": risk_level,
-                        "raw_chunk": chunk.tolist() # Send raw data for visualization (careful with size)
+                    # Only the Welch segments ending in new data are transformed,
+                    # in the process pool (off the server's GIL) and batched with
+                    # the other live sessions' segments; the rest are cached
+                    with stage_timer("features"):
+                        starts, segments = engine.missing_segments()
+                        if starts:
+                            engine.add_spectra(starts, await executor.segment_spectra(segments, fs))
+                        features = engine.features()
+
+                    # Scored together with the other live sessions' windows
+                    prediction = prediction_from_proba(await executor.score(features))
+
+                    metadata = {
+                        "timestamp": engine.total_samples / fs, # Stream time of the window end (s)
+                        "status_class": prediction.status_class,
+                        "probability": prediction.probability,
+                        "risk_level": prediction.risk_level,
+                        "dropped_frames": sender.dropped_frames
                     }
+                    # Raw data for visualization, decimated to the client's plot width if requested
+                    samples = decimate_minmax(engine.window().T, preview_width)
 
-                    await websocket.send_text(json.dumps(response))
+                    if frame_format == "binary":
+                        sender.offer(encode_binary_frame(metadata, samples, dtype))
+                    else:
+                        sender.offer(json.dumps({**metadata, "raw_chunk": samples.tolist()}))
                 else:
-                    await websocket.send_text(json.dumps({"error": "Model not loaded"}))
+                    sender.offer(json.dumps({"error": "Model not loaded"}))
 
             except Exception as e:
-                await websocket.send_text(json.dumps({"error": str(e)}))
+                sender.offer(json.dumps({"error": str(e)}))
+
+            # Wait for the hop before next chunk (real time, or faster for replays)
+            await asyncio.sleep(tick_sec)
 
-            # Wait for 1 second before next chunk (simulating real-time)
-            await asyncio.sleep(1)
+        if sender_task.done():
+            sender_task.result()
+        else:
+            # Replay finished: deliver the last frame before closing
+            await sender.join()
 
     except Exception as e:
         print(f"WebSocket error: {e}")
     finally:
+        sender_task.cancel()
         await websocket.close()
 
 
 
+@app.get("/recordings")
+def get_recordings():
+    """Recordings available for /ws/simulate?replay=<name>"""
+    return {"recordings": list_recordings()}
+
 @app.get("/health")
 def health_check():
-    return {"status": "healthy", "model_loaded": model is not None}
+    """
+    Liveness and readiness: ready is true once every component has loaded
+    (or is unavailable by configuration, or loads on demand) and none has
+    failed, so it can back a readiness probe; see readiness.py.
+    """
+    return {
+        "status": "healthy",
+        "model_loaded": model is not None,
+        "ready": readiness.all_ready(),
+        "components": readiness.components()
+    }
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Request and pipeline-stage latencies in Prometheus text format."""
+    return Response(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+def get_risk_level(probability: float) -> str:
+    if probability < 0.3:
+        return "Low"
+    elif probability < 0.7:
+        return "Medium"
+    else:
+        return "High"
 
-def run_inference(eeg_data: np.ndarray, fs: int):
+def validate_eeg(eeg_data: np.ndarray):
     if model is None:
-        raise HTTPException(status_code=503, detail="Model not loaded")
+        loading = model_task is not None and not model_task.done()
+        raise HTTPException(status_code=503, detail="Model is still loading" if loading else "Model not loaded")
 
     # Check shape
     if eeg_data.ndim != 2:
@@ -140,57 +364,173 @@ def run_inference(eeg_data: np.ndarray, fs: int):
     if eeg_data.shape[1] != 16:
         raise HTTPException(status_code=400, detail=f"EEG data must have 16 channels. Got {eeg_data.shape[1]}")
 
-    # Extract features
-    features = extract_features_from_segment(eeg_data, fs=fs)
-
-    # Reshape for prediction (1, n_features)
-    features_reshaped = features.reshape(1, -1)
-
-    # Predict
-    status_class = int(model.predict(features_reshaped)[0])
-    probability = float(model.predict_proba(features_reshaped)[0][1])
-
-    # Determine risk level
-    if probability < 0.3:
-        risk_level = "Low"
-    elif probability < 0.7:
-        risk_level = "Medium"
-    else:
-        risk_level = "High"
+def prediction_from_proba(proba: np.ndarray) -> PredictionResponse:
+    # Same class as model.predict_with_proba: the most probable one
+    status_class = int(model.classes_[np.argmax(proba)])
+    probability = float(proba[1])
 
     return PredictionResponse(
         status_class=status_class,
         probability=probability,
-        risk_level=risk_level,
+        risk_level=get_risk_level(probability),
         model_version="v1.0"
     )
 
-@app.post("/predict", response_model=PredictionResponse)
-def predict_eeg(request: EEGSampleRequest):
+async def run_inference(eeg_data: np.ndarray, fs: int):
+    await wait_for_model()
+    validate_eeg(eeg_data)
+
+    # Extract features in the worker pool, score micro-batched with other requests
+    features = await executor.extract_features(eeg_data[np.newaxis], fs)
+    return prediction_from_proba(await executor.score(features[0]))
+
+async def extract_windowed_features(eeg_data: np.ndarray, fs: int) -> np.ndarray:
+    """
+    Features of every window of a whole recording, [n_windows, n_features].
+
+    Windows are strided views of the recording; features are extracted in
+    chunks across the worker pool. Recordings shorter than one window are
+    scored as one segment, as before.
+    """
+    await wait_for_model()
+    validate_eeg(eeg_data)
+
+    windows = segment_array(eeg_data, WINDOW_SIZE_SEC, STEP_SIZE_SEC, fs)
+    if len(windows) == 0:
+        windows = eeg_data[np.newaxis]
+
+    return await executor.extract_features(windows, fs)
+
+async def score_windowed_features(features: np.ndarray):
+    """
+    Scores all windows with a single predict_proba call and aggregates.
+    """
+    await wait_for_model()
+    if model is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+
+    # [n_windows, n_classes]
+    window_proba = await executor.predict_proba(features)
+    aggregate = prediction_from_proba(window_proba.mean(axis=0))
+
+    return WindowedPredictionResponse(
+        **aggregate.model_dump(),
+        window_size_sec=WINDOW_SIZE_SEC,
+        step_size_sec=STEP_SIZE_SEC,
+        window_start_sec=(np.arange(len(features)) * STEP_SIZE_SEC).tolist(),
+        window_probabilities=window_proba[:, 1].tolist()
+    )
+
+async def run_batch_inference(windows: np.ndarray, fs: int):
+    """
+    Score many independent windows [n_windows, samples, channels] at once.
+    """
+    if windows.ndim != 3 or len(windows) == 0:
+        raise HTTPException(status_code=400, detail="EEG batch must be a non-empty 3D array [windows, samples, channels]")
+    await wait_for_model()
+    validate_eeg(windows[0])
+
+    features = await executor.extract_features(windows, fs)
+
+    # One predict_proba call for the whole batch
+    proba = await executor.predict_proba(features)
+
+    return BatchPredictionResponse(predictions=[prediction_from_proba(row) for row in proba])
+
+async def read_eeg_request(request: Request, json_model: type[BaseModel], sampling_rate: int):
+    """
+    Decodes the EEG array of a /predict* request body, JSON or binary (see wire_format).
+
+    Returns (eeg_data, fs). Binary bodies take the sampling rate from the query string.
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type", "application/json")
+
+    with stage_timer("parse"):
+        if is_binary_content_type(content_type):
+            return decode_binary_eeg(body, content_type, request.headers.get(SHAPE_HEADER)), sampling_rate
+
+        try:
+            parsed = json_model.model_validate_json(body)
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail=e.errors())
+        return np.array(parsed.eeg), parsed.sampling_rate
+
+def eeg_request_body(json_model: type[BaseModel]) -> dict:
+    """OpenAPI request body documenting the JSON and binary encodings."""
+    binary_schema = {"schema": {"type": "string", "format": "binary"}}
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": json_model.model_json_schema()},
+                **{content_type: binary_schema for content_type in BINARY_CONTENT_TYPES},
+            },
+        }
+    }
+
+@app.post("/predict", response_model=PredictionResponse, openapi_extra=eeg_request_body(EEGSampleRequest))
+async def predict_eeg(request: Request, sampling_rate: int = 256):
     try:
-        eeg_data = np.array(request.eeg)
-        return run_inference(eeg_data, request.sampling_rate)
+        eeg_data, fs = await read_eeg_request(request, EEGSampleRequest, sampling_rate)
+        return await run_inference(eeg_data, fs)
+    except HTTPException as he:
+        raise he
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/predict_file", response_model=PredictionResponse)
+@app.post("/predict/batch", response_model=BatchPredictionResponse, openapi_extra=eeg_request_body(EEGBatchRequest))
+async def predict_eeg_batch(request: Request, sampling_rate: int = 256):
+    try:
+        windows, fs = await read_eeg_request(request, EEGBatchRequest, sampling_rate)
+        return await run_batch_inference(windows, fs)
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/predict_file", response_model=WindowedPredictionResponse)
 async def predict_file(file: UploadFile = File(...)):
     try:
         contents = await file.read()
         filename = file.filename.lower()
 
         if filename.endswith(".edf"):
-            eeg_data = parse_edf(contents)
-            # EDFs usually have their own fs, but parse_edf resamples to 256
-            fs = 256
+            file_format = "edf"
         elif filename.endswith(".csv"):
-            # Decode bytes to string for CSV
-            eeg_data = parse_csv(contents.decode('utf-8'))
-            fs = 256 # Assumption for CSVs unless specified otherwise
+            file_format = "csv"
         else:
             raise HTTPException(status_code=400, detail="Unsupported file format. Use .csv or .edf")
 
-        return run_inference(eeg_data, fs)
+        # EDFs usually have their own fs, but parse_edf resamples to 256;
+        # 256 is the assumption for CSVs unless specified otherwise
+        fs = 256
+
+        # Re-uploads of the same recording skip parsing and feature extraction
+        digest = await run_in_threadpool(content_hash, contents)
+        features_cache_key = features_key(digest, file_format, WINDOW_SIZE_SEC, STEP_SIZE_SEC)
+        cached = await run_in_threadpool(feature_cache.get, features_cache_key)
+        if cached is not None:
+            return await score_windowed_features(cached["features"])
+
+        parsed_cache_key = parsed_key(digest, file_format)
+        cached = await run_in_threadpool(feature_cache.get, parsed_cache_key)
+        if cached is not None:
+            eeg_data = cached["eeg"]
+        else:
+            # Parsing runs in the threadpool to keep the event loop free
+            if file_format == "edf":
+                eeg_data = await run_in_threadpool(parse_edf, contents)
+            else:
+                # Decode bytes to string for CSV
+                eeg_data = await run_in_threadpool(parse_csv, contents.decode('utf-8'))
+            eeg_data = np.asarray(eeg_data)
+            await run_in_threadpool(feature_cache.put, parsed_cache_key, {"eeg": eeg_data})
+
+        features = await extract_windowed_features(eeg_data, fs)
+        await run_in_threadpool(feature_cache.put, features_cache_key, {"features": features})
+
+        return await score_windowed_features(features)
 
     except HTTPException as he:
         raise he
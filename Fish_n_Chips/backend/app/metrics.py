@@ -0,0 +1,288 @@
+"""
+Request and pipeline-stage instrumentation, exposed in Prometheus text
+format at /metrics.
+
+Metrics:
+    cognisafe_http_requests_total{method, route, status}
+    cognisafe_http_request_duration_seconds{method, route}
+    cognisafe_stage_duration_seconds{stage}
+    cognisafe_inference_batch_size
+
+Routes are labelled by their template (/api/speech/results/{session_id}),
+not the raw path, so label cardinality stays bounded.
+
+Histograms keep one preallocated count per bucket; an observation is a
+bisect plus three increments under a per-series lock, with no allocation.
+Stage series are created up front, and request series on the first request
+of each route.
+"""
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from functools import wraps
+from typing import Dict, List, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; spans a cached /predict (~1 ms) to a long EDF upload or Whisper call
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+STAGES = (
+    "parse",           # parse_edf / parse_csv / request body decoding (includes resample)
+    "resample",
+    "features",        # feature extraction, including worker pool queueing
+    "score",           # one micro-batched predict_proba call
+    "transcribe",      # Whisper
+    "pause_analysis",
+    "speech_onset",    # server-side reaction time (VAD)
+    "db_commit",
+)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class _CounterSeries:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class _HistogramSeries:
+    __slots__ = ("bounds", "counts", "sum", "count", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        # counts[i]: observations in (bounds[i-1], bounds[i]]; the last is +Inf
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        i = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def time(self) -> "_Timer":
+        return _Timer(self)
+
+
+class _Timer:
+    """Context manager observing the elapsed seconds of its block."""
+    __slots__ = ("_series", "_start")
+
+    def __init__(self, series: _HistogramSeries):
+        self._series = series
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._series.observe(time.perf_counter() - self._start)
+        return False
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._series: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    @abstractmethod
+    def _new_series(self):
+        ...
+
+    @abstractmethod
+    def _render_series(self, values: Tuple[str, ...], series) -> List[str]:
+        ...
+
+    def labels(self, *values: str):
+        """The series for one combination of label values (created on first use)."""
+        series = self._series.get(values)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(values, self._new_series())
+        return series
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, series in list(self._series.items()):
+            lines.extend(self._render_series(values, series))
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_series(self) -> _CounterSeries:
+        return _CounterSeries()
+
+    def _render_series(self, values, series: _CounterSeries) -> List[str]:
+        return [f"{self.name}_total{_format_labels(self.label_names, values)} {_format_value(series.value)}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, label_names)
+
+    def _new_series(self) -> _HistogramSeries:
+        return _HistogramSeries(self.buckets)
+
+    def _render_series(self, values, series: _HistogramSeries) -> List[str]:
+        with series._lock:
+            counts, total, count = list(series.counts), series.sum, series.count
+
+        names = self.label_names + ("le",)
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            labels = _format_labels(names, values + (_format_value(bound),))
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.label_names, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+REGISTRY: List[_Metric] = []
+
+HTTP_REQUESTS = Counter(
+    "cognisafe_http_requests", "HTTP requests by route and status.", ["method", "route", "status"]
+)
+HTTP_LATENCY = Histogram(
+    "cognisafe_http_request_duration_seconds", "HTTP request latency by route.", ["method", "route"]
+)
+STAGE_LATENCY = Histogram(
+    "cognisafe_stage_duration_seconds", "Latency of individual pipeline stages.", ["stage"]
+)
+INFERENCE_BATCH_SIZE = Histogram(
+    "cognisafe_inference_batch_size", "Feature rows per micro-batched model call.", buckets=BATCH_SIZE_BUCKETS
+)
+
+_stage_series = {stage: STAGE_LATENCY.labels(stage) for stage in STAGES}
+
+
+def stage_timer(stage: str) -> _Timer:
+    """
+    Times a block as one stage:
+
+        with stage_timer("parse"):
+            ...
+    """
+    return _stage_series[stage].time()
+
+
+def timed(stage: str):
+    """Decorator timing every call of a (sync) function as one stage."""
+    series = _stage_series[stage]
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                series.observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    """Records a stage duration measured elsewhere (e.g. across callbacks)."""
+    _stage_series[stage].observe(seconds)
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording count and latency of every HTTP request.
+
+    Latency runs until the response body is fully sent. Requests that match
+    no route are grouped under route="unmatched".
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            HTTP_LATENCY.labels(method, route).observe(time.perf_counter() - start)
+            HTTP_REQUESTS.labels(method, route, str(status)).inc()
+
+
+def instrument_sessions(session_factory) -> None:
+    """
+    Times every commit of sessions from session_factory (a sessionmaker) as
+    the db_commit stage, whichever router issues it.
+    """
+    from sqlalchemy import event
+
+    @event.listens_for(session_factory, "before_commit")
+    def commit_started(session):
+        session.info["commit_start"] = time.perf_counter()
+
+    @event.listens_for(session_factory, "after_commit")
+    def commit_finished(session):
+        start = session.info.pop("commit_start", None)
+        if start is not None:
+            observe_stage("db_commit", time.perf_counter() - start)
@@ -0,0 +1,89 @@
+"""
+Startup readiness of the slow-to-load components, reported by /health.
+
+The server answers requests as soon as the app is imported: the heavy
+libraries and models are not imported at module level but loaded by a
+background warm-up task right after startup (or on first use, when the
+warm-up is off), so time-to-first-request stays short on a cold start.
+
+Components:
+    eeg_model       EEG classifier (joblib load + flattening)
+    eeg_workers     feature extraction process pool and scoring thread
+    speech_model    speech risk model
+    speech_workers  acoustic/pause analysis process pool, VAD and resampling
+    nlp             spaCy pipeline
+    transcription   transcription backend (local Whisper model)
+
+States:
+    pending      not loaded yet
+    loading      being loaded by the warm-up
+    ready        loaded
+    on_demand    warm-up disabled; loads on first use
+    unavailable  not configured or missing files (the feature degrades)
+    failed       loading raised (detail has the error)
+"""
+import threading
+import time
+from typing import Any, Awaitable, Dict, Optional
+
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+ON_DEMAND = "on_demand"
+UNAVAILABLE = "unavailable"
+FAILED = "failed"
+
+COMPONENTS = ("eeg_model", "eeg_workers", "speech_model", "speech_workers", "nlp", "transcription")
+
+
+class ComponentUnavailable(Exception):
+    """Raised by a loader when its component is not configured or has no files."""
+
+
+_states: Dict[str, Dict[str, Any]] = {name: {"state": PENDING} for name in COMPONENTS}
+_lock = threading.Lock()
+
+
+def set_state(component: str, state: str, detail: Optional[str] = None, seconds: Optional[float] = None) -> None:
+    entry: Dict[str, Any] = {"state": state}
+    if detail:
+        entry["detail"] = detail
+    if seconds is not None:
+        entry["load_seconds"] = round(seconds, 3)
+    with _lock:
+        _states[component] = entry
+
+
+def components() -> Dict[str, Dict[str, Any]]:
+    """State of every component (a copy)."""
+    with _lock:
+        return {name: dict(entry) for name, entry in _states.items()}
+
+
+def all_ready() -> bool:
+    """
+    True once every component is ready, loads on demand or is unavailable by
+    configuration. False while any is pending or loading, or if any failed.
+    """
+    with _lock:
+        return all(entry["state"] not in (PENDING, LOADING, FAILED) for entry in _states.values())
+
+
+async def track(component: str, work: Awaitable) -> None:
+    """
+    Awaits a component's loader, recording its state and load time.
+
+    Errors are recorded (and printed), never raised, so one component
+    failing does not stop the others from warming up.
+    """
+    set_state(component, LOADING)
+    start = time.perf_counter()
+    try:
+        await work
+    except ComponentUnavailable as e:
+        set_state(component, UNAVAILABLE, str(e))
+    except Exception as e:
+        print(f"Error loading {component}: {e}")
+        set_state(component, FAILED, f"{type(e).__name__}: {e}", time.perf_counter() - start)
+    else:
+        set_state(component, READY, seconds=time.perf_counter() - start)
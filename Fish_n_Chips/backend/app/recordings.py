@@ -0,0 +1,128 @@
+"""
+Stored EEG recordings for websocket replay.
+
+Each recording is decoded once (EDF/CSV -> [samples, channels] at TARGET_SFREQ),
+cached as .npy next to the source and then memory-mapped read-only. The cache
+file name carries the parse version (see feature_cache.py), so a parser or
+resampler change decodes the recording again. The
+memmap is kept in a process-wide registry, so every client replaying the same
+recording shares one copy of the pages instead of decoding it per connection.
+"""
+import os
+import re
+import threading
+import numpy as np
+from typing import Dict, Iterator, List
+
+from .data_processing import parse_edf, parse_csv, REQUIRED_CHANNELS
+from .feature_cache import PARSE_VERSION
+
+RECORDINGS_DIR = os.getenv("EEG_RECORDINGS_DIR", "recordings")
+CACHE_DIRNAME = ".decoded"
+
+SUPPORTED_EXTENSIONS = (".edf", ".csv", ".npy")
+
+_recordings: Dict[str, np.ndarray] = {}
+_lock = threading.Lock()
+
+
+def list_recordings() -> List[str]:
+    if not os.path.isdir(RECORDINGS_DIR):
+        return []
+    return sorted(name for name in os.listdir(RECORDINGS_DIR) if name.lower().endswith(SUPPORTED_EXTENSIONS))
+
+
+def _decode(path: str) -> np.ndarray:
+    if path.lower().endswith(".edf"):
+        # parse_edf memory-maps the file itself
+        return parse_edf(path)
+    with open(path, "r") as f:
+        return parse_csv(f.read())
+
+
+def _remove_stale_decodes(cache_dir: str, name: str, current_path: str) -> None:
+    """Deletes decodes of a recording made by other parse versions."""
+    # <name>.npy from before versioning, or <name>.<version>.npy
+    pattern = re.compile(re.escape(name) + r"(\.[0-9a-f]{16})?\.npy")
+    for entry in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, entry)
+        if path != current_path and pattern.fullmatch(entry):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def load_recording(name: str) -> np.ndarray:
+    """
+    Returns the shared, read-only [samples, channels] array of a recording.
+
+    .npy recordings are expected to hold [samples, channels] at 256 Hz already.
+    Raises ValueError for unknown or malformed recordings.
+    """
+    # Only plain file names inside RECORDINGS_DIR
+    if os.path.basename(name) != name or not name.lower().endswith(SUPPORTED_EXTENSIONS):
+        raise ValueError(f"Invalid recording name: {name}")
+
+    path = os.path.join(RECORDINGS_DIR, name)
+    if not os.path.isfile(path):
+        raise ValueError(f"Recording not found: {name}")
+
+    with _lock:
+        if name in _recordings:
+            return _recordings[name]
+
+        if name.lower().endswith(".npy"):
+            cache_path = path
+        else:
+            cache_dir = os.path.join(RECORDINGS_DIR, CACHE_DIRNAME)
+            cache_path = os.path.join(cache_dir, f"{name}.{PARSE_VERSION}.npy")
+            if not os.path.exists(cache_path) or os.path.getmtime(cache_path) < os.path.getmtime(path):
+                os.makedirs(cache_dir, exist_ok=True)
+                data = np.ascontiguousarray(_decode(path), dtype=np.float64)
+                tmp_path = cache_path + ".tmp.npy"
+                np.save(tmp_path, data)
+                os.replace(tmp_path, cache_path)
+                _remove_stale_decodes(cache_dir, name, cache_path)
+
+        recording = np.load(cache_path, mmap_mode="r")
+        if recording.ndim != 2 or recording.shape[1] != len(REQUIRED_CHANNELS):
+            raise ValueError(f"Recording must be [samples, {len(REQUIRED_CHANNELS)}], got shape {recording.shape}")
+
+        _recordings[name] = recording
+        return recording
+
+
+def replay_chunks(recording: np.ndarray, first_size: int, hop_size: int, loop: bool = True) -> Iterator[np.ndarray]:
+    """
+    Yields the first `first_size` samples, then `hop_size` samples per step.
+
+    Chunks are views into the shared recording. With loop=True playback
+    wraps around at the end, otherwise the iterator stops. Raises ValueError
+    right away (not on the first next()) if the recording is shorter than
+    `first_size`.
+    """
+    n_samples = len(recording)
+    if n_samples < first_size:
+        raise ValueError(f"Recording is shorter than one window ({n_samples} < {first_size} samples)")
+
+    return _replay_chunks(recording, first_size, hop_size, loop)
+
+
+def _replay_chunks(recording: np.ndarray, first_size: int, hop_size: int, loop: bool) -> Iterator[np.ndarray]:
+    n_samples = len(recording)
+    yield recording[:first_size]
+    pos = first_size
+
+    while True:
+        if pos + hop_size > n_samples:
+            if not loop:
+                return
+            # Wrap around: the window slides across the seam into the start
+            head = recording[pos:]
+            pos = hop_size - len(head)
+            yield np.concatenate([head, recording[:pos]])
+            continue
+
+        yield recording[pos:pos + hop_size]
+        pos += hop_size
@@ -0,0 +1,138 @@
+"""
+Rational polyphase resampling for EEG recordings.
+
+Common EEG rates are small rational multiples of TARGET_SFREQ (500 Hz -> 256
+Hz is 64/125, 512 -> 1/2, 1000 -> 32/125), so instead of an FFT over the
+whole recording the signal is low-pass filtered and decimated with a
+polyphase FIR (scipy.signal.upfirdn). The filter is designed once per
+up/down ratio and cached.
+
+The recording is processed in blocks of output samples, each reading just
+the input samples its filter taps reach, so memory and cost grow linearly
+with the recording and no full-length FFT is ever needed. The result is
+identical to scipy.signal.resample_poly(..., padtype="mean") on the whole
+signal: the per-channel mean is removed before filtering and added back,
+which avoids edge ringing from zero-padding a DC offset.
+
+Rates that are not a small rational multiple of the target fall back to
+MNE's FFT resampler.
+"""
+import math
+import numpy as np
+from fractions import Fraction
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+
+# Largest up or down factor handled by the polyphase path (filter length
+# grows with it: 20 * factor + 1 taps)
+MAX_POLYPHASE_FACTOR = 1000
+
+# Output samples per channel computed per upfirdn call
+OUTPUT_BLOCK_SAMPLES = 65536
+
+# Kaiser window of the anti-aliasing filter (scipy.signal.resample_poly's default)
+FILTER_WINDOW = ("kaiser", 5.0)
+
+
+class PolyphaseFilter(NamedTuple):
+    up: int
+    down: int
+    # Anti-aliasing FIR, scaled by up and zero-padded in front so that
+    # output sample n of the resampled signal is upfirdn output n + offset
+    taps: np.ndarray
+    offset: int
+
+
+def rational_ratio(orig_sfreq: float, target_sfreq: float) -> Optional[Tuple[int, int]]:
+    """
+    (up, down) with target = orig * up / down in lowest terms, or None when
+    either factor exceeds MAX_POLYPHASE_FACTOR.
+    """
+    ratio = Fraction(target_sfreq) / Fraction(orig_sfreq)
+    if max(ratio.numerator, ratio.denominator) > MAX_POLYPHASE_FACTOR:
+        return None
+    return ratio.numerator, ratio.denominator
+
+
+@lru_cache(maxsize=32)
+def polyphase_filter(up: int, down: int) -> PolyphaseFilter:
+    """
+    Anti-aliasing filter design for one up/down ratio (cached).
+
+    Same design and alignment as scipy.signal.resample_poly.
+    """
+    from scipy.signal import firwin
+    max_rate = max(up, down)
+    half_len = 10 * max_rate
+    taps = firwin(2 * half_len + 1, 1.0 / max_rate, window=FILTER_WINDOW) * up
+
+    pre_pad = down - half_len % down
+    taps = np.concatenate([np.zeros(pre_pad), taps])
+    taps.setflags(write=False)
+    return PolyphaseFilter(up, down, taps, (half_len + pre_pad) // down)
+
+
+def resampled_length(n_samples: int, up: int, down: int) -> int:
+    return -(-n_samples * up // down)
+
+
+def resample_polyphase(data: np.ndarray, up: int, down: int, block_samples: int = OUTPUT_BLOCK_SAMPLES) -> np.ndarray:
+    """
+    Resamples [..., samples] by up/down along the last axis, block by block.
+
+    Args:
+        data: array [..., n_samples]
+        up, down: coprime resampling factors
+        block_samples: output samples per channel per block
+
+    Returns:
+        float64 array [..., ceil(n_samples * up / down)]
+    """
+    data = np.asarray(data, dtype=np.float64)
+    if up == down:
+        return data.copy()
+
+    lead_shape, n_in = data.shape[:-1], data.shape[-1]
+    x = data.reshape(-1, n_in)
+    n_out = resampled_length(n_in, up, down)
+    out = np.empty((x.shape[0], n_out))
+
+    from scipy.signal import upfirdn
+    filt = polyphase_filter(up, down)
+    n_taps = len(filt.taps)
+    background = x.mean(axis=1, keepdims=True)
+
+    for start in range(0, n_out, block_samples):
+        stop = min(start + block_samples, n_out)
+        # Output j of the full upfirdn sums x[i] * taps[j * down - i * up]
+        j0, j1 = start + filt.offset, stop + filt.offset
+
+        # First input sample reaching output j0, rounded down to a multiple
+        # of `down` so block outputs line up with whole-signal outputs
+        first = max(0, math.ceil((j0 * down - n_taps + 1) / up))
+        first -= first % down
+        last = min(n_in, (j1 - 1) * down // up + 1)
+        shift = first * up // down
+
+        block = upfirdn(filt.taps, x[:, first:last] - background, up, down, axis=1)
+        # Past the end of the input the filtered signal is zero
+        block = block[:, j0 - shift:j1 - shift]
+        out[:, start:start + block.shape[1]] = block
+        out[:, start + block.shape[1]:stop] = 0
+
+    out += background
+    return out.reshape(*lead_shape, n_out)
+
+
+def resample(data: np.ndarray, orig_sfreq: float, target_sfreq: float) -> np.ndarray:
+    """
+    Resamples [..., samples] from orig_sfreq to target_sfreq along the last axis.
+
+    Polyphase for rational rate ratios, MNE's FFT resampler otherwise.
+    """
+    ratio = rational_ratio(orig_sfreq, target_sfreq)
+    if ratio is None:
+        # Rare path; mne is slow to import
+        import mne
+        return mne.filter.resample(data, up=target_sfreq, down=orig_sfreq, npad="auto")
+    return resample_polyphase(data, *ratio)
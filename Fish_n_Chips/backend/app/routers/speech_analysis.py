@@ -1,10 +1,9 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, Form, Depends
+from fastapi.concurrency import run_in_threadpool
 from typing import Optional
 from sqlalchemy.orm import Session
+import asyncio
 import uuid
-import shutil
-import os
-import tempfile
 from Levenshtein import ratio
 from datetime import datetime
 
@@ -14,14 +13,15 @@ from backend.app.models.schemas import (
     AudiometryRequest, AudiometryResponse, SpeechResultsResponse
 )
 
-from backend.app.services.speech.whisper_service import transcribe_with_timestamps
+from backend.app.services.speech.whisper_service import transcribe_with_timestamps_async
 from backend.app.services.speech.vad_service import detect_speech_start
-from backend.app.services.speech.feature_extractor import extract_acoustic_features, extract_linguistic_features
-from backend.app.services.speech.pause_analyzer import analyze_pauses
+from backend.app.services.speech.feature_extractor import extract_linguistic_features
 from backend.app.services.speech.audiometry_service import adaptive_threshold_test
 from backend.app.services.speech.speech_scorer import calculate_ml_risk_score
-from backend.app.utils.audio_utils import convert_audio_format
+from backend.app.services.speech.signal_analysis import analyze_signal
+from backend.app.utils.audio_utils import AudioBuffer, convert_audio_format
 from backend.app.database import get_db
+from backend.app.metrics import stage_timer
 from backend.app.models.db_models import SpeechTestResult, SentenceRecording
 
 router = APIRouter(
@@ -71,123 +71,140 @@ async def analyze_speech(
     session_id: str = Form(...),
     stimulus_sentence: str = Form(...),
     audio_end_timestamp: float = Form(...), # Client-side timestamp when recording stopped
-    speech_start_timestamp: float = Form(...), # Client-side timestamp when user started speaking (optional fallback)
+    speech_start_timestamp: Optional[float] = Form(None), # Client-measured reaction time, used if VAD finds no speech
     file: UploadFile = File(...),
     db: Session = Depends(get_db)
 ):
-    # 1. Save temp file
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp:
-        shutil.copyfileobj(file.file, tmp)
-        tmp_path = tmp.name
-
+    # 1. Decode the upload once (off the event loop); every analyzer shares the buffer
+    contents = await file.read()
     try:
-        # 2. Transcribe (Whisper)
-        transcription_result = transcribe_with_timestamps(tmp_path)
-        transcription_text = transcription_result["text"]
-        word_timestamps = transcription_result["words"]
-
-        # 3. Calculate Reaction Time
-        # Option A: Use VAD on server
-        with open(tmp_path, "rb") as f:
-            audio_bytes = f.read()
-
-        # We need raw PCM for VAD, but file is likely WAV/WebM.
-        # For simplicity, let's rely on client-side timestamps or VAD if format allows.
-        # Assuming client sends a rough timestamp, we can refine it or just use it.
-        # Let's use the client provided timestamp for now as VAD on compressed web audio is tricky without conversion.
-        # Ideally: convert to PCM -> VAD.
-
-        # Placeholder for VAD logic if we had PCM
-        # vad_start = detect_speech_start(pcm_bytes, 16000)
-
-        # Reaction time = (Time user started speaking) - (Time audio stimulus ended)
-        # This requires client to send both.
-        # Let's assume the client sends the calculated reaction time or we calculate it here.
-        # Actually, the prompt says "detect_speech_start" is in VAD service.
-        # Let's assume we use the client's speech_start_timestamp for now to be safe,
-        # as converting WebM/WAV to 16k mono PCM for webrtcvad requires ffmpeg/pydub which we have.
-
-        # Simple fallback:
-        reaction_time_ms = speech_start_timestamp # Client calculated or passed raw
-
-        # 4. Accuracy (Levenshtein)
-        # Normalize strings
-        ref = stimulus_sentence.lower().strip(".,!?")
-        hyp = transcription_text.lower().strip(".,!?")
-        accuracy = ratio(ref, hyp) * 100
-
-        # 5. Features
-        acoustic_features = extract_acoustic_features(tmp_path)
-        linguistic_features = extract_linguistic_features(transcription_text)
-
-        # 6. Pauses - Use AUDIO-BASED detection (more accurate than Whisper timestamps)
-        from backend.app.services.speech.pause_analyzer import detect_pauses_from_audio
-        pause_analysis = detect_pauses_from_audio(tmp_path, min_silence_duration=0.3)
-
-        # 7. ML-Based Scoring (with improved pause analysis)
-        scores = calculate_ml_risk_score(
-            reaction_time_ms=reaction_time_ms,
-            speech_rate_wpm=acoustic_features.get("speech_rate_wpm", 120),
-            pause_analysis=pause_analysis,  # Now using audio-based pauses!
-            word_accuracy=accuracy
-        )
+        audio = await run_in_threadpool(AudioBuffer.from_bytes, contents, file.filename or "audio.wav")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # 2. Transcribe (Whisper, non-blocking I/O) while acoustic features and
+    # pauses (audio-based, more accurate than Whisper timestamps) are computed
+    # in the worker pool and speech onset is found with VAD
+    async def transcribe():
+        with stage_timer("transcribe"):
+            return await transcribe_with_timestamps_async(audio)
+
+    async def speech_onset():
+        with stage_timer("speech_onset"):
+            return await run_in_threadpool(detect_speech_start, audio)
+
+    transcription_result, (acoustic_features, pause_analysis), speech_start_ms = await asyncio.gather(
+        transcribe(), analyze_signal(audio, min_silence_duration=0.3), speech_onset()
+    )
+
+    # 3. Calculate Reaction Time
+    reaction_time_ms = reaction_time(speech_start_ms, speech_start_timestamp)
+
+    return await complete_analysis(
+        db, session_id, stimulus_sentence, transcription_result, acoustic_features, pause_analysis, reaction_time_ms
+    )
+
+def reaction_time(speech_start_ms: float, client_reaction_time_ms: Optional[float]) -> float:
+    """
+    Reaction time = (Time user started speaking) - (Time audio stimulus ended).
+
+    Recording starts when the stimulus ends, so it is the speech onset in the
+    recording. The client's measurement is the fallback when VAD finds no speech.
+    """
+    if speech_start_ms >= 0:
+        return speech_start_ms
+    return client_reaction_time_ms if client_reaction_time_ms is not None else 0.0
+
+async def complete_analysis(
+    db: Session,
+    session_id: str,
+    stimulus_sentence: str,
+    transcription_result: dict,
+    acoustic_features: dict,
+    pause_analysis: dict,
+    reaction_time_ms: float
+) -> SpeechAnalysisResponse:
+    """
+    Accuracy, linguistic features and scoring of one analyzed sentence, saved
+    to the session and the database (shared by /analyze and /ws/speech).
+    """
+    transcription_text = transcription_result["text"]
+
+    # 4. Accuracy (Levenshtein)
+    # Normalize strings
+    ref = stimulus_sentence.lower().strip(".,!?")
+    hyp = transcription_text.lower().strip(".,!?")
+    accuracy = ratio(ref, hyp) * 100
+
+    # 5. Linguistic features (need the transcription), off the event loop
+    linguistic_features = await run_in_threadpool(extract_linguistic_features, transcription_text)
+
+    # 6. ML-Based Scoring (with improved pause analysis)
+    scores = calculate_ml_risk_score(
+        reaction_time_ms=reaction_time_ms,
+        speech_rate_wpm=acoustic_features.get("speech_rate_wpm", 120),
+        pause_analysis=pause_analysis,  # Now using audio-based pauses!
+        word_accuracy=accuracy
+    )
 
-        # Store result in memory
-        if session_id in sessions:
-            sessions[session_id]["results"].append({
-                "sentence": stimulus_sentence,
-                "transcription": transcription_text,
-                "accuracy": accuracy,
-                "scores": scores,
-                "acoustic_features": acoustic_features,
-                "linguistic_features": linguistic_features
-            })
-
-        # Save to database
-        sentence_index = len(sessions.get(session_id, {}).get("results", [])) - 1
-        db_recording = SentenceRecording(
-            session_id=session_id,
-            sentence_index=sentence_index,
-            stimulus_sentence=stimulus_sentence,
-            transcription=transcription_text,
-            word_accuracy=accuracy,
-            reaction_time_ms=reaction_time_ms,
-            speech_rate_wpm=acoustic_features.get("speech_rate_wpm", 0),
-            avg_pause_duration=pause_analysis["avg_pause_duration"],
-            long_pause_count=pause_analysis["long_pause_count"],
+    # Store result in memory
+    if session_id in sessions:
+        sessions[session_id]["results"].append({
+            "sentence": stimulus_sentence,
+            "transcription": transcription_text,
+            "accuracy": accuracy,
+            "scores": scores,
+            "acoustic_features": acoustic_features,
+            "linguistic_features": linguistic_features
+        })
+
+    # Save to database
+    sentence_index = len(sessions.get(session_id, {}).get("results", [])) - 1
+    db_recording = SentenceRecording(
+        session_id=session_id,
+        sentence_index=sentence_index,
+        stimulus_sentence=stimulus_sentence,
+        transcription=transcription_text,
+        word_accuracy=accuracy,
+        reaction_time_ms=reaction_time_ms,
+        speech_rate_wpm=acoustic_features.get("speech_rate_wpm", 0),
+        avg_pause_duration=pause_analysis["avg_pause_duration"],
+        long_pause_count=pause_analysis["long_pause_count"],
+        acoustic_features=acoustic_features,
+        linguistic_features=linguistic_features,
+        pause_locations=pause_analysis["pause_locations"],
+        risk_score=scores["overall_risk"],
+        risk_level=scores["risk_level"]
+    )
+    db.add(db_recording)
+    try:
+        await run_in_threadpool(db.commit)
+    except Exception:
+        # /ws/speech keeps this session for the whole connection
+        await run_in_threadpool(db.rollback)
+        raise
+    print(f"✅ Saved sentence {sentence_index + 1} to database")
+
+    return SpeechAnalysisResponse(
+        reaction_time_ms=reaction_time_ms,
+        transcription=transcription_text,
+        word_accuracy=accuracy,
+        speech_rate_wpm=acoustic_features.get("speech_rate_wpm", 0), # Need to implement wpm calc in extractor properly
+        avg_pause_duration=pause_analysis["avg_pause_duration"],
+        long_pause_count=pause_analysis["long_pause_count"],
+        pause_locations=[
+            PauseLocation(
+                after_word=f"pause_{i+1}",  # Audio-based doesn't have word context
+                duration=p["duration"]
+            ) for i, p in enumerate(pause_analysis.get("pause_locations", []))
+        ],
+        risk_score=scores["overall_risk"],
+        risk_level=scores["risk_level"],
+        features=SpeechFeatures(
             acoustic_features=acoustic_features,
-            linguistic_features=linguistic_features,
-            pause_locations=pause_analysis["pause_locations"],
-            risk_score=scores["overall_risk"],
-            risk_level=scores["risk_level"]
+            linguistic_features=linguistic_features
         )
-        db.add(db_recording)
-        db.commit()
-        print(f"✅ Saved sentence {sentence_index + 1} to database")
-
-        return SpeechAnalysisResponse(
-            reaction_time_ms=reaction_time_ms,
-            transcription=transcription_text,
-            word_accuracy=accuracy,
-            speech_rate_wpm=acoustic_features.get("speech_rate_wpm", 0), # Need to implement wpm calc in extractor properly
-            avg_pause_duration=pause_analysis["avg_pause_duration"],
-            long_pause_count=pause_analysis["long_pause_count"],
-            pause_locations=[
-                PauseLocation(
-                    after_word=f"pause_{i+1}",  # Audio-based doesn't have word context
-                    duration=p["duration"]
-                ) for i, p in enumerate(pause_analysis.get("pause_locations", []))
-            ],
-            risk_score=scores["overall_risk"],
-            risk_level=scores["risk_level"],
-            features=SpeechFeatures(
-                acoustic_features=acoustic_features,
-                linguistic_features=linguistic_features
-            )
-        )
-
-    finally:
-        os.remove(tmp_path)
+    )
 
 @router.post("/audiometry", response_model=AudiometryResponse)
 async def audiometry_test(request: AudiometryRequest):
@@ -293,11 +310,15 @@ async def export_data_csv(
 @router.get("/data/export/json")
 async def export_data_json(
     include_unlabeled: bool = True,
+    recompute_linguistic: bool = False,
     db: Session = Depends(get_db)
 ):
-    """Export detailed test data to JSON format"""
+    """
+    Export detailed test data to JSON format. With recompute_linguistic, the
+    linguistic features of all transcriptions are re-scored in one spaCy pass.
+    """
     output_path = "speech_test_data.json"
-    count = export_detailed_json(db, output_path, include_unlabeled)
+    count = await run_in_threadpool(export_detailed_json, db, output_path, include_unlabeled, recompute_linguistic)
     return {
         "message": f"Exported {count} test results to {output_path}",
         "file_path": output_path,
@@ -0,0 +1,121 @@
+"""
+Streaming speech analysis router (/ws/speech).
+
+The client streams each sentence while the user is speaking, so reaction
+time and pauses are already known when recording stops and only the
+transcription (with acoustic features computed alongside) is left.
+
+Protocol (one connection per test session, any number of sentences):
+    client -> {"type": "start", "stimulus_sentence": "...", "sample_rate": 16000,
+               "encoding": "pcm16"}
+              sample_rate: 8000, 16000, 32000 or 48000
+              encoding: "pcm16" (int16 LE) or "float32" (LE, [-1, 1]); mono
+    client -> binary frames of raw samples, any size
+    server -> {"type": "progress", "duration", "speech_onset_ms", "pause_count", ...}
+              at most every PROGRESS_INTERVAL_SEC of audio
+    client -> {"type": "stop", "speech_start_timestamp": <optional client reaction time>}
+    server -> {"type": "result", ...SpeechAnalysisResponse}
+    server -> {"type": "error", "detail": "..."} (the connection stays open)
+"""
+import asyncio
+import json
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+
+from backend.app.database import get_db
+from backend.app.metrics import stage_timer
+from backend.app.routers.speech_analysis import complete_analysis, reaction_time
+from backend.app.services.speech.signal_analysis import analyze_acoustics
+from backend.app.services.speech.streaming import SpeechStream
+from backend.app.services.speech.whisper_service import transcribe_with_timestamps_async
+
+router = APIRouter(tags=["speech"])
+
+# Seconds of audio between progress messages
+PROGRESS_INTERVAL_SEC = 0.25
+
+
+async def send_error(websocket: WebSocket, detail: str):
+    await websocket.send_text(json.dumps({"type": "error", "detail": detail}))
+
+
+@router.websocket("/ws/speech")
+async def speech_stream(websocket: WebSocket, session_id: str, db: Session = Depends(get_db)):
+    await websocket.accept()
+
+    stream = None
+    stimulus_sentence = ""
+    last_progress = 0.0
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+
+            if message.get("bytes") is not None:
+                if stream is None:
+                    await send_error(websocket, "Send a start message before audio")
+                    continue
+                try:
+                    # A few hundred microseconds per chunk, so it stays on the loop
+                    stream.push(message["bytes"])
+                except ValueError as e:
+                    stream = None
+                    await send_error(websocket, str(e))
+                    continue
+
+                if stream.duration - last_progress >= PROGRESS_INTERVAL_SEC:
+                    last_progress = stream.duration
+                    await websocket.send_text(json.dumps({"type": "progress", **stream.progress()}))
+                continue
+
+            try:
+                control = json.loads(message.get("text") or "")
+            except json.JSONDecodeError:
+                await send_error(websocket, "Control messages must be JSON")
+                continue
+
+            if control.get("type") == "start":
+                try:
+                    stream = SpeechStream(
+                        sample_rate=int(control.get("sample_rate", 16000)),
+                        encoding=control.get("encoding", "pcm16")
+                    )
+                except (TypeError, ValueError) as e:
+                    stream = None
+                    await send_error(websocket, str(e))
+                    continue
+                stimulus_sentence = control.get("stimulus_sentence", "")
+                last_progress = 0.0
+
+            elif control.get("type") == "stop":
+                if stream is None:
+                    await send_error(websocket, "No recording in progress")
+                    continue
+                audio, pause_analysis, speech_start_ms = stream.finish()
+                stream = None
+
+                async def transcribe():
+                    with stage_timer("transcribe"):
+                        return await transcribe_with_timestamps_async(audio)
+
+                try:
+                    transcription_result, acoustic_features = await asyncio.gather(
+                        transcribe(), analyze_acoustics(audio)
+                    )
+                    result = await complete_analysis(
+                        db, session_id, stimulus_sentence, transcription_result, acoustic_features, pause_analysis,
+                        reaction_time(speech_start_ms, control.get("speech_start_timestamp"))
+                    )
+                except Exception as e:
+                    await send_error(websocket, f"Analysis failed: {e}")
+                    continue
+                await websocket.send_text(json.dumps({"type": "result", **jsonable_encoder(result)}))
+
+            else:
+                await send_error(websocket, f"Unknown message type: {control.get('type')!r}")
+
+    except WebSocketDisconnect:
+        pass
@@ -5,12 +5,27 @@ class EEGSampleRequest(BaseModel):
     eeg: List[List[float]]
     sampling_rate: Optional[int] = 256
 
+class EEGBatchRequest(BaseModel):
+    # [windows, samples, channels]
+    eeg: List[List[List[float]]]
+    sampling_rate: Optional[int] = 256
+
 class PredictionResponse(BaseModel):
     status_class: int
     probability: float
     risk_level: str
     model_version: str
 
+class WindowedPredictionResponse(PredictionResponse):
+    # Aggregate fields above are the mean over all windows
+    window_size_sec: float
+    step_size_sec: float
+    window_start_sec: List[float]
+    window_probabilities: List[float]
+
+class BatchPredictionResponse(BaseModel):
+    predictions: List[PredictionResponse]
+
 
 class SaveEEGResultRequest(BaseModel):
     user_id: str
@@ -4,6 +4,7 @@ Exports speech test data in formats suitable for machine learning.
 """
 from sqlalchemy.orm import Session
 from backend.app.models.db_models import SpeechTestResult, SentenceRecording
+from backend.app.services.speech.feature_extractor import extract_linguistic_features_batch
 from typing import List, Dict, Any
 import csv
 import json
@@ -58,7 +59,8 @@ def export_to_csv(db: Session, output_path: str, include_unlabeled: bool = True)
     return len(results)
 
 
-def export_detailed_json(db: Session, output_path: str, include_unlabeled: bool = True):
+def export_detailed_json(db: Session, output_path: str, include_unlabeled: bool = True,
+                         recompute_linguistic: bool = False):
     """
     Export detailed test results including all features to JSON.
 
@@ -66,6 +68,9 @@ def export_detailed_json(db: Session, output_path: str, include_unlabeled: bool
         db: Database session
         output_path: Path to save JSON file
         include_unlabeled: Whether to include tests without ground truth labels
+        recompute_linguistic: Re-score the linguistic features of every
+            exported transcription with the current spaCy pipeline (one
+            batched pass) instead of exporting the stored ones
     """
     query = db.query(SpeechTestResult).filter(SpeechTestResult.completed == True)
 
@@ -134,6 +139,12 @@ def export_detailed_json(db: Session, output_path: str, include_unlabeled: bool
             }
         })
 
+    if recompute_linguistic:
+        sentences = [sentence for test in export_data for sentence in test['sentence_recordings']]
+        features = extract_linguistic_features_batch(sentence['transcription'] or "" for sentence in sentences)
+        for sentence, linguistic in zip(sentences, features):
+            sentence['features']['linguistic'] = linguistic
+
     with open(output_path, 'w') as f:
         json.dump(export_data, f, indent=2)
 
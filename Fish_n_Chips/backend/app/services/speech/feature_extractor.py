@@ -1,26 +1,49 @@
+import threading
 import librosa
 import numpy as np
-import spacy
-from typing import Dict, Any
-
-# Load spaCy model
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError:
-    print("Downloading spaCy model...")
-    from spacy.cli import download
-    download("en_core_web_sm")
-    nlp = spacy.load("en_core_web_sm")
-
-def extract_acoustic_features(audio_path: str) -> Dict[str, Any]:
+from typing import Dict, Any, Iterable, List
+
+from backend.app.utils.audio_utils import AudioBuffer
+from backend.app.services.speech.pitch import estimate_f0
+
+SPACY_MODEL = "en_core_web_sm"
+# Linguistic features only need tokens and coarse POS tags (tagger, mapped to
+# POS by the attribute ruler); the other components are never loaded
+SPACY_EXCLUDE = ["parser", "ner", "lemmatizer", "senter"]
+SPACY_BATCH_SIZE = 64
+
+_nlp = None
+_nlp_lock = threading.Lock()
+
+def get_nlp():
+    """
+    The spaCy pipeline, loaded on first use (not at import, so processes
+    that never compute linguistic features don't pay for it).
+
+    The model is never downloaded at serve time: it must be installed with
+    the other dependencies, otherwise this raises RuntimeError.
+    """
+    global _nlp
+    with _nlp_lock:
+        if _nlp is None:
+            import spacy
+            try:
+                _nlp = spacy.load(SPACY_MODEL, exclude=SPACY_EXCLUDE)
+            except OSError as e:
+                raise RuntimeError(
+                    f"spaCy model {SPACY_MODEL} is not installed: run `python -m spacy download {SPACY_MODEL}`"
+                ) from e
+    return _nlp
+
+def extract_acoustic_features(audio: AudioBuffer) -> Dict[str, Any]:
     """
     Extract acoustic features using librosa.
     """
     try:
-        y, sr = librosa.load(audio_path, sr=None)
+        y, sr = audio.samples, audio.sr
 
-        # Pitch (F0)
-        f0, voiced_flag, voiced_probs = librosa.pyin(y, fmin=librosa.note_to_hz('C2'), fmax=librosa.note_to_hz('C7'))
+        # Pitch (F0), engine set by SPEECH_F0_ENGINE (see pitch.py)
+        f0 = estimate_f0(audio)
         f0_clean = f0[~np.isnan(f0)]
 
         pitch_mean = float(np.mean(f0_clean)) if len(f0_clean) > 0 else 0.0
@@ -52,20 +75,38 @@ def extract_linguistic_features(text: str) -> Dict[str, Any]:
     """
     Extract linguistic features using spaCy.
     """
-    if not text:
-        return {}
+    return extract_linguistic_features_batch([text])[0]
+
+def extract_linguistic_features_batch(texts: Iterable[str], batch_size: int = SPACY_BATCH_SIZE) -> List[Dict[str, Any]]:
+    """
+    extract_linguistic_features() for many texts (e.g. all sentences of a
+    session, or exported transcriptions), run through spaCy with nlp.pipe.
+    """
+    texts = list(texts)
+    results: List[Dict[str, Any]] = [{} for _ in texts]
+    non_empty = [i for i, text in enumerate(texts) if text]
+    if not non_empty:
+        return results
+
+    nlp = get_nlp()
+    docs = nlp.pipe((texts[i] for i in non_empty), batch_size=batch_size)
+    for i, doc in zip(non_empty, docs):
+        results[i] = _linguistic_features(doc)
+    return results
 
-    doc = nlp(text)
+def _linguistic_features(doc) -> Dict[str, Any]:
+    from spacy.attrs import POS
 
-    word_count = len([token for token in doc if not token.is_punct])
-    unique_words = len(set([token.text.lower() for token in doc if not token.is_punct]))
+    words = [token for token in doc if not token.is_punct]
+    word_count = len(words)
+    unique_words = len(set(token.text.lower() for token in words))
 
-    total_chars = sum(len(token.text) for token in doc if not token.is_punct)
+    total_chars = sum(len(token.text) for token in words)
     avg_word_length = total_chars / word_count if word_count > 0 else 0
 
     lexical_diversity = unique_words / word_count if word_count > 0 else 0
 
-    pos_counts = doc.count_by(spacy.attrs.POS)
+    pos_counts = doc.count_by(POS)
     pos_distribution = {doc.vocab[pos].text: count for pos, count in pos_counts.items()}
 
     return {
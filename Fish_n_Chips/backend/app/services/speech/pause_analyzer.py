@@ -1,143 +1,256 @@
 """
 Improved pause detection using audio analysis instead of relying on Whisper timestamps.
 Uses librosa to detect actual silence/pauses in the audio waveform.
+
+Silent frames (10 ms hop) are found with an adaptive energy threshold, and
+pauses are the runs of silent frames, located with one diff over the
+silence mask rather than a per-frame loop. detect_pauses_batch() does the
+run-length pass for many recordings at once (e.g. offline re-scoring of
+archived recordings), and PauseTracker computes the same statistics for
+audio streamed in chunks.
+
+Diagnostics go to this module's logger at DEBUG level.
 """
+import logging
 import numpy as np
 import librosa
-from typing import Dict, Any, List
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Dict, Any, List, Optional, Sequence
+
+from backend.app.utils.audio_utils import AudioBuffer
+
+logger = logging.getLogger(__name__)
+
+# 25 ms frames, 10 ms hop
+FRAME_SEC = 0.025
+HOP_SEC = 0.010
+# Silence threshold above the noise floor (10th percentile of frame energy)
+NOISE_FLOOR_PERCENTILE = 10
+SILENCE_MARGIN_DB = 10
+LONG_PAUSE_SEC = 0.8
+# librosa.amplitude_to_db defaults
+AMIN = 1e-5
+TOP_DB = 80.0
+
+EMPTY_PAUSE_ANALYSIS = {
+    "avg_pause_duration": 0.0,
+    "max_pause": 0.0,
+    "long_pause_count": 0,
+    "pause_count": 0,
+    "pause_locations": [],
+    "total_pause_time": 0.0
+}
+
+
+def silence_mask(audio: AudioBuffer) -> np.ndarray:
+    """
+    Per-frame silence flags of a recording (frames every HOP_SEC).
+    """
+    y, sr = audio.samples, audio.sr
+    frame_length = int(sr * FRAME_SEC)
+    hop_length = int(sr * HOP_SEC)
+
+    # Calculate RMS energy (volume) over time, in dB
+    rms = librosa.feature.rms(y=y, frame_length=frame_length, hop_length=hop_length)[0]
+    rms_db = librosa.amplitude_to_db(rms, ref=np.max)
+
+    # ADAPTIVE threshold based on audio content
+    threshold = silence_threshold(rms_db)
+    is_silent = rms_db < threshold
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "pause energy: file=%s samples=%d sr=%d duration=%.2fs threshold=%.1fdB "
+            "max=%.1fdB silent_frames=%d/%d",
+            audio.filename, len(y), sr, len(y) / sr, threshold,
+            np.max(rms_db), np.sum(is_silent), len(is_silent)
+        )
+    return is_silent
+
+
+def silence_threshold(rms_db: np.ndarray) -> float:
+    """
+    Frames below this level (same dB scale as rms_db) are silent.
+    """
+    return np.percentile(rms_db, NOISE_FLOOR_PERCENTILE) + SILENCE_MARGIN_DB
+
+
+def silent_runs(masks: Sequence[np.ndarray]) -> List[np.ndarray]:
+    """
+    [start_frame, end_frame) of every run of True in each mask, found in one
+    pass over all masks.
+
+    Returns:
+        One [n_runs, 2] int array per mask. A run reaching the end of its
+        mask ends at len(mask).
+    """
+    lengths = np.array([len(mask) for mask in masks])
+    # Each mask is followed by a False separator so runs never join across recordings
+    offsets = np.concatenate([[0], np.cumsum(lengths + 1)])
+    flags = np.zeros(offsets[-1] + 1, dtype=np.int8)
+    for mask, offset in zip(masks, offsets):
+        flags[offset + 1:offset + 1 + len(mask)] = mask
+
+    edges = np.diff(flags)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    # Runs of mask i lie between offsets[i] and offsets[i + 1]
+    bounds = np.searchsorted(starts, offsets)
+    return [
+        np.stack([starts[lo:hi] - offset, ends[lo:hi] - offset], axis=1)
+        for lo, hi, offset in zip(bounds[:-1], bounds[1:], offsets[:-1])
+    ]
+
+
+def pause_statistics(runs: np.ndarray, n_frames: int, sr: int, min_silence_duration: float) -> Dict[str, Any]:
+    """
+    Pause list and statistics from the silent runs of one recording.
+    """
+    hop_length = int(sr * HOP_SEC)
+    times = librosa.frames_to_time(np.arange(n_frames), sr=sr, hop_length=hop_length)
+
+    # A run that reaches the end of the audio ends at the last frame
+    start_times = times[runs[:, 0]]
+    end_times = times[np.minimum(runs[:, 1], n_frames - 1)]
+    durations = end_times - start_times
+    keep = durations >= min_silence_duration
+
+    pauses = [
+        {'start': start, 'end': end, 'duration': duration}
+        for start, end, duration in zip(start_times[keep], end_times[keep], durations[keep])
+    ]
+
+    if not pauses:
+        return dict(EMPTY_PAUSE_ANALYSIS, pause_locations=[])
+
+    pause_durations = durations[keep]
+    avg_pause = np.mean(pause_durations)
+    max_pause = np.max(pause_durations)
+    long_pause_count = int(np.count_nonzero(pause_durations > LONG_PAUSE_SEC))
+    total_pause_time = sum(p['duration'] for p in pauses)
+
+    # Calculate pause variability
+    pause_variability = np.std(pause_durations) if len(pause_durations) > 1 else 0.0
+
+    return {
+        "avg_pause_duration": float(avg_pause),
+        "max_pause": float(max_pause),
+        "long_pause_count": long_pause_count,
+        "pause_count": len(pauses),
+        "pause_variability": float(pause_variability),
+        "pause_locations": pauses,
+        "total_pause_time": float(total_pause_time)
+    }
+
+
+class PauseTracker:
+    """
+    detect_pauses_from_audio() for audio that arrives in chunks (/ws/speech).
+
+    Frame energies (the centered 25 ms frames of librosa.feature.rms) are
+    computed as samples arrive, so only the frames of the last chunk are left
+    when the recording ends. The adaptive threshold depends on the whole
+    recording, so silence runs are re-derived from the stored energies (one
+    float per 10 ms frame) each time statistics are requested; that is a
+    single vectorized pass, well under a millisecond for a sentence.
+    """
+
+    def __init__(self, sr: int, min_silence_duration: float = 0.3):
+        self.sr = sr
+        self.min_silence_duration = min_silence_duration
+        self.frame_length = int(sr * FRAME_SEC)
+        self.hop_length = int(sr * HOP_SEC)
+        # Samples of frames not yet complete, starting with the centering pad
+        self._pending = np.zeros(self.frame_length // 2, dtype=np.float32)
+        # Frame power in dB (10 * log10 of mean square), one array per push
+        self._energy_db: List[np.ndarray] = []
+
+    @property
+    def n_frames(self) -> int:
+        return sum(len(e) for e in self._energy_db)
+
+    def push(self, samples: np.ndarray) -> None:
+        """Appends mono float samples at sr."""
+        self._add_frames(np.concatenate([self._pending, np.asarray(samples, dtype=np.float32)]))
+
+    def finish(self) -> Dict[str, Any]:
+        """Completes the last frames (end padding) and returns the final statistics."""
+        self._add_frames(np.concatenate([self._pending, np.zeros(self.frame_length // 2, dtype=np.float32)]))
+        self._pending = self._pending[:0]
+        return self.statistics()
+
+    def _add_frames(self, y: np.ndarray) -> None:
+        n_frames = (len(y) - self.frame_length) // self.hop_length + 1 if len(y) >= self.frame_length else 0
+        if n_frames:
+            frames = sliding_window_view(y, self.frame_length)[::self.hop_length][:n_frames]
+            power = np.mean(frames * frames, axis=1, dtype=np.float64)
+            self._energy_db.append(10 * np.log10(np.maximum(power, AMIN * AMIN)))
+        self._pending = y[n_frames * self.hop_length:]
+
+    def statistics(self) -> Dict[str, Any]:
+        """Pause statistics of the audio so far, as detect_pauses_from_audio() returns them."""
+        if not self._energy_db:
+            return dict(EMPTY_PAUSE_ANALYSIS, pause_locations=[])
+        if len(self._energy_db) > 1:
+            self._energy_db = [np.concatenate(self._energy_db)]
+        energy_db = self._energy_db[0]
+
+        # librosa.amplitude_to_db(rms, ref=np.max)
+        rms_db = np.maximum(energy_db - energy_db.max(), -TOP_DB)
+        is_silent = rms_db < silence_threshold(rms_db)
+        runs = silent_runs([is_silent])[0]
+        return pause_statistics(runs, len(is_silent), self.sr, self.min_silence_duration)
+
+
+def detect_pauses_batch(audios: Sequence[AudioBuffer], min_silence_duration: float = 0.3) -> List[Dict[str, Any]]:
+    """
+    detect_pauses_from_audio() for many recordings, with one run-length pass.
 
-def detect_pauses_from_audio(audio_path: str, min_silence_duration: float = 0.3) -> Dict[str, Any]:
+    A recording that fails to analyze gets empty statistics; the others are
+    unaffected.
+    """
+    masks: List[Optional[np.ndarray]] = []
+    for audio in audios:
+        try:
+            masks.append(silence_mask(audio))
+        except Exception as e:
+            logger.warning("pause detection failed for %s: %s", audio.filename, e)
+            masks.append(None)
+
+    runs = iter(silent_runs([mask for mask in masks if mask is not None]))
+
+    results = []
+    for audio, mask in zip(audios, masks):
+        if mask is None:
+            results.append(dict(EMPTY_PAUSE_ANALYSIS, pause_locations=[], pause_variability=0.0))
+            continue
+
+        result = pause_statistics(next(runs), len(mask), audio.sr, min_silence_duration)
+        results.append(result)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "pauses: file=%s count=%d avg=%.2fs max=%.2fs long=%d variability=%.2fs total=%.2fs first=%s",
+                audio.filename, result["pause_count"], result["avg_pause_duration"], result["max_pause"],
+                result["long_pause_count"], result.get("pause_variability", 0.0), result["total_pause_time"],
+                [(round(float(p['start']), 2), round(float(p['end']), 2)) for p in result["pause_locations"][:5]]
+            )
+    return results
+
+
+def detect_pauses_from_audio(audio: AudioBuffer, min_silence_duration: float = 0.3) -> Dict[str, Any]:
     """
     Detect pauses by analyzing the audio waveform directly.
 
     Args:
-        audio_path: Path to audio file
+        audio: Decoded recording
         min_silence_duration: Minimum duration (seconds) to consider as a pause
 
     Returns:
         Dictionary with pause statistics
     """
-    print(f"\n{'='*70}")
-    print(f"🎵 AUDIO-BASED PAUSE DETECTION STARTING...")
-    print(f"   Audio file: {audio_path}")
-    print(f"   Min silence duration: {min_silence_duration}s")
-    print(f"{'='*70}")
-
-    try:
-        # Load audio
-        print("   Loading audio...")
-        y, sr = librosa.load(audio_path, sr=None)
-        print(f"   ✅ Audio loaded: {len(y)} samples at {sr}Hz ({len(y)/sr:.2f}s)")
-
-        # Calculate RMS energy (volume) over time
-        frame_length = int(sr * 0.025)  # 25ms frames
-        hop_length = int(sr * 0.010)    # 10ms hop
-
-        print("   Calculating energy...")
-        rms = librosa.feature.rms(y=y, frame_length=frame_length, hop_length=hop_length)[0]
-
-        # Convert to dB
-        rms_db = librosa.amplitude_to_db(rms, ref=np.max)
-
-        # ADAPTIVE threshold based on audio content
-        # Find the noise floor (10th percentile of energy)
-        noise_floor = np.percentile(rms_db, 10)
-        # Set threshold 10dB above noise floor
-        silence_threshold = noise_floor + 10
-
-        print(f"   Noise floor: {noise_floor:.1f}dB")
-        print(f"   Adaptive silence threshold: {silence_threshold:.1f}dB")
-        print(f"   Max energy: {np.max(rms_db):.1f}dB")
-
-        # Find silent frames
-        is_silent = rms_db < silence_threshold
-        silent_frame_count = np.sum(is_silent)
-        print(f"   Silent frames: {silent_frame_count}/{len(is_silent)} ({silent_frame_count/len(is_silent)*100:.1f}%)")
-
-        # Convert frame indices to time
-        times = librosa.frames_to_time(np.arange(len(is_silent)), sr=sr, hop_length=hop_length)
-
-        # Find continuous silent regions
-        pauses = []
-        pause_start = None
-
-        for i, (silent, time) in enumerate(zip(is_silent, times)):
-            if silent and pause_start is None:
-                # Start of pause
-                pause_start = time
-            elif not silent and pause_start is not None:
-                # End of pause
-                pause_duration = time - pause_start
-                if pause_duration >= min_silence_duration:
-                    pauses.append({
-                        'start': pause_start,
-                        'end': time,
-                        'duration': pause_duration
-                    })
-                pause_start = None
-
-        # Handle pause at end of audio
-        if pause_start is not None:
-            pause_duration = times[-1] - pause_start
-            if pause_duration >= min_silence_duration:
-                pauses.append({
-                    'start': pause_start,
-                    'end': times[-1],
-                    'duration': pause_duration
-                })
-
-        if not pauses:
-            return {
-                "avg_pause_duration": 0.0,
-                "max_pause": 0.0,
-                "long_pause_count": 0,
-                "pause_count": 0,
-                "pause_locations": [],
-                "total_pause_time": 0.0
-            }
-
-        pause_durations = [p['duration'] for p in pauses]
-        avg_pause = np.mean(pause_durations)
-        max_pause = np.max(pause_durations)
-        long_pause_count = len([p for p in pause_durations if p > 0.8])
-        total_pause_time = sum(pause_durations)
-
-        # Calculate pause variability
-        pause_variability = np.std(pause_durations) if len(pause_durations) > 1 else 0.0
-
-        print(f"\n🎵 AUDIO-BASED PAUSE DETECTION:")
-        print(f"   Total pauses detected: {len(pauses)}")
-        print(f"   Avg pause: {avg_pause:.2f}s")
-        print(f"   Max pause: {max_pause:.2f}s")
-        print(f"   Long pauses (>0.8s): {long_pause_count}")
-        print(f"   Pause variability: {pause_variability:.2f}s")
-        print(f"   Total pause time: {total_pause_time:.2f}s")
-
-        # Print each pause
-        for i, pause in enumerate(pauses[:5]):  # Show first 5
-            print(f"   Pause {i+1}: {pause['start']:.2f}s - {pause['end']:.2f}s ({pause['duration']:.2f}s)")
-
-        return {
-            "avg_pause_duration": float(avg_pause),
-            "max_pause": float(max_pause),
-            "long_pause_count": int(long_pause_count),
-            "pause_count": len(pauses),
-            "pause_variability": float(pause_variability),
-            "pause_locations": pauses,
-            "total_pause_time": float(total_pause_time)
-        }
-
-    except Exception as e:
-        print(f"❌ Error in audio-based pause detection: {e}")
-        return {
-            "avg_pause_duration": 0.0,
-            "max_pause": 0.0,
-            "long_pause_count": 0,
-            "pause_count": 0,
-            "pause_variability": 0.0,
-            "pause_locations": [],
-            "total_pause_time": 0.0
-        }
+    return detect_pauses_batch([audio], min_silence_duration)[0]
 
 
 def analyze_pauses(word_timestamps: List[Any]) -> Dict[str, Any]:
@@ -148,8 +261,7 @@ def analyze_pauses(word_timestamps: List[Any]) -> Dict[str, Any]:
     This function is kept for backward compatibility but will return
     minimal data.
     """
-    print(f"\n⚠️ Using Whisper timestamps for pause detection (not recommended)")
-    print(f"   Number of words: {len(word_timestamps)}")
+    logger.warning("Using Whisper timestamps for pause detection (not recommended); %d words", len(word_timestamps))
 
     if not word_timestamps or len(word_timestamps) < 2:
         return {
@@ -0,0 +1,137 @@
+"""
+Pitch (F0) tracking engines for speech analysis.
+
+Only the mean and standard deviation of F0 over voiced frames feed the
+speech features, so the request path doesn't need pyin's full HMM decoding
+over C2-C7 at the file's native rate. Engines (SPEECH_F0_ENGINE):
+
+    pyin        librosa.pyin, C2-C7 at the native sample rate (reference)
+    pyin_fast   librosa.pyin at 16 kHz over the speech range (65-500 Hz), with a
+                32 ms hop and 0.2 semitone pitch grid
+    yin         vectorized YIN at 16 kHz over the speech range, voiced when
+                the frame is periodic enough and not near-silent (default)
+
+Every engine returns F0 per frame in Hz, NaN for unvoiced frames.
+benchmarks/f0_engines.py compares speed and accuracy against pyin.
+"""
+import os
+import librosa
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Callable, Dict
+
+from backend.app.utils.audio_utils import AudioBuffer
+
+F0_ENGINE = os.getenv("SPEECH_F0_ENGINE", "yin")
+
+# Sample rate of the fast engines (shared with VAD through AudioBuffer's cache)
+FAST_SR = 16000
+# Adult and child speaking F0 range
+SPEECH_FMIN = 65.0
+SPEECH_FMAX = 500.0
+
+# 64 ms frames, 16 ms hop at FAST_SR
+YIN_FRAME_LENGTH = 1024
+YIN_HOP_LENGTH = 256
+# First dip of the normalized difference below this is taken as the period
+YIN_TROUGH_THRESHOLD = 0.1
+# Frames whose best dip is above this are aperiodic (unvoiced)
+YIN_VOICING_THRESHOLD = 0.25
+# Frames this far below the loudest frame, or below YIN_MIN_RMS (-80 dBFS), are silence
+YIN_SILENCE_DB = 40.0
+YIN_MIN_RMS = 1e-4
+
+# pyin's cost grows with frames x pitch bins: 32 ms hop, 0.2 semitone bins
+PYIN_FAST_HOP_LENGTH = 512
+PYIN_FAST_RESOLUTION = 0.2
+
+
+def pyin_f0(audio: AudioBuffer) -> np.ndarray:
+    f0, _, _ = librosa.pyin(
+        audio.samples, fmin=librosa.note_to_hz('C2'), fmax=librosa.note_to_hz('C7'), sr=audio.sr
+    )
+    return f0
+
+
+def pyin_fast_f0(audio: AudioBuffer) -> np.ndarray:
+    f0, _, _ = librosa.pyin(
+        audio.resampled(FAST_SR), fmin=SPEECH_FMIN, fmax=SPEECH_FMAX, sr=FAST_SR,
+        frame_length=YIN_FRAME_LENGTH, hop_length=PYIN_FAST_HOP_LENGTH, resolution=PYIN_FAST_RESOLUTION
+    )
+    return f0
+
+
+def _cumulative_mean_normalized_difference(frames: np.ndarray, win_length: int, max_period: int) -> np.ndarray:
+    """
+    YIN's d'(tau) for tau = 0..max_period of every frame [n_frames, frame_length].
+
+    d(tau) = sum_j (x_j - x_{j+tau})^2 over a window of win_length samples,
+    from FFT cross-correlation and running energies.
+    """
+    n_fft = 1 << int(np.ceil(np.log2(frames.shape[1] + win_length)))
+    spectrum = np.fft.rfft(frames, n_fft)
+    window_spectrum = np.fft.rfft(frames[:, :win_length], n_fft)
+    acf = np.fft.irfft(spectrum * np.conj(window_spectrum), n_fft)[:, :max_period + 1]
+
+    energy = np.cumsum(np.concatenate([np.zeros((len(frames), 1)), frames ** 2], axis=1), axis=1)
+    lags = np.arange(max_period + 1)
+    # Energy of the window starting at each lag
+    lag_energy = energy[:, lags + win_length] - energy[:, lags]
+
+    diff = np.maximum(lag_energy[:, :1] + lag_energy - 2 * acf, 0)
+    cmndf = np.ones_like(diff)
+    running = np.cumsum(diff[:, 1:], axis=1)
+    cmndf[:, 1:] = diff[:, 1:] * lags[1:] / np.maximum(running, np.finfo(float).tiny)
+    return cmndf
+
+
+def yin_f0(audio: AudioBuffer) -> np.ndarray:
+    y = audio.resampled(FAST_SR).astype(np.float64)
+    min_period = int(np.floor(FAST_SR / SPEECH_FMAX))
+    max_period = int(np.ceil(FAST_SR / SPEECH_FMIN))
+    win_length = YIN_FRAME_LENGTH - max_period - 1
+
+    # Centered frames, like librosa
+    y = np.pad(y, YIN_FRAME_LENGTH // 2)
+    frames = sliding_window_view(y, YIN_FRAME_LENGTH)[::YIN_HOP_LENGTH]
+
+    cmndf = _cumulative_mean_normalized_difference(frames, win_length, max_period)
+    search = cmndf[:, min_period:max_period + 1]
+
+    # First local minimum under the threshold, else the global minimum
+    is_trough = np.zeros(search.shape, dtype=bool)
+    is_trough[:, 1:-1] = (search[:, 1:-1] <= search[:, :-2]) & (search[:, 1:-1] < search[:, 2:])
+    candidates = is_trough & (search < YIN_TROUGH_THRESHOLD)
+    best = np.where(candidates.any(axis=1), np.argmax(candidates, axis=1), np.argmin(search, axis=1))
+
+    # Parabolic interpolation around the chosen lag
+    rows = np.arange(len(search))
+    inner = np.clip(best, 1, search.shape[1] - 2)
+    left, center, right = search[rows, inner - 1], search[rows, inner], search[rows, inner + 1]
+    curvature = left - 2 * center + right
+    shift = np.where(np.abs(curvature) > 1e-12, 0.5 * (left - right) / np.where(curvature == 0, 1, curvature), 0)
+    shift = np.where(best == inner, np.clip(shift, -1, 1), 0)
+    period = min_period + best + shift
+
+    frame_rms = np.sqrt(np.mean(frames[:, :win_length] ** 2, axis=1))
+    loud = (frame_rms > YIN_MIN_RMS) & (20 * np.log10(np.maximum(frame_rms, YIN_MIN_RMS) / max(frame_rms.max(), YIN_MIN_RMS)) > -YIN_SILENCE_DB)
+    voiced = (search[rows, best] < YIN_VOICING_THRESHOLD) & loud
+
+    return np.where(voiced, FAST_SR / period, np.nan)
+
+
+ENGINES: Dict[str, Callable[[AudioBuffer], np.ndarray]] = {
+    "pyin": pyin_f0,
+    "pyin_fast": pyin_fast_f0,
+    "yin": yin_f0,
+}
+
+if F0_ENGINE not in ENGINES:
+    raise ValueError(f"SPEECH_F0_ENGINE must be one of {sorted(ENGINES)}, got {F0_ENGINE!r}")
+
+
+def estimate_f0(audio: AudioBuffer, engine: str = F0_ENGINE) -> np.ndarray:
+    """
+    F0 per frame in Hz (NaN where unvoiced) with the chosen engine.
+    """
+    return ENGINES[engine](audio)
@@ -0,0 +1,121 @@
+"""
+Off-event-loop acoustic and pause analysis for /api/speech/analyze.
+
+Both analyses are CPU-bound numpy/librosa work, so they run as two tasks in
+a process pool, in parallel with each other and with the Whisper request.
+Workers receive the decoded samples only (not the encoded upload) and
+rebuild an AudioBuffer. The pool is started on first use, or ahead of it by
+warm_up_pool(). If a worker dies, the broken pool is replaced and the task
+retried once.
+"""
+import asyncio
+import multiprocessing
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from backend.app import readiness
+from backend.app.metrics import stage_timer
+from backend.app.utils.audio_utils import AudioBuffer
+
+SPEECH_ANALYSIS_WORKERS = int(os.getenv("SPEECH_ANALYSIS_WORKERS", 2))
+
+_pool: Optional[ProcessPoolExecutor] = None
+# Warm-up of a pool that replaced a broken one
+_restart_task: Optional[asyncio.Task] = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: forking a server process that already runs threads is unsafe
+        _pool = ProcessPoolExecutor(max_workers=SPEECH_ANALYSIS_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def _replace_broken_pool(broken: ProcessPoolExecutor) -> None:
+    """Drops a broken pool (once, however many tasks saw it break) and warms up its replacement."""
+    global _pool, _restart_task
+    if _pool is not broken:
+        return
+    print("Speech analysis worker died; restarting the process pool")
+    _pool = None
+    broken.shutdown(wait=False)
+    if _restart_task is not None:
+        _restart_task.cancel()
+    _restart_task = asyncio.create_task(readiness.track("speech_workers", warm_up_pool()))
+
+
+async def _run_in_pool(fn: Callable, *args):
+    """fn(*args) in the worker pool, retried once on a new pool if the pool is broken."""
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+    try:
+        return await loop.run_in_executor(pool, fn, *args)
+    except BrokenProcessPool:
+        _replace_broken_pool(pool)
+        return await loop.run_in_executor(_get_pool(), fn, *args)
+
+
+def shutdown_pool() -> None:
+    """
+    Stops the workers, waiting for tasks already running (e.g. the warm-up).
+    Not waiting can orphan them: uvicorn re-raises the signal that stopped it
+    once shut down, so the pool's atexit cleanup never runs.
+    """
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+
+
+# Analyzer imports are deferred to the task, so a worker imports (librosa,
+# pitch engines) only what the tasks it actually runs need
+def _acoustic_features(samples: np.ndarray, sr: int) -> Dict[str, Any]:
+    from backend.app.services.speech.feature_extractor import extract_acoustic_features
+    return extract_acoustic_features(AudioBuffer(samples, sr))
+
+
+def _pauses(samples: np.ndarray, sr: int, min_silence_duration: float) -> Dict[str, Any]:
+    from backend.app.services.speech.pause_analyzer import detect_pauses_from_audio
+    return detect_pauses_from_audio(AudioBuffer(samples, sr), min_silence_duration=min_silence_duration)
+
+
+def _warm_up_worker() -> None:
+    """Imports the analyzers and runs them once (JIT, FFT plans) on a short tone."""
+    sr = 16000
+    t = np.arange(sr) / sr
+    samples = (0.1 * np.sin(2 * np.pi * 150 * t) * (t < 0.6)).astype(np.float32)
+    _acoustic_features(samples, sr)
+    _pauses(samples, sr, 0.3)
+
+
+async def warm_up_pool() -> None:
+    """
+    Starts every worker and runs the analyzers once in each, so the first
+    request does not pay for process spawn and imports.
+    """
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+    await asyncio.gather(*[loop.run_in_executor(pool, _warm_up_worker) for _ in range(SPEECH_ANALYSIS_WORKERS)])
+
+
+async def analyze_signal(audio: AudioBuffer, min_silence_duration: float = 0.3) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    (acoustic features, pause analysis) of a recording, computed concurrently
+    in the worker pool.
+    """
+    async def pauses():
+        with stage_timer("pause_analysis"):
+            return await _run_in_pool(_pauses, audio.samples, audio.sr, min_silence_duration)
+
+    return tuple(await asyncio.gather(analyze_acoustics(audio), pauses()))
+
+
+async def analyze_acoustics(audio: AudioBuffer) -> Dict[str, Any]:
+    """
+    Acoustic features of a recording, computed in the worker pool.
+    """
+    return await _run_in_pool(_acoustic_features, audio.samples, audio.sr)
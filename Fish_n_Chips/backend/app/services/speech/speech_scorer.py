@@ -2,21 +2,43 @@
 ML-based speech scoring with IMPROVED pause analysis.
 Now properly considers pause duration, variability, and hesitations.
 """
-import joblib
+import threading
 import numpy as np
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 import os
 
-# Load the trained model
+from backend.app.tree_ensemble import Predictor, compile_model
+
 MODEL_PATH = "models/speech_ml_model.joblib"
 
-try:
-    ml_model = joblib.load(MODEL_PATH)
-    print(f"✅ Loaded IMPROVED ML model from {MODEL_PATH}")
-    print(f"   Model now emphasizes PAUSE PATTERNS!")
-except FileNotFoundError:
-    print(f"⚠️ ML model not found at {MODEL_PATH}. Please train the model first.")
-    ml_model = None
+# Loaded on first use (or by the startup warm-up), not at import
+_ml_model = None
+_ml_predictor: Optional[Predictor] = None
+_model_loaded = False
+_model_lock = threading.Lock()
+
+
+def load_ml_model() -> Tuple[Any, Optional[Predictor]]:
+    """
+    The trained model and its flattened predictor, loaded once.
+
+    Returns:
+        (model, predictor), or (None, None) if the model file is missing
+    """
+    global _ml_model, _ml_predictor, _model_loaded
+    with _model_lock:
+        if not _model_loaded:
+            import joblib
+            try:
+                _ml_model = joblib.load(MODEL_PATH)
+                print(f"✅ Loaded IMPROVED ML model from {MODEL_PATH}")
+                print(f"   Model now emphasizes PAUSE PATTERNS!")
+                # Flattened trees: class and probability from a single pass
+                _ml_predictor = compile_model(_ml_model)
+            except FileNotFoundError:
+                print(f"⚠️ ML model not found at {MODEL_PATH}. Please train the model first.")
+            _model_loaded = True
+    return _ml_model, _ml_predictor
 
 def calculate_pause_features(pause_analysis: Dict[str, Any]) -> Dict[str, float]:
     """
@@ -71,6 +93,7 @@ def calculate_ml_risk_score(
         Dictionary with risk score, level, probability, and detailed analysis
     """
 
+    ml_model, ml_predictor = load_ml_model()
     if ml_model is None:
         return fallback_scoring(reaction_time_ms, speech_rate_wpm,
                                pause_analysis.get("avg_pause_duration", 0), word_accuracy)
@@ -91,8 +114,9 @@ def calculate_ml_risk_score(
     ]])
 
     # Get prediction and probability
-    prediction = ml_model.predict(features)[0]
-    probability = ml_model.predict_proba(features)[0]
+    predictions, probabilities = ml_predictor.predict_with_proba(features)
+    prediction = predictions[0]
+    probability = probabilities[0]
 
     # Risk probability (probability of cognitive decline)
     risk_probability = probability[1]
@@ -0,0 +1,122 @@
+"""
+Online analysis of a speech recording streamed in chunks (/ws/speech).
+
+A SpeechStream receives raw mono PCM while the user is speaking and keeps
+speech onset (reaction time) and pause statistics up to date as each chunk
+arrives. When the recording stops, only the last partial frames remain, and
+the recording is handed over as an AudioBuffer (WAV-encoded for Whisper) for
+transcription and acoustic features.
+
+State is bounded: the PCM itself (kept for transcription, 2 bytes per
+sample) plus one float per 10 ms frame, and a stream is refused beyond
+MAX_STREAM_SECONDS.
+"""
+import io
+import os
+import numpy as np
+import soundfile as sf
+from typing import Any, Dict, Tuple
+
+from backend.app.services.speech.pause_analyzer import PauseTracker
+from backend.app.services.speech.vad_service import SpeechOnsetDetector
+from backend.app.utils.audio_utils import AudioBuffer
+
+MAX_STREAM_SECONDS = float(os.getenv("SPEECH_STREAM_MAX_SECONDS", 60))
+
+# Rates webrtcvad accepts, so no resampling is needed while streaming
+STREAM_SAMPLE_RATES = (8000, 16000, 32000, 48000)
+# Sample encodings a client can send: little-endian int16 or float32 in [-1, 1]
+STREAM_ENCODINGS = {
+    "pcm16": np.dtype("<i2"),
+    "float32": np.dtype("<f4"),
+}
+
+
+class SpeechStream:
+    """
+    Per-recording streaming state.
+
+    Pause statistics match detect_pauses_from_audio() on the same audio; the
+    onset matches detect_speech_start() except that its noise floor is
+    estimated from the audio received so far.
+    """
+
+    def __init__(self, sample_rate: int = 16000, encoding: str = "pcm16",
+                 min_silence_duration: float = 0.3, filename: str = "stream.wav"):
+        if sample_rate not in STREAM_SAMPLE_RATES:
+            raise ValueError(f"sample_rate must be one of {STREAM_SAMPLE_RATES}, got {sample_rate}")
+        if encoding not in STREAM_ENCODINGS:
+            raise ValueError(f"encoding must be one of {sorted(STREAM_ENCODINGS)}, got {encoding!r}")
+
+        self.sample_rate = sample_rate
+        self.encoding = encoding
+        self.filename = filename
+        self.max_samples = int(MAX_STREAM_SECONDS * sample_rate)
+        self._pcm = bytearray()
+        self._odd_byte = b""
+        self.onset = SpeechOnsetDetector(sample_rate)
+        self.pauses = PauseTracker(sample_rate, min_silence_duration)
+
+    @property
+    def n_samples(self) -> int:
+        return len(self._pcm) // 2
+
+    @property
+    def duration(self) -> float:
+        return self.n_samples / self.sample_rate
+
+    def push(self, data: bytes) -> None:
+        """
+        Appends one chunk of encoded samples.
+
+        Raises:
+            ValueError: if the stream would exceed MAX_STREAM_SECONDS
+        """
+        dtype = STREAM_ENCODINGS[self.encoding]
+        # Chunks needn't end on a sample boundary
+        data = self._odd_byte + data
+        usable = len(data) - len(data) % dtype.itemsize
+        self._odd_byte = data[usable:]
+        samples = np.frombuffer(data[:usable], dtype=dtype)
+
+        if self.n_samples + len(samples) > self.max_samples:
+            raise ValueError(f"Recording exceeds {MAX_STREAM_SECONDS:g} seconds")
+
+        if self.encoding == "pcm16":
+            pcm = samples
+        else:
+            # As AudioBuffer.pcm16 converts
+            pcm = np.round(np.clip(samples, -1.0, 1.0) * 32767).astype("<i2")
+
+        self._pcm += pcm.tobytes()
+        self.onset.push(pcm)
+        # The float samples soundfile decodes from the WAV sent for transcription
+        self.pauses.push(pcm.astype(np.float32) / 32768.0)
+
+    def progress(self) -> Dict[str, Any]:
+        """Onset and pause statistics of the audio so far."""
+        pauses = self.pauses.statistics()
+        return {
+            "duration": self.duration,
+            "speech_onset_ms": self.onset.onset_ms if self.onset.onset_ms >= 0 else None,
+            "pause_count": pauses["pause_count"],
+            "avg_pause_duration": pauses["avg_pause_duration"],
+            "max_pause": pauses["max_pause"],
+            "long_pause_count": pauses["long_pause_count"],
+            "total_pause_time": pauses["total_pause_time"],
+        }
+
+    def finish(self) -> Tuple[AudioBuffer, Dict[str, Any], float]:
+        """
+        Ends the recording.
+
+        Returns:
+            (recording as an AudioBuffer with WAV-encoded bytes, final pause
+            analysis, speech onset in ms or -1.0)
+        """
+        pcm = np.frombuffer(bytes(self._pcm), dtype="<i2")
+        encoded = io.BytesIO()
+        sf.write(encoded, pcm, self.sample_rate, format="WAV", subtype="PCM_16")
+
+        audio = AudioBuffer(pcm.astype(np.float32) / 32768.0, self.sample_rate, encoded.getvalue(), self.filename)
+        return audio, self.pauses.finish(), self.onset.onset_ms
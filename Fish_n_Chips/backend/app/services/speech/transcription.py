@@ -0,0 +1,235 @@
+"""
+Transcription backends and their result cache.
+
+A backend turns a batch of recordings into one result per recording:
+    {"text": str, "words": [{"word", "start", "end"}, ...]}
+
+    openai   OpenAI Whisper API (whisper-1); one request per clip
+    local    Whisper on the CPU via faster-whisper (CTranslate2, int8 weights
+             by default), loaded on first use. Several short clips are
+             decoded together in one batched encoder/decoder pass. Greedy
+             decoding at temperature 0, so results are deterministic.
+    dummy    fixed text, no model and no network (load tests, development)
+
+Backends raise on failure; whisper_service turns failures into the error
+result and never caches them.
+
+TranscriptionCache keys results by the SHA-256 of the recording (the encoded
+upload, else the samples) plus the backend's identity, so a model or option
+change never serves stale text.
+"""
+import hashlib
+import os
+import threading
+import numpy as np
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from backend.app.utils.audio_utils import AudioBuffer
+
+Transcription = Dict[str, Any]
+
+OPENAI_TRANSCRIPTION_OPTIONS = {
+    "model": "whisper-1",
+    "response_format": "verbose_json",
+    "timestamp_granularities": ["word"],
+}
+
+WHISPER_LOCAL_MODEL = os.getenv("WHISPER_LOCAL_MODEL", "base.en")
+WHISPER_LOCAL_COMPUTE_TYPE = os.getenv("WHISPER_LOCAL_COMPUTE_TYPE", "int8")
+WHISPER_LOCAL_THREADS = int(os.getenv("WHISPER_LOCAL_THREADS", 0))  # 0: CTranslate2 default
+WHISPER_LOCAL_LANGUAGE = os.getenv("WHISPER_LOCAL_LANGUAGE", "en")
+
+# Whisper's input rate and window; longer clips are not batched
+WHISPER_SAMPLE_RATE = 16000
+WHISPER_CHUNK_SEC = 30
+
+DUMMY_TRANSCRIPTION = {
+    "text": "Dummy transcription (TRANSCRIPTION_BACKEND=dummy)",
+    "words": [
+        {"word": "Dummy", "start": 0.0, "end": 0.5},
+        {"word": "transcription", "start": 0.6, "end": 1.5}
+    ]
+}
+
+
+class TranscriptionBackend(ABC):
+    name = ""
+    # Clips a single transcribe_batch() call handles efficiently (1: no batching)
+    max_batch_size = 1
+
+    def identity(self) -> str:
+        """Everything that affects the result, for cache keys."""
+        return self.name
+
+    @abstractmethod
+    def transcribe_batch(self, audios: List[AudioBuffer]) -> List[Transcription]:
+        ...
+
+
+class OpenAIBackend(TranscriptionBackend):
+    name = "openai"
+
+    def __init__(self, api_key: str):
+        from openai import AsyncOpenAI, OpenAI
+        self.client = OpenAI(api_key=api_key)
+        # Keeps the event loop free during the upload
+        self.async_client = AsyncOpenAI(api_key=api_key)
+
+    def identity(self) -> str:
+        return f"openai-{OPENAI_TRANSCRIPTION_OPTIONS['model']}"
+
+    @staticmethod
+    def _result(transcript) -> Transcription:
+        return {
+            "text": transcript.text,
+            "words": transcript.words
+        }
+
+    def transcribe_batch(self, audios: List[AudioBuffer]) -> List[Transcription]:
+        # The original encoded upload is sent, not the decoded samples
+        return [
+            self._result(self.client.audio.transcriptions.create(file=audio.upload(), **OPENAI_TRANSCRIPTION_OPTIONS))
+            for audio in audios
+        ]
+
+    async def transcribe_async(self, audio: AudioBuffer) -> Transcription:
+        transcript = await self.async_client.audio.transcriptions.create(
+            file=audio.upload(), **OPENAI_TRANSCRIPTION_OPTIONS
+        )
+        return self._result(transcript)
+
+
+class LocalWhisperBackend(TranscriptionBackend):
+    name = "local"
+    max_batch_size = int(os.getenv("WHISPER_LOCAL_MAX_BATCH", 8))
+
+    def __init__(self, model_name: str = WHISPER_LOCAL_MODEL, compute_type: str = WHISPER_LOCAL_COMPUTE_TYPE,
+                 cpu_threads: int = WHISPER_LOCAL_THREADS, language: Optional[str] = WHISPER_LOCAL_LANGUAGE):
+        import faster_whisper  # noqa: F401 (fail at startup, not on the first request)
+        self.model_name = model_name
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.language = language or None
+        self._model = None
+        self._pipeline = None
+        self._lock = threading.Lock()
+
+    def identity(self) -> str:
+        return f"local-{self.model_name}-{self.compute_type}-{self.language}"
+
+    def _load(self):
+        with self._lock:
+            if self._model is None:
+                from faster_whisper import BatchedInferencePipeline, WhisperModel
+                self._model = WhisperModel(
+                    self.model_name, device="cpu", compute_type=self.compute_type, cpu_threads=self.cpu_threads
+                )
+                self._pipeline = BatchedInferencePipeline(model=self._model)
+        return self._model, self._pipeline
+
+    def warm_up(self) -> None:
+        """Loads (and downloads, if needed) the model ahead of the first request."""
+        self._load()
+
+    @staticmethod
+    def _result(segments, offset: float = 0.0) -> Transcription:
+        segments = list(segments)
+        return {
+            "text": "".join(segment.text for segment in segments).strip(),
+            "words": [
+                {
+                    "word": word.word.strip(),
+                    "start": round(float(word.start - offset), 3),
+                    "end": round(float(word.end - offset), 3)
+                }
+                for segment in segments for word in (segment.words or [])
+            ]
+        }
+
+    def _options(self) -> Dict[str, Any]:
+        return {
+            "language": self.language,
+            "word_timestamps": True,
+            "beam_size": 1,
+            "temperature": 0.0,
+        }
+
+    def transcribe_batch(self, audios: List[AudioBuffer]) -> List[Transcription]:
+        model, pipeline = self._load()
+        clips = [audio.resampled(WHISPER_SAMPLE_RATE) for audio in audios]
+
+        results: List[Optional[Transcription]] = [None] * len(clips)
+        short = [i for i, clip in enumerate(clips) if len(clip) <= WHISPER_CHUNK_SEC * WHISPER_SAMPLE_RATE]
+        for i in set(range(len(clips))) - set(short):
+            segments, _ = model.transcribe(clips[i], condition_on_previous_text=False, **self._options())
+            results[i] = self._result(segments)
+
+        if short:
+            # Short clips laid end to end, one clip per batch element; segment
+            # times are relative to the joined audio
+            lengths = np.array([len(clips[i]) for i in short])
+            starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+            joined = np.concatenate([clips[i] for i in short])
+            segments, _ = pipeline.transcribe(
+                joined,
+                clip_timestamps=[{"start": int(start), "end": int(start + length)} for start, length in zip(starts, lengths)],
+                batch_size=len(short),
+                vad_filter=False,
+                **self._options()
+            )
+
+            per_clip: List[list] = [[] for _ in short]
+            start_times = starts / WHISPER_SAMPLE_RATE
+            for segment in segments:
+                per_clip[int(np.searchsorted(start_times, segment.start + 1e-3, side="right")) - 1].append(segment)
+            for j, i in enumerate(short):
+                results[i] = self._result(per_clip[j], offset=start_times[j])
+
+        return results
+
+
+class DummyBackend(TranscriptionBackend):
+    name = "dummy"
+
+    def transcribe_batch(self, audios: List[AudioBuffer]) -> List[Transcription]:
+        return [DUMMY_TRANSCRIPTION for _ in audios]
+
+
+def audio_digest(audio: AudioBuffer) -> str:
+    if audio.encoded:
+        return hashlib.sha256(audio.encoded).hexdigest()
+    digest = hashlib.sha256(audio.samples.tobytes())
+    digest.update(str(audio.sr).encode("ascii"))
+    return digest.hexdigest()
+
+
+class TranscriptionCache:
+    """Thread-safe LRU of transcriptions, bounded by entry count."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Transcription]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Transcription]:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key: str, result: Transcription) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
@@ -1,22 +1,133 @@
-import webrtcvad
+"""
+Speech onset detection for server-side reaction time.
+
+The upload is converted once to 16 kHz mono int16 PCM (AudioBuffer.pcm16,
+cached on the buffer). A vectorized energy gate over all 30 ms frames picks
+the candidates, and WebRTC VAD runs only on those, in order, until it finds
+ONSET_FRAMES consecutive speech frames; leading silence therefore costs one
+numpy pass instead of one VAD call per frame. SpeechOnsetDetector does the
+same for audio streamed in chunks.
+"""
 import numpy as np
+from typing import List
+
+from backend.app.utils.audio_utils import AudioBuffer
+
+VAD_SAMPLE_RATE = 16000
+# 10, 20 or 30 ms frames are supported by webrtcvad
+FRAME_MS = 30
+VAD_AGGRESSIVENESS = 3  # high
+
+# Frames quieter than this (dBFS) are never speech
+MIN_SPEECH_DBFS = -55.0
+# Nor frames within this many dB of the recording's noise floor
+# (10th percentile of frame energy), but the gate never goes above
+# MAX_GATE_DBFS, in case the recording is nearly all speech
+NOISE_FLOOR_PERCENTILE = 10
+NOISE_MARGIN_DB = 6.0
+MAX_GATE_DBFS = -40.0
+# Speech starts at the first run of this many speech frames (90 ms), so a
+# click or breath at the start of the recording isn't taken as the onset
+ONSET_FRAMES = 3
 
-def detect_speech_start(audio_bytes: bytes, sample_rate: int = 16000) -> float:
+
+def frame_dbfs(pcm: np.ndarray, frame_size: int) -> np.ndarray:
     """
-    Detect the start time of speech in milliseconds using WebRTC VAD.
-    Assumes audio is 16-bit mono PCM.
+    Level in dBFS of each full frame of int16 PCM.
+    """
+    n_frames = len(pcm) // frame_size
+    frames = pcm[:n_frames * frame_size].reshape(n_frames, frame_size).astype(np.float32)
+    power = np.mean(frames * frames, axis=1) / (32768.0 * 32768.0)
+    return 10 * np.log10(np.maximum(power, 1e-12))
+
+
+def gate_threshold(dbfs: np.ndarray) -> float:
+    """
+    Energy gate: frames at or below this level (dBFS) are never speech.
+    """
+    noise_gate = min(np.percentile(dbfs, NOISE_FLOOR_PERCENTILE) + NOISE_MARGIN_DB, MAX_GATE_DBFS)
+    return max(MIN_SPEECH_DBFS, noise_gate)
+
+
+def candidate_frames(pcm: np.ndarray, frame_size: int) -> np.ndarray:
+    """
+    Whether each full frame of int16 PCM is loud enough to be speech.
     """
-    vad = webrtcvad.Vad(3) # Aggressiveness mode 3 (high)
+    dbfs = frame_dbfs(pcm, frame_size)
+    if not len(dbfs):
+        return np.zeros(0, dtype=bool)
+    return dbfs > gate_threshold(dbfs)
 
-    # Frame duration in ms (10, 20, or 30ms supported by webrtcvad)
-    frame_duration_ms = 30
-    frame_size = int(sample_rate * frame_duration_ms / 1000) * 2 # 2 bytes per sample
 
-    offset = 0
-    while offset + frame_size < len(audio_bytes):
-        frame = audio_bytes[offset:offset + frame_size]
-        if vad.is_speech(frame, sample_rate):
-            return (offset / 2 / sample_rate) * 1000 # Convert bytes offset to ms
-        offset += frame_size
+class SpeechOnsetDetector:
+    """
+    Speech onset of int16 PCM that arrives in chunks (/ws/speech).
+
+    Same gate and VAD as detect_speech_start(), except that the noise floor
+    is estimated from the frames received so far. Once the onset is found,
+    further chunks are ignored.
+    """
+
+    def __init__(self, sample_rate: int = VAD_SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self.frame_size = sample_rate * FRAME_MS // 1000
+        # ms from the start of the stream, -1.0 until speech is detected
+        self.onset_ms = -1.0
+        import webrtcvad  # pulls in pkg_resources, slow to import
+        self._vad = webrtcvad.Vad(VAD_AGGRESSIVENESS)
+        self._remainder = np.zeros(0, dtype="<i2")
+        self._dbfs: List[float] = []
+        self._run_start, self._run_length, self._previous = 0, 0, -2
+
+    def push(self, pcm: np.ndarray) -> float:
+        """Appends samples; returns the onset so far."""
+        if self.onset_ms >= 0:
+            return self.onset_ms
+
+        first_frame = len(self._dbfs)
+        pcm = np.concatenate([self._remainder, pcm])
+        n_frames = len(pcm) // self.frame_size
+        self._remainder = pcm[n_frames * self.frame_size:]
+        if n_frames:
+            dbfs = frame_dbfs(pcm, self.frame_size)
+            self._dbfs.extend(dbfs.tolist())
+            self._scan(pcm, np.flatnonzero(dbfs > gate_threshold(np.asarray(self._dbfs))), first_frame)
+        return self.onset_ms
+
+    def _scan(self, pcm: np.ndarray, candidates: np.ndarray, first_frame: int = 0) -> None:
+        """
+        Runs VAD on the candidate frames of pcm, in order, until ONSET_FRAMES
+        consecutive frames are speech. pcm starts at frame first_frame of the stream.
+        """
+        for i in candidates:
+            frame = first_frame + i
+            if frame != self._previous + 1:
+                self._run_length = 0
+            self._previous = frame
 
-    return -1.0 # No speech detected
+            samples = pcm[i * self.frame_size:(i + 1) * self.frame_size]
+            if not self._vad.is_speech(samples.tobytes(), self.sample_rate):
+                self._run_length = 0
+                continue
+
+            if self._run_length == 0:
+                self._run_start = frame
+            self._run_length += 1
+            if self._run_length == ONSET_FRAMES:
+                self.onset_ms = self._run_start * FRAME_MS * 1.0
+                return
+
+
+def detect_speech_start(audio: AudioBuffer, sample_rate: int = VAD_SAMPLE_RATE) -> float:
+    """
+    Detect the start time of speech in milliseconds using WebRTC VAD.
+    Runs on the buffer's 16-bit mono PCM at sample_rate (8/16/32/48 kHz).
+
+    Returns:
+        Offset of the first speech frame from the start of the recording in
+        ms, or -1.0 if no speech is detected
+    """
+    pcm = np.frombuffer(audio.pcm16(sample_rate), dtype="<i2")
+    detector = SpeechOnsetDetector(sample_rate)
+    detector._scan(pcm, np.flatnonzero(candidate_frames(pcm, detector.frame_size)))
+    return detector.onset_ms
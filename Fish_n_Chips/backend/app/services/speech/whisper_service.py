@@ -1,46 +1,210 @@
+"""
+Speech-to-text with word timestamps, through a pluggable backend
+(see transcription.py).
+
+TRANSCRIPTION_BACKEND selects it: openai, local, dummy, or auto (default),
+which picks openai when OPENAI_API_KEY is set, else local when faster-whisper
+is installed, and otherwise fails: dummy text is only ever served when
+TRANSCRIPTION_BACKEND=dummy is set explicitly.
+
+Results are cached by content hash (TRANSCRIPTION_CACHE_SIZE entries). On
+the event loop, clips for a batching backend (local) are micro-batched
+across concurrent requests, like EEG scoring: clips submitted within
+TRANSCRIPTION_MAX_DELAY_MS are transcribed together on one thread.
+"""
+import asyncio
+import importlib.util
 import os
-from openai import OpenAI
-import io
-
-# Initialize OpenAI client
-# Ensure OPENAI_API_KEY is set in environment
-api_key = os.getenv("OPENAI_API_KEY")
-if api_key:
-    client = OpenAI(api_key=api_key)
-else:
-    print("Warning: OPENAI_API_KEY not found. Whisper service will use dummy data.")
-    client = None
-
-def transcribe_with_timestamps(audio_file_path: str):
-    """
-    Transcribe audio file using OpenAI Whisper API and return text with word timestamps.
-    """
-    if not client:
-        return {
-            "text": "Dummy transcription (API Key missing)",
-            "words": [
-                {"word": "Dummy", "start": 0.0, "end": 0.5},
-                {"word": "transcription", "start": 0.6, "end": 1.5}
-            ]
-        }
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
 
-    try:
-        with open(audio_file_path, "rb") as audio_file:
-            transcript = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file,
-                response_format="verbose_json",
-                timestamp_granularities=["word"]
+from backend.app.services.speech.transcription import (
+    DummyBackend, LocalWhisperBackend, OpenAIBackend, Transcription, TranscriptionBackend, TranscriptionCache,
+    audio_digest,
+)
+from backend.app.utils.audio_utils import AudioBuffer
+
+TRANSCRIPTION_BACKEND = os.getenv("TRANSCRIPTION_BACKEND", "auto")
+TRANSCRIPTION_CACHE_SIZE = int(os.getenv("TRANSCRIPTION_CACHE_SIZE", 1024))
+TRANSCRIPTION_MAX_DELAY_MS = float(os.getenv("TRANSCRIPTION_MAX_DELAY_MS", 20))
+
+ERROR_TRANSCRIPTION = {
+    "text": "Error in transcription",
+    "words": []
+}
+
+
+def create_backend(name: str = TRANSCRIPTION_BACKEND) -> TranscriptionBackend:
+    api_key = os.getenv("OPENAI_API_KEY")
+    if name == "auto":
+        if api_key:
+            name = "openai"
+        elif importlib.util.find_spec("faster_whisper") is not None:
+            name = "local"
+        else:
+            raise ValueError(
+                "No transcription backend available: set OPENAI_API_KEY or install faster-whisper "
+                "(or set TRANSCRIPTION_BACKEND=dummy for fixed test transcriptions)"
             )
 
-        return {
-            "text": transcript.text,
-            "words": transcript.words
-        }
+    if name == "openai":
+        if not api_key:
+            raise ValueError("TRANSCRIPTION_BACKEND=openai requires OPENAI_API_KEY")
+        return OpenAIBackend(api_key)
+    if name == "local":
+        return LocalWhisperBackend()
+    if name == "dummy":
+        return DummyBackend()
+    raise ValueError(f"TRANSCRIPTION_BACKEND must be one of auto, openai, local, dummy; got {name!r}")
+
+
+_backend: Optional[TranscriptionBackend] = None
+_backend_lock = threading.Lock()
+cache = TranscriptionCache(TRANSCRIPTION_CACHE_SIZE)
+
+
+def get_backend() -> TranscriptionBackend:
+    """
+    The configured backend, created on first use (the openai client is slow
+    to import, so it is not created when this module is).
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_backend()
+    return _backend
+
+
+def _cache_key(audio: AudioBuffer) -> str:
+    return f"{get_backend().identity()}-{audio_digest(audio)}"
+
+
+def _transcription_error(e: Exception) -> Transcription:
+    print(f"Transcription error ({get_backend().name}): {e}")
+    return ERROR_TRANSCRIPTION
+
+
+def transcribe_batch(audios: List[AudioBuffer]) -> List[Transcription]:
+    """
+    Transcriptions of several recordings, each with text and word timestamps.
+
+    Cached recordings are skipped; the rest go to the backend in batches of
+    its max_batch_size. A failed batch yields the error result for its clips.
+    """
+    backend = get_backend()
+    keys = [_cache_key(audio) for audio in audios]
+    results: List[Optional[Transcription]] = [cache.get(key) for key in keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+
+    for start in range(0, len(missing), backend.max_batch_size):
+        batch = missing[start:start + backend.max_batch_size]
+        transcribed = _transcribe_uncached([audios[i] for i in batch], [keys[i] for i in batch])
+        for i, result in zip(batch, transcribed):
+            results[i] = result
+
+    return results
+
+
+def _transcribe_uncached(audios: List[AudioBuffer], keys: List[str]) -> List[Transcription]:
+    """One backend call; successful results are cached."""
+    try:
+        transcribed = get_backend().transcribe_batch(audios)
     except Exception as e:
-        print(f"Whisper API error: {e}")
-        # Return dummy data for testing if API fails or key is missing
-        return {
-            "text": "Error in transcription",
-            "words": []
-        }
+        return [_transcription_error(e)] * len(audios)
+    for key, result in zip(keys, transcribed):
+        cache.put(key, result)
+    return transcribed
+
+
+def transcribe_with_timestamps(audio: AudioBuffer) -> Transcription:
+    """
+    Transcribe a recording and return text with word timestamps.
+    """
+    return transcribe_batch([audio])[0]
+
+
+class _Batcher:
+    """Micro-batches single clips from concurrent requests onto one thread."""
+
+    def __init__(self):
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="transcriber")
+        self._task = asyncio.create_task(self._run())
+
+    def shutdown(self):
+        self._task.cancel()
+        self._thread.shutdown(wait=False)
+
+    async def transcribe(self, audio: AudioBuffer, key: str) -> Transcription:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((audio, key, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        max_delay = TRANSCRIPTION_MAX_DELAY_MS / 1000
+        backend = get_backend()
+        while True:
+            batch: List[Tuple[AudioBuffer, str, asyncio.Future]] = [await self._queue.get()]
+            deadline = loop.time() + max_delay
+
+            while len(batch) < backend.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Callers that went away while queued don't need a result
+            batch = [(audio, key, future) for audio, key, future in batch if not future.done()]
+            if not batch:
+                continue
+
+            # Failures come back as error results, so every caller gets one
+            results = await loop.run_in_executor(
+                self._thread, _transcribe_uncached, [audio for audio, _, _ in batch], [key for _, key, _ in batch]
+            )
+            for result, (_, _, future) in zip(results, batch):
+                if not future.done():
+                    future.set_result(result)
+
+
+_batcher: Optional[_Batcher] = None
+
+
+async def transcribe_with_timestamps_async(audio: AudioBuffer) -> Transcription:
+    """
+    transcribe_with_timestamps() without blocking the event loop.
+    """
+    global _batcher
+    backend = get_backend()
+    key = _cache_key(audio)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    if isinstance(backend, OpenAIBackend):
+        try:
+            result = await backend.transcribe_async(audio)
+        except Exception as e:
+            return _transcription_error(e)
+        cache.put(key, result)
+        return result
+
+    if isinstance(backend, DummyBackend):
+        return transcribe_with_timestamps(audio)
+
+    # Local model: off the event loop, batched with concurrent requests
+    if _batcher is None:
+        _batcher = _Batcher()
+    return await _batcher.transcribe(audio, key)
+
+
+def shutdown() -> None:
+    global _batcher
+    if _batcher is not None:
+        _batcher.shutdown()
+        _batcher = None
@@ -0,0 +1,150 @@
+"""
+Incremental feature extraction for live EEG streams.
+
+A StreamingFeatureEngine keeps the most recent analysis window of one stream in
+a ring buffer and caches the windowed FFT of every Welch segment by its
+absolute sample position. When the window slides forward, segments that are
+still inside it are reused and only the segments ending in new data are
+transformed. With a hop that divides the Welch step (1 s at 256 Hz: 1, 1/2,
+1/4 s, ...) every tick computes exactly one new segment FFT per channel.
+
+/ws/simulate hands the new segments (missing_segments()) to InferenceExecutor's
+process pool, so the FFTs run off the server's GIL, batched with the other live
+sessions; features() then only averages cached spectra and computes moments.
+"""
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+from .feature_extraction import (
+    welch_nperseg,
+    compute_segment_spectra,
+    psd_from_spectra,
+    compute_band_powers,
+    compute_moments,
+    compute_connectivity,
+    stack_channel_features,
+)
+
+
+class StreamingFeatureEngine:
+    """
+    Per-connection streaming feature state.
+
+    Features of the current window match extract_features_from_segment() on
+    the same samples up to floating-point rounding of the PSD.
+    """
+
+    def __init__(self, n_channels: int = 16, fs: int = 256, window_size_sec: float = 4):
+        self.n_channels = n_channels
+        self.fs = fs
+        self.window_size = int(window_size_sec * fs)
+
+        self.nperseg = welch_nperseg(self.window_size, fs)
+        self.step = self.nperseg - self.nperseg // 2
+        self.n_segments = (self.window_size - self.nperseg) // self.step + 1
+
+        # Mirrored ring buffer: every sample is written twice, so the latest
+        # window is always the contiguous slice _buffer[:, _pos:_pos + window_size]
+        self._buffer = np.zeros((n_channels, 2 * self.window_size))
+        self._pos = 0
+        self.total_samples = 0
+
+        # Absolute start sample -> [n_channels, n_freqs] segment spectrum
+        self._spectra: Dict[int, np.ndarray] = {}
+
+    @property
+    def ready(self) -> bool:
+        """True once a full window has been received."""
+        return self.total_samples >= self.window_size
+
+    def push(self, chunk: np.ndarray) -> None:
+        """
+        Append new samples to the stream.
+
+        Args:
+            chunk: 2D array [n_samples, n_channels]
+        """
+        chunk = np.asarray(chunk, dtype=np.float64)
+        if chunk.ndim != 2 or chunk.shape[1] != self.n_channels:
+            raise ValueError(f"Expected chunk [n_samples, {self.n_channels}], got shape {chunk.shape}")
+
+        # Only the last window_size samples can ever be read back
+        data = chunk[-self.window_size:].T
+        n = data.shape[1]
+
+        first = min(n, self.window_size - self._pos)
+        for offset in (0, self.window_size):
+            self._buffer[:, self._pos + offset:self._pos + offset + first] = data[:, :first]
+            self._buffer[:, offset:offset + n - first] = data[:, first:]
+
+        self._pos = (self._pos + n) % self.window_size
+        self.total_samples += len(chunk)
+
+    def window(self) -> np.ndarray:
+        """The latest window as [n_channels, window_size] (a view into the buffer)."""
+        return self._buffer[:, self._pos:self._pos + self.window_size]
+
+    def missing_segments(self) -> Tuple[List[int], np.ndarray]:
+        """
+        Welch segments of the latest window whose spectra are not cached yet.
+
+        Returns:
+            (absolute start samples, segments [n_missing, n_channels, nperseg]);
+            pass their compute_segment_spectra() to add_spectra().
+        """
+        window = self.window()
+        window_start = self.total_samples - self.window_size
+
+        starts, segments = [], []
+        for k in range(self.n_segments):
+            offset = k * self.step
+            if window_start + offset not in self._spectra:
+                starts.append(window_start + offset)
+                segments.append(window[:, offset:offset + self.nperseg])
+
+        if not segments:
+            return starts, np.empty((0, self.n_channels, self.nperseg))
+        return starts, np.stack(segments)
+
+    def add_spectra(self, starts: List[int], spectra: np.ndarray) -> None:
+        """
+        Caches segment spectra computed elsewhere (e.g. in a worker process).
+
+        Args:
+            starts: Absolute start samples from missing_segments().
+            spectra: Complex array [n_missing, n_channels, n_freqs].
+        """
+        for start, spectrum in zip(starts, spectra):
+            self._spectra[start] = spectrum
+
+    def features(self, connectivity: bool = False) -> Optional[np.ndarray]:
+        """
+        Feature vector of the latest window, or None until the window is full.
+
+        Segment spectra that are not cached yet are computed here, in one call.
+        With connectivity=True the cross-channel features are appended, computed
+        from the same cached segment spectra.
+        """
+        if not self.ready:
+            return None
+
+        # Reuse cached segment spectra, transform only the missing segments
+        starts, segments = self.missing_segments()
+        if starts:
+            self.add_spectra(starts, compute_segment_spectra(segments, self.fs, self.nperseg)[:, :, 0])
+
+        window = self.window()
+        window_start = self.total_samples - self.window_size
+
+        # Segments that slid out of the window can never be reused
+        for start in [s for s in self._spectra if s < window_start]:
+            del self._spectra[start]
+
+        spectra = np.stack([self._spectra[window_start + k * self.step] for k in range(self.n_segments)], axis=1)
+        freqs, psd = psd_from_spectra(spectra, self.fs, self.nperseg)
+        absolute, relative = compute_band_powers(freqs, psd)
+
+        features = stack_channel_features(compute_moments(window), absolute, relative)
+        if connectivity:
+            features = np.concatenate([features, compute_connectivity(window, spectra, freqs)])
+        return features
@@ -0,0 +1,196 @@
+"""
+Flattened tree-ensemble predictor.
+
+sklearn forests walk every tree in Python-level estimator loops (and with
+n_jobs, through a thread pool) on each call, which dominates latency when
+scoring a single row. compile_model() copies the trees of a fitted
+RandomForest / ExtraTrees / GradientBoosting classifier into contiguous node
+arrays; all trees are then traversed together, one vectorized step per tree
+level, and class and probability come out of that single traversal.
+
+Predictions are the same as sklearn's: inputs are compared as float32 like
+sklearn's trees, and leaf contributions are accumulated in tree order.
+"""
+import numpy as np
+from abc import ABC, abstractmethod
+from typing import Tuple
+
+TREE_LEAF = -1
+
+
+class Predictor(ABC):
+    """Classifier interface of compile_model() results."""
+
+    classes_: np.ndarray
+
+    @abstractmethod
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        ...
+
+    def predict_with_proba(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns (predicted classes, class probabilities) from one evaluation.
+        """
+        proba = self.predict_proba(X)
+        return self.classes_[np.argmax(proba, axis=1)], proba
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.predict_with_proba(X)[0]
+
+
+class SklearnPredictor(Predictor):
+    """Any fitted sklearn classifier that cannot be flattened."""
+
+    def __init__(self, model):
+        self.model = model
+        self.classes_ = model.classes_
+        self.n_features_in_ = getattr(model, "n_features_in_", None)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        return self.model.predict_proba(X)
+
+
+class FlatTreeEnsemble(Predictor):
+    """
+    All trees of an ensemble as flat node arrays.
+
+    Leaves point to themselves (feature 0, threshold +inf), so every tree can
+    be stepped max_depth times without checking for leaves.
+
+    Exposes classes_ and n_features_in_ like the sklearn model it was
+    compiled from.
+    """
+
+    def __init__(self, trees, leaf_values: list, classes: np.ndarray, n_features: int):
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+
+        self.classes_ = classes
+        self.n_features_in_ = n_features
+        self.n_trees = len(trees)
+        self.max_depth = max(tree.max_depth for tree in trees)
+        self.roots = offsets[:-1].astype(np.intp)
+
+        feature, threshold, left, right = [], [], [], []
+        for tree, offset in zip(trees, offsets):
+            is_leaf = tree.children_left == TREE_LEAF
+            nodes = np.arange(tree.node_count) + offset
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(np.where(is_leaf, np.inf, tree.threshold))
+            left.append(np.where(is_leaf, nodes, tree.children_left + offset))
+            right.append(np.where(is_leaf, nodes, tree.children_right + offset))
+
+        self.feature = np.concatenate(feature).astype(np.intp)
+        self.threshold = np.concatenate(threshold)
+        self.left = np.concatenate(left).astype(np.intp)
+        self.right = np.concatenate(right).astype(np.intp)
+        # [total_nodes, n_outputs] leaf contributions (only leaf rows are ever read)
+        self.value = np.ascontiguousarray(np.concatenate(leaf_values))
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """
+        Leaf node (global index) of every row in every tree: [n_rows, n_trees].
+        """
+        # sklearn trees compare float32 features against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has shape {X.shape}, expected [n_rows, {self.n_features_in_}]")
+
+        rows = np.arange(len(X))[:, np.newaxis]
+        nodes = np.broadcast_to(self.roots, (len(X), self.n_trees))
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def _accumulate(self, leaves: np.ndarray, initial: np.ndarray) -> np.ndarray:
+        """
+        initial + the leaf values of all trees, added tree by tree in the same
+        order as sklearn (cumsum never reorders the additions, unlike sum).
+        """
+        terms = np.concatenate([initial[np.newaxis], self.value[leaves.T]])
+        return np.cumsum(terms, axis=0)[-1]
+
+
+class FlatForest(FlatTreeEnsemble):
+    """RandomForestClassifier / ExtraTreesClassifier: mean of per-tree class frequencies."""
+
+    def __init__(self, model):
+        trees = [estimator.tree_ for estimator in model.estimators_]
+
+        leaf_values = []
+        for tree in trees:
+            value = tree.value[:, 0, :]
+            normalizer = value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            leaf_values.append(value / normalizer)
+
+        super().__init__(trees, leaf_values, model.classes_, model.n_features_in_)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        leaves = self.apply(X)
+        proba = self._accumulate(leaves, np.zeros((len(leaves), len(self.classes_))))
+        proba /= self.n_trees
+        return proba
+
+
+class FlatGradientBoosting(FlatTreeEnsemble):
+    """GradientBoostingClassifier with a constant (prior or zero) init estimator."""
+
+    def __init__(self, model):
+        # [n_stages, K] regression trees, K = 1 for binary problems
+        stages = model.estimators_
+        self.n_outputs = stages.shape[1]
+        self.learning_rate = model.learning_rate
+
+        if model.init_ == "zero":
+            self.init_raw = np.zeros(self.n_outputs)
+        else:
+            self.init_raw = model._raw_predict_init(np.zeros((1, model.n_features_in_)))[0]
+
+        trees, leaf_values = [], []
+        for stage in stages:
+            for k, estimator in enumerate(stage):
+                # Stage k only contributes to raw output k, pre-scaled like sklearn
+                value = np.zeros((estimator.tree_.node_count, self.n_outputs))
+                value[:, k] = self.learning_rate * estimator.tree_.value[:, 0, 0]
+                trees.append(estimator.tree_)
+                leaf_values.append(value)
+
+        super().__init__(trees, leaf_values, model.classes_, model.n_features_in_)
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        leaves = self.apply(X)
+        return self._accumulate(leaves, np.tile(self.init_raw, (len(leaves), 1)))
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        from scipy.special import expit, softmax
+        raw = self.decision_function(X)
+        if self.n_outputs == 1:
+            proba = np.empty((len(raw), 2))
+            proba[:, 1] = expit(raw[:, 0])
+            proba[:, 0] = 1 - proba[:, 1]
+            return proba
+        return softmax(raw, axis=1)
+
+
+def compile_model(model) -> Predictor:
+    """
+    Flattens a fitted sklearn tree-ensemble classifier for fast scoring.
+
+    Models that cannot be flattened (pipelines, linear models, multi-output
+    forests, custom boosting init estimators) are wrapped as they are, so
+    callers always get predict_with_proba() and the same predictions.
+    """
+    # sklearn is only needed here, at model load, not to import this module
+    from sklearn.dummy import DummyClassifier
+    from sklearn.ensemble import ExtraTreesClassifier, GradientBoostingClassifier, RandomForestClassifier
+
+    if isinstance(model, (RandomForestClassifier, ExtraTreesClassifier)) and model.n_outputs_ == 1:
+        return FlatForest(model)
+
+    if isinstance(model, GradientBoostingClassifier) and (
+        model.init_ == "zero" or isinstance(model.init_, DummyClassifier)
+    ):
+        return FlatGradientBoosting(model)
+
+    return SklearnPredictor(model)
@@ -1,8 +1,83 @@
 import io
+import os
 import numpy as np
 import librosa
 import soundfile as sf
 from pydub import AudioSegment
+from typing import Dict, Tuple
+
+
+class AudioBuffer:
+    """
+    An uploaded recording decoded once and shared by every speech analyzer.
+
+    samples is mono float32 at the file's own rate (what librosa.load(path,
+    sr=None) returns). Resampled copies and 16-bit PCM for VAD are computed
+    on first use and cached; the encoded bytes are kept for transcription.
+    """
+
+    def __init__(self, samples: np.ndarray, sr: int, encoded: bytes = b"", filename: str = "audio.wav"):
+        self.samples = np.ascontiguousarray(samples, dtype=np.float32)
+        self.sr = int(sr)
+        self.encoded = encoded
+        self.filename = filename
+        self._resampled: Dict[int, np.ndarray] = {sr: self.samples}
+        self._pcm16: Dict[int, bytes] = {}
+
+    @classmethod
+    def from_bytes(cls, audio_bytes: bytes, filename: str = "audio.wav") -> "AudioBuffer":
+        """
+        Decodes an upload (any format soundfile reads, else via pydub/ffmpeg).
+
+        Raises:
+            ValueError: if the audio cannot be decoded
+        """
+        samples, sr = decode_audio(audio_bytes)
+        return cls(samples, sr, audio_bytes, filename)
+
+    @classmethod
+    def from_file(cls, path: str) -> "AudioBuffer":
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read(), os.path.basename(path))
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / self.sr
+
+    def resampled(self, sr: int) -> np.ndarray:
+        """Mono float32 samples at sr (cached)."""
+        if sr not in self._resampled:
+            self._resampled[sr] = librosa.resample(y=self.samples, orig_sr=self.sr, target_sr=sr)
+        return self._resampled[sr]
+
+    def pcm16(self, sr: int = 16000) -> bytes:
+        """16-bit little-endian mono PCM at sr, as webrtcvad expects (cached)."""
+        if sr not in self._pcm16:
+            samples = np.clip(self.resampled(sr), -1.0, 1.0)
+            self._pcm16[sr] = np.round(samples * 32767).astype("<i2").tobytes()
+        return self._pcm16[sr]
+
+    def upload(self) -> Tuple[str, bytes]:
+        """(filename, encoded bytes), the file argument for upload APIs."""
+        return self.filename, self.encoded
+
+
+def decode_audio(audio_bytes: bytes) -> Tuple[np.ndarray, int]:
+    """
+    Decodes audio bytes to (mono float32 samples, native sample rate).
+    """
+    try:
+        data, samplerate = sf.read(io.BytesIO(audio_bytes), dtype="float32", always_2d=True)
+        # Channel average, like librosa.to_mono
+        return data.mean(axis=1, dtype=np.float32), samplerate
+    except Exception as e:
+        # Compressed browser formats (webm/ogg-opus, mp4) go through ffmpeg
+        try:
+            audio = AudioSegment.from_file(io.BytesIO(audio_bytes)).set_channels(1)
+            scale = float(1 << (8 * audio.sample_width - 1))
+            return np.array(audio.get_array_of_samples()).astype(np.float32) / scale, audio.frame_rate
+        except Exception as e2:
+            raise ValueError(f"Failed to decode audio: {e} | {e2}")
 
 def convert_audio_format(input_bytes: bytes, output_format='wav') -> bytes:
     """
@@ -0,0 +1,84 @@
+"""
+Binary request bodies for the EEG inference endpoints.
+
+Besides JSON, /predict and /predict/batch accept:
+    - application/octet-stream: raw little-endian float32 samples in C order,
+      with the array shape in the X-EEG-Shape header (e.g. "1024,16").
+    - application/x-npy: a single .npy array (any numeric dtype).
+
+Both are decoded with np.frombuffer directly on the request body, without
+per-value parsing or an intermediate copy.
+"""
+import io
+import numpy as np
+from fastapi import HTTPException
+from typing import Optional, Tuple
+
+OCTET_STREAM_CONTENT_TYPE = "application/octet-stream"
+NPY_CONTENT_TYPES = ("application/x-npy", "application/npy")
+BINARY_CONTENT_TYPES = (OCTET_STREAM_CONTENT_TYPE,) + NPY_CONTENT_TYPES
+
+SHAPE_HEADER = "X-EEG-Shape"
+
+RAW_DTYPE = np.dtype("<f4")
+
+
+def is_binary_content_type(content_type: Optional[str]) -> bool:
+    return (content_type or "").split(";")[0].strip().lower() in BINARY_CONTENT_TYPES
+
+
+def parse_shape_header(value: Optional[str]) -> Tuple[int, ...]:
+    if not value:
+        raise HTTPException(status_code=400, detail=f"{SHAPE_HEADER} header is required for {OCTET_STREAM_CONTENT_TYPE} bodies")
+    try:
+        shape = tuple(int(dim) for dim in value.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {SHAPE_HEADER} header: {value}")
+    if any(dim <= 0 for dim in shape):
+        raise HTTPException(status_code=400, detail=f"Invalid {SHAPE_HEADER} header: {value}")
+    return shape
+
+
+def decode_raw_float32(body: bytes, shape: Tuple[int, ...]) -> np.ndarray:
+    """
+    Decodes a raw float32 body into a read-only array view of the given shape.
+    """
+    expected = int(np.prod(shape)) * RAW_DTYPE.itemsize
+    if len(body) != expected:
+        raise HTTPException(status_code=400, detail=f"Body has {len(body)} bytes, shape {shape} needs {expected}")
+    return np.frombuffer(body, dtype=RAW_DTYPE).reshape(shape)
+
+
+def decode_npy(body: bytes) -> np.ndarray:
+    """
+    Decodes a .npy body into a read-only array view (header parsed, data not copied).
+    """
+    try:
+        fp = io.BytesIO(body)
+        version = np.lib.format.read_magic(fp)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(fp)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(fp)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid .npy body: {str(e)}")
+
+    if dtype.kind not in "fiu":
+        raise HTTPException(status_code=400, detail=f"Unsupported .npy dtype: {dtype}")
+
+    count = int(np.prod(shape))
+    offset = fp.tell()
+    if len(body) - offset != count * dtype.itemsize:
+        raise HTTPException(status_code=400, detail="Truncated .npy body")
+
+    data = np.frombuffer(body, dtype=dtype, count=count, offset=offset)
+    return data.reshape(shape, order="F" if fortran_order else "C")
+
+
+def decode_binary_eeg(body: bytes, content_type: str, shape_header: Optional[str]) -> np.ndarray:
+    """
+    Decodes a binary EEG request body according to its content type.
+    """
+    if content_type.split(";")[0].strip().lower() in NPY_CONTENT_TYPES:
+        return decode_npy(body)
+    return decode_raw_float32(body, parse_shape_header(shape_header))
@@ -0,0 +1,117 @@
+"""
+Websocket payload encoding and backpressure for live EEG streams.
+
+Binary frames are laid out as:
+    uint32 little-endian header length
+    UTF-8 JSON header (tick metadata plus "dtype", "shape" and "scale")
+    samples in C order [n_samples, n_channels], value = stored * scale
+"""
+import asyncio
+import json
+import struct
+import numpy as np
+from fastapi import WebSocket
+from typing import Any, Dict, Optional, Tuple, Union
+
+# Sample encodings a client can negotiate for binary frames
+FRAME_DTYPES = {
+    "float32": np.dtype("<f4"),
+    "float16": np.dtype("<f2"),
+    "int16": np.dtype("<i2"),
+}
+
+
+def decimate_minmax(window: np.ndarray, width: int) -> np.ndarray:
+    """
+    Peak-preserving decimation of [n_samples, n_channels] to at most `width` rows.
+
+    Samples are split into width // 2 buckets and each bucket contributes its
+    minimum and maximum, so spikes stay visible at any plot width. A width of
+    1 has no room for both: the single row is the mean of the window.
+    """
+    n_samples = len(window)
+    if width <= 0 or width >= n_samples:
+        return window
+    if width == 1:
+        return np.mean(window, axis=0, keepdims=True).astype(window.dtype)
+
+    n_buckets = width // 2
+    starts = (np.arange(n_buckets) * n_samples) // n_buckets
+
+    decimated = np.empty((2 * n_buckets, window.shape[1]), dtype=window.dtype)
+    decimated[0::2] = np.minimum.reduceat(window, starts, axis=0)
+    decimated[1::2] = np.maximum.reduceat(window, starts, axis=0)
+    return decimated
+
+
+def encode_samples(samples: np.ndarray, dtype: str) -> Tuple[np.ndarray, float]:
+    """
+    Converts samples to the negotiated dtype; returns (encoded, scale).
+
+    int16 is scaled so the frame's peak maps to 32767. float16 is scaled so
+    the peak maps to 1: EDF recordings are in volts (~1e-6), which would
+    otherwise fall in float16's subnormal range and lose most of their
+    precision. float32 is sent unscaled.
+    """
+    if dtype == "float32":
+        return samples.astype(FRAME_DTYPES[dtype]), 1.0
+
+    peak = float(np.max(np.abs(samples))) if samples.size else 0.0
+    full_scale = 32767 if dtype == "int16" else 1
+    scale = peak / full_scale if peak > 0 else 1.0
+    scaled = samples / scale
+    if dtype == "int16":
+        scaled = np.round(scaled)
+    return scaled.astype(FRAME_DTYPES[dtype]), scale
+
+
+def encode_binary_frame(metadata: Dict[str, Any], samples: np.ndarray, dtype: str) -> bytes:
+    encoded, scale = encode_samples(samples, dtype)
+    header = json.dumps({**metadata, "dtype": dtype, "shape": list(encoded.shape), "scale": scale}).encode("utf-8")
+    return struct.pack("<I", len(header)) + header + np.ascontiguousarray(encoded).tobytes()
+
+
+class LatestFrameSender:
+    """
+    Sends frames to one websocket, keeping at most one frame pending.
+
+    A frame offered while the previous one is still waiting to be sent
+    replaces it (the stale frame is dropped), so a slow client only ever
+    receives the freshest data instead of an ever-growing backlog.
+    """
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.dropped_frames = 0
+        self._pending: Optional[Union[str, bytes]] = None
+        self._ready = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    def offer(self, frame: Union[str, bytes]) -> None:
+        if self._pending is not None:
+            self.dropped_frames += 1
+        self._pending = frame
+        self._idle.clear()
+        self._ready.set()
+
+    async def join(self) -> None:
+        """Waits until the pending frame is sent (or the sender has stopped)."""
+        await self._idle.wait()
+
+    async def run(self) -> None:
+        try:
+            while True:
+                await self._ready.wait()
+                self._ready.clear()
+                frame, self._pending = self._pending, None
+
+                if isinstance(frame, bytes):
+                    await self.websocket.send_bytes(frame)
+                else:
+                    await self.websocket.send_text(frame)
+
+                if self._pending is None:
+                    self._idle.set()
+        finally:
+            self._idle.set()
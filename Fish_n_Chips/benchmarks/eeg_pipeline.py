@@ -0,0 +1,237 @@
+"""
+EEG hot-path benchmark.
+
+Times each pipeline stage separately on synthetic recordings:
+    parse_csv, parse_edf, decode_npy, resample   whole recordings, for every
+                                                 --seconds x --channels size
+    extract_features, run_inference              one 4 s / 16-channel window per call
+
+and reports calls, p50/p99 latency, throughput (signal seconds processed per
+wall-clock second, i.e. x realtime) and memory. Every case runs in a fresh
+process, so peak RSS is that of the case alone; "stage RSS" is how much the
+stage itself raised the peak above its inputs.
+
+Run from the project root:
+    python -m benchmarks.eeg_pipeline
+    python -m benchmarks.eeg_pipeline --seconds 4 600 3600 --channels 16 64 --json baseline.json
+    python -m benchmarks.eeg_pipeline --compare baseline.json
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+import joblib
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.app.data_processing import parse_csv, parse_edf, resample_to_target, REQUIRED_CHANNELS, TARGET_SFREQ
+from backend.app.feature_extraction import extract_features_from_segment
+from backend.app.wire_format import decode_npy
+from benchmarks.synthetic_eeg import channel_names, generate_eeg, to_csv_text, to_edf_bytes, to_npy_bytes
+
+RECORDING_STAGES = ["parse_csv", "parse_edf", "decode_npy", "resample"]
+WINDOW_STAGES = ["extract_features", "run_inference"]
+STAGES = RECORDING_STAGES + WINDOW_STAGES
+
+WINDOW_SEC = 4
+MODEL_PATH = os.path.join("models", "eeg_best_model.joblib")
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+
+def load_model():
+    """The trained EEG model if present, else a RandomForest fit on random features."""
+    if os.path.exists(MODEL_PATH):
+        return joblib.load(MODEL_PATH), "trained"
+
+    from sklearn.ensemble import RandomForestClassifier
+    n_features = len(extract_features_from_segment(np.zeros((WINDOW_SEC * TARGET_SFREQ, 16)), TARGET_SFREQ))
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((500, n_features))
+    y = (X[:, 0] > 0).astype(int)
+    return RandomForestClassifier(n_estimators=100, random_state=0).fit(X, y), "synthetic"
+
+
+def time_calls(fn: Callable[[], Any], n_calls: int) -> List[float]:
+    fn()  # warm-up (imports, caches, pool start-up)
+    timings = []
+    for _ in range(n_calls):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def time_calls_async(fn: Callable[[], Any], n_calls: int) -> List[float]:
+    await fn()
+    timings = []
+    for _ in range(n_calls):
+        start = time.perf_counter()
+        await fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def bench_run_inference(windows: np.ndarray) -> Dict[str, Any]:
+    # The real endpoint path: executor pool, micro-batched scoring, compiled model
+    from backend.app import main
+    from backend.app.inference_executor import InferenceExecutor
+    from backend.app.tree_ensemble import compile_model
+
+    model, model_kind = load_model()
+
+    async def run():
+        main.model = compile_model(model)
+        main.executor = InferenceExecutor(main.model)
+        await main.executor.start()
+        try:
+            it = iter(windows)
+            return await time_calls_async(lambda: main.run_inference(next(it), TARGET_SFREQ), len(windows) - 1)
+        finally:
+            await main.executor.shutdown()
+
+    return {"timings": asyncio.run(run()), "model": model_kind}
+
+
+def run_case(case: Dict[str, Any]) -> Dict[str, Any]:
+    """Runs one (stage, size) case; executed in its own process."""
+    stage, seconds, n_channels = case["stage"], case["seconds"], case["channels"]
+    fs = case["edf_fs"] if stage in ("parse_edf", "resample") else TARGET_SFREQ
+    names = channel_names(n_channels)
+    extra: Dict[str, Any] = {}
+
+    if stage in WINDOW_STAGES:
+        n_windows = case["windows"] + 1
+        data = generate_eeg(n_windows * WINDOW_SEC, len(REQUIRED_CHANNELS))
+        windows = data.reshape(n_windows, WINDOW_SEC * TARGET_SFREQ, -1).astype(np.float64)
+        input_bytes = windows[0].nbytes
+        signal_sec = WINDOW_SEC
+    else:
+        data = generate_eeg(seconds, n_channels, fs)
+        signal_sec = seconds
+        if stage == "parse_csv":
+            payload = to_csv_text(data, names)
+        elif stage == "parse_edf":
+            payload = to_edf_bytes(data, names, fs)
+        elif stage == "decode_npy":
+            payload = to_npy_bytes(data)
+        else:
+            payload = np.ascontiguousarray(data.T, dtype=np.float64)
+        input_bytes = payload.nbytes if isinstance(payload, np.ndarray) else len(payload)
+        del data
+
+    rss_before = peak_rss_mb()
+
+    if stage == "parse_csv":
+        timings = time_calls(lambda: parse_csv(payload), case["repeat"])
+    elif stage == "parse_edf":
+        timings = time_calls(lambda: parse_edf(payload), case["repeat"])
+    elif stage == "decode_npy":
+        timings = time_calls(lambda: np.array(decode_npy(payload)), case["repeat"])
+    elif stage == "resample":
+        timings = time_calls(lambda: resample_to_target(payload, fs), case["repeat"])
+    elif stage == "extract_features":
+        it = iter(windows)
+        timings = time_calls(lambda: extract_features_from_segment(next(it), TARGET_SFREQ), len(windows) - 1)
+    else:
+        result = bench_run_inference(windows)
+        timings, extra["model"] = result["timings"], result["model"]
+
+    timings_ms = np.array(timings) * 1000
+    return {
+        **case,
+        **extra,
+        "calls": len(timings),
+        "p50_ms": float(np.percentile(timings_ms, 50)),
+        "p99_ms": float(np.percentile(timings_ms, 99)),
+        "x_realtime": signal_sec * len(timings) / (timings_ms.sum() / 1000),
+        "input_mb": input_bytes / 1024 ** 2,
+        "peak_rss_mb": peak_rss_mb(),
+        "stage_rss_mb": peak_rss_mb() - rss_before,
+    }
+
+
+def build_cases(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    cases = []
+    for stage in args.stages:
+        if stage in WINDOW_STAGES:
+            cases.append({"stage": stage, "seconds": WINDOW_SEC, "channels": 16, "windows": args.windows})
+            continue
+        # parse_edf resamples only the picked model channels
+        stage_channels = [len(REQUIRED_CHANNELS)] if stage == "resample" else args.channels
+        for seconds in args.seconds:
+            for n_channels in stage_channels:
+                cases.append({"stage": stage, "seconds": seconds, "channels": n_channels, "repeat": args.repeat})
+
+    for case in cases:
+        case["edf_fs"] = args.edf_fs
+    return cases
+
+
+def case_id(result: Dict[str, Any]) -> str:
+    return f"{result['stage']}/{result['seconds']:g}s/{result['channels']}ch"
+
+
+def print_results(results: List[Dict[str, Any]], baseline: Optional[Dict[str, Dict[str, Any]]]) -> None:
+    header = f"{'case':<28}{'calls':>6}{'p50 ms':>11}{'p99 ms':>11}{'x realtime':>12}{'input MB':>10}{'peak RSS':>10}{'stage RSS':>10}"
+    if baseline:
+        header += f"{'p50 vs base':>13}"
+    print(header)
+
+    for r in results:
+        line = (
+            f"{case_id(r):<28}{r['calls']:>6}{r['p50_ms']:>11.3f}{r['p99_ms']:>11.3f}"
+            f"{r['x_realtime']:>12.1f}{r['input_mb']:>10.1f}{r['peak_rss_mb']:>10.1f}{r['stage_rss_mb']:>10.1f}"
+        )
+        if baseline:
+            base = baseline.get(case_id(r))
+            line += f"{(r['p50_ms'] / base['p50_ms'] - 1) * 100:>+12.1f}%" if base else f"{'-':>13}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the EEG parsing, feature and inference stages.")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--seconds", nargs="+", type=float, default=[4, 60, 600], help="Recording lengths")
+    parser.add_argument("--channels", nargs="+", type=int, default=[16, 64], help="Channel counts (>= 16)")
+    parser.add_argument("--edf-fs", type=int, default=500, help="EDF sampling rate (!= 256 exercises resampling)")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed calls per recording case")
+    parser.add_argument("--windows", type=int, default=500, help="Timed calls per window stage")
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--compare", help="Baseline results file (from --json) to compare p50 against")
+    args = parser.parse_args()
+
+    if min(args.channels) < len(REQUIRED_CHANNELS):
+        parser.error(f"--channels must be at least {len(REQUIRED_CHANNELS)}")
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = {case_id(r): r for r in json.load(f)["results"]}
+
+    results = []
+    for case in build_cases(args):
+        # Fresh process per case: isolated peak RSS, no cache carry-over
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            result = pool.submit(run_case, case).result()
+        results.append(result)
+        print(f"  {case_id(result)}: p50 {result['p50_ms']:.3f} ms", file=sys.stderr)
+
+    print_results(results, baseline)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"python": sys.version.split()[0], "numpy": np.__version__, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
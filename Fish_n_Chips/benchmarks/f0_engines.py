@@ -0,0 +1,185 @@
+"""
+F0 engine benchmark: speed and accuracy of each pitch engine against pyin.
+
+Runs every engine of backend/app/services/speech/pitch.py on each recording
+and reports, per engine:
+    ms per second of audio (median over recordings) and speedup vs pyin
+    |pitch_mean - pyin| and |pitch_std - pyin| in Hz and percent, i.e. the
+    error in the two values extract_acoustic_features actually keeps
+    voiced fraction (share of frames with an F0)
+
+Timings include resampling to the engine's rate (a fresh AudioBuffer per
+call) but not decoding the file. Without recordings, synthetic voiced
+utterances (glottal pulse train through three formants, with pauses) at
+low, mid and high speaking pitch are used, and their true F0 is reported
+as well.
+
+Run from the project root:
+    python -m benchmarks.f0_engines
+    python -m benchmarks.f0_engines recordings/*.wav --json f0.json
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+import numpy as np
+import scipy.signal
+from typing import Any, Dict, List, Optional
+
+from backend.app.services.speech.pitch import ENGINES
+from backend.app.utils.audio_utils import AudioBuffer
+
+REFERENCE_ENGINE = "pyin"
+
+# (name, base F0 Hz, sample rate)
+SYNTHETIC_VOICES = [("low", 110, 44100), ("mid", 180, 48000), ("high", 290, 16000)]
+FORMANTS = [(700, 110), (1200, 120), (2600, 160)]
+
+
+def synthetic_utterance(seconds: float, sr: int, f0_base: float, seed: int = 0):
+    """
+    A voiced utterance with declining, vibrato-modulated F0 and pauses.
+
+    Returns (samples, true F0 mean, true F0 std) over voiced time.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sr)) / sr
+    f0 = f0_base * (1.15 - 0.3 * t / seconds) * (1 + 0.03 * np.sin(2 * np.pi * 5 * t))
+
+    pulses = np.diff(np.floor(np.cumsum(f0) / sr), prepend=0) > 0
+    y = scipy.signal.lfilter([1], [1, -0.97], pulses.astype(float))
+    for center, bandwidth in FORMANTS:
+        r = np.exp(-np.pi * bandwidth / sr)
+        theta = 2 * np.pi * center / sr
+        y = scipy.signal.lfilter([1 - r], [1, -2 * r * np.cos(theta), r * r], y)
+
+    # Words of 0.4-0.9 s separated by 0.2-0.6 s pauses
+    voiced = np.zeros(len(t), dtype=bool)
+    position = 0.2
+    while position < seconds - 0.4:
+        length = rng.uniform(0.4, 0.9)
+        voiced[(t >= position) & (t < position + length)] = True
+        position += length + rng.uniform(0.2, 0.6)
+
+    y = y / np.abs(y).max() * 0.5 * voiced + rng.standard_normal(len(t)) * 0.002
+    return y.astype(np.float32), float(f0[voiced].mean()), float(f0[voiced].std())
+
+
+def load_recordings(paths: List[str], seconds: float) -> List[Dict[str, Any]]:
+    if not paths:
+        recordings = []
+        for i, (name, f0_base, sr) in enumerate(SYNTHETIC_VOICES):
+            samples, true_mean, true_std = synthetic_utterance(seconds, sr, f0_base, seed=i)
+            recordings.append({"name": f"synthetic-{name}-{sr // 1000}k", "samples": samples, "sr": sr,
+                               "true_mean": true_mean, "true_std": true_std})
+        return recordings
+
+    files = []
+    for path in paths:
+        files.extend(sorted(glob.glob(os.path.join(path, "*.wav"))) if os.path.isdir(path) else [path])
+
+    recordings = []
+    for path in files:
+        audio = AudioBuffer.from_file(path)
+        recordings.append({"name": os.path.basename(path), "samples": audio.samples, "sr": audio.sr})
+    return recordings
+
+
+def run_engine(engine: str, recording: Dict[str, Any], repeat: int) -> Dict[str, Any]:
+    fn = ENGINES[engine]
+    timings = []
+    for _ in range(repeat + 1):
+        audio = AudioBuffer(recording["samples"], recording["sr"])
+        start = time.perf_counter()
+        f0 = fn(audio)
+        timings.append(time.perf_counter() - start)
+
+    voiced = f0[~np.isnan(f0)]
+    return {
+        # First call is warm-up (numba compilation for pyin)
+        "seconds": float(np.median(timings[1:])),
+        "pitch_mean": float(voiced.mean()) if len(voiced) else 0.0,
+        "pitch_std": float(voiced.std()) if len(voiced) else 0.0,
+        "voiced_fraction": len(voiced) / max(len(f0), 1),
+    }
+
+
+def summarize(engine: str, results: List[Dict[str, Any]], reference: List[Dict[str, Any]],
+              recordings: List[Dict[str, Any]]) -> Dict[str, Any]:
+    durations = np.array([len(r["samples"]) / r["sr"] for r in recordings])
+    ms_per_sec = np.array([r["seconds"] for r in results]) * 1000 / durations
+    ref_ms_per_sec = np.array([r["seconds"] for r in reference]) * 1000 / durations
+
+    def errors(key, target):
+        values = np.array([r[key] for r in results])
+        return np.abs(values - target), np.abs(values - target) / np.maximum(np.abs(target), 1e-9) * 100
+
+    ref_mean = np.array([r["pitch_mean"] for r in reference])
+    ref_std = np.array([r["pitch_std"] for r in reference])
+    mean_hz, mean_pct = errors("pitch_mean", ref_mean)
+    std_hz, std_pct = errors("pitch_std", ref_std)
+
+    summary = {
+        "engine": engine,
+        "ms_per_audio_sec": float(np.median(ms_per_sec)),
+        "speedup": float(np.median(ref_ms_per_sec / ms_per_sec)),
+        "mean_err_hz": float(mean_hz.mean()),
+        "mean_err_pct": float(mean_pct.mean()),
+        "std_err_hz": float(std_hz.mean()),
+        "std_err_pct": float(std_pct.mean()),
+        "voiced_fraction": float(np.mean([r["voiced_fraction"] for r in results])),
+    }
+    if all("true_mean" in r for r in recordings):
+        truth_hz, _ = errors("pitch_mean", np.array([r["true_mean"] for r in recordings]))
+        summary["mean_err_vs_truth_hz"] = float(truth_hz.mean())
+    return summary
+
+
+def print_summaries(summaries: List[Dict[str, Any]]) -> None:
+    truth = "mean_err_vs_truth_hz" in summaries[0]
+    header = (f"{'engine':<12}{'ms/audio s':>11}{'speedup':>9}{'mean err Hz':>13}{'mean err %':>12}"
+              f"{'std err Hz':>12}{'std err %':>11}{'voiced':>8}")
+    print(header + (f"{'vs truth Hz':>13}" if truth else ""))
+    for s in summaries:
+        line = (f"{s['engine']:<12}{s['ms_per_audio_sec']:>11.2f}{s['speedup']:>8.1f}x{s['mean_err_hz']:>13.2f}"
+                f"{s['mean_err_pct']:>11.2f}%{s['std_err_hz']:>12.2f}{s['std_err_pct']:>10.1f}%{s['voiced_fraction']:>8.2f}")
+        print(line + (f"{s['mean_err_vs_truth_hz']:>13.2f}" if truth else ""))
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Compare F0 engines against pyin.")
+    parser.add_argument("recordings", nargs="*", help="WAV files or directories (default: synthetic utterances)")
+    parser.add_argument("--engines", nargs="+", choices=list(ENGINES), default=list(ENGINES))
+    parser.add_argument("--seconds", type=float, default=4, help="Length of synthetic utterances")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed calls per engine and recording")
+    parser.add_argument("--json", help="Write per-recording results and summaries to this file")
+    args = parser.parse_args(argv)
+
+    engines = [REFERENCE_ENGINE] + [e for e in args.engines if e != REFERENCE_ENGINE]
+    recordings = load_recordings(args.recordings, args.seconds)
+    if not recordings:
+        parser.error("no recordings found")
+
+    results: Dict[str, List[Dict[str, Any]]] = {engine: [] for engine in engines}
+    for recording in recordings:
+        for engine in engines:
+            results[engine].append(run_engine(engine, recording, args.repeat))
+        print(f"  {recording['name']}: " + ", ".join(
+            f"{engine} {results[engine][-1]['pitch_mean']:.1f} Hz" for engine in engines), file=sys.stderr)
+
+    summaries = [summarize(engine, results[engine], results[REFERENCE_ENGINE], recordings) for engine in engines]
+    print_summaries(summaries)
+
+    if args.json:
+        per_recording = [
+            {"recording": recording["name"], **{engine: results[engine][i] for engine in engines}}
+            for i, recording in enumerate(recordings)
+        ]
+        with open(args.json, "w") as f:
+            json.dump({"summaries": summaries, "recordings": per_recording}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Open-loop load against a running backend.
+
+HTTP requests are issued on a fixed schedule (--rate per second) regardless
+of how fast the server answers, and latency is measured from each request's
+scheduled send time, so queueing under overload shows up in the numbers
+instead of silently lowering the request rate.
+
+Websocket load opens N concurrent /ws/simulate sessions and measures the
+update rate and gaps each client actually receives.
+"""
+import asyncio
+import json
+import struct
+import threading
+import time
+import numpy as np
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+Payload = Dict[str, Any]
+
+
+def latency_summary(latencies_ms: List[float]) -> Dict[str, float]:
+    if not latencies_ms:
+        return {}
+    values = np.array(latencies_ms)
+    return {
+        "p50_ms": float(np.percentile(values, 50)),
+        "p90_ms": float(np.percentile(values, 90)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "max_ms": float(values.max()),
+    }
+
+
+def drive_http(
+    url: str,
+    payloads: List[Payload],
+    rate: float,
+    duration: float,
+    concurrency: int = 32,
+    timeout: float = 30
+) -> Dict[str, Any]:
+    """
+    POSTs to url at `rate` requests/s for `duration` seconds.
+
+    Each payload is a dict of requests.post keyword arguments (data, headers,
+    files, ...); payloads are sent round-robin.
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    lock = threading.Lock()
+
+    def send(payload: Payload, scheduled: float) -> None:
+        try:
+            response = session.post(url, timeout=timeout, **payload)
+            error = None if response.ok else f"HTTP {response.status_code}"
+        except requests.RequestException as e:
+            error = type(e).__name__
+        elapsed_ms = (time.perf_counter() - scheduled) * 1000
+        with lock:
+            if error:
+                errors[error] = errors.get(error, 0) + 1
+            else:
+                latencies.append(elapsed_ms)
+
+    n_requests = int(rate * duration)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for i in range(n_requests):
+            scheduled = start + i / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(send, payloads[i % len(payloads)], scheduled)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "sent": n_requests,
+        "ok": len(latencies),
+        "errors": errors,
+        "target_rate": rate,
+        "achieved_rate": len(latencies) / elapsed,
+        **latency_summary(latencies),
+    }
+
+
+def _frame_metadata(message) -> Dict[str, Any]:
+    """Tick metadata of a JSON or binary (ws_framing) /ws/simulate frame."""
+    if isinstance(message, bytes):
+        (header_length,) = struct.unpack_from("<I", message)
+        return json.loads(message[4:4 + header_length])
+    return json.loads(message)
+
+
+async def _ws_session(url: str, duration: float) -> Tuple[List[float], Dict[str, Any]]:
+    import websockets
+
+    gaps: List[float] = []
+    metadata: Dict[str, Any] = {}
+    async with websockets.connect(url, max_size=None) as websocket:
+        deadline = time.perf_counter() + duration
+        last = None
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                message = await asyncio.wait_for(websocket.recv(), remaining)
+            except asyncio.TimeoutError:
+                break
+            now = time.perf_counter()
+            if last is not None:
+                gaps.append((now - last) * 1000)
+            last = now
+            metadata = _frame_metadata(message)
+    return gaps, metadata
+
+
+def drive_websocket(url: str, sessions: int, duration: float) -> Dict[str, Any]:
+    """
+    Holds `sessions` concurrent websocket clients open for `duration` seconds.
+
+    Requires the websockets package (pip install websockets).
+    """
+    async def run():
+        return await asyncio.gather(*(_ws_session(url, duration) for _ in range(sessions)), return_exceptions=True)
+
+    results = asyncio.run(run())
+
+    gaps: List[float] = []
+    dropped = 0
+    errors: Dict[str, int] = {}
+    for result in results:
+        if isinstance(result, BaseException):
+            errors[type(result).__name__] = errors.get(type(result).__name__, 0) + 1
+            continue
+        session_gaps, metadata = result
+        gaps.extend(session_gaps)
+        dropped += metadata.get("dropped_frames", 0)
+
+    connected = sessions - sum(errors.values())
+    return {
+        "sessions": sessions,
+        "connected": connected,
+        "errors": errors,
+        "messages": len(gaps) + connected,
+        "messages_per_session_per_sec": (len(gaps) + connected) / max(connected, 1) / duration,
+        "dropped_frames": dropped,
+        **{key.replace("_ms", "_gap_ms"): value for key, value in latency_summary(gaps).items()},
+    }
+
+
+def print_summary(summary: Dict[str, Any]) -> None:
+    for key, value in summary.items():
+        print(f"  {key:<30}{value:.2f}" if isinstance(value, float) else f"  {key:<30}{value}")
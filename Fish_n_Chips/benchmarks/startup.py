@@ -0,0 +1,181 @@
+"""
+Cold-start benchmark: import cost of the backend and time to first request.
+
+Two measurements, each in a fresh interpreter:
+    import profile   python -X importtime -c "import backend.app.main";
+                     total time, the slowest top-level packages (cumulative
+                     time of their outermost import), and which of the
+                     libraries that are meant to load on first use or in
+                     the startup warm-up (see backend/app/readiness.py) were
+                     imported anyway
+    server start     uvicorn is launched and /health polled: seconds until
+                     the first 200 (time-to-first-request) and until every
+                     component reports ready, with the per-component states
+
+--check exits with status 1 if a deferred library is imported by main, so
+a regression in the import graph can fail CI.
+
+Run from the project root:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --no-server --check
+    python -m benchmarks.startup --json startup.json
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from typing import Any, Dict, List, Optional
+
+APP_MODULE = "backend.app.main"
+
+# Loaded on first use or by the warm-up, never by importing the app
+DEFERRED_MODULES = (
+    "scipy.signal", "scipy.fft", "scipy.special", "pandas", "sklearn", "joblib", "mne",
+    "spacy", "openai", "faster_whisper", "webrtcvad", "numba",
+)
+
+HEALTH_POLL_SEC = 0.01
+
+
+def import_profile(module: str = APP_MODULE, top: int = 15) -> Dict[str, Any]:
+    """
+    -X importtime of one import of module in a fresh interpreter.
+
+    Returns:
+        total_ms, the top packages by cumulative ms, and the deferred
+        modules that were imported
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    cumulative: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = (field.strip() for field in line[len("import time:"):].split("|"))
+        cumulative[name] = int(cumulative_us)
+
+    packages: Dict[str, int] = {}
+    for name, us in cumulative.items():
+        package = name.split(".")[0]
+        packages[package] = max(packages.get(package, 0), us)
+    packages.pop(module.split(".")[0], None)
+
+    return {
+        "total_ms": cumulative.get(module, 0) / 1000,
+        "top_packages": [
+            {"package": package, "cumulative_ms": us / 1000}
+            for package, us in sorted(packages.items(), key=lambda item: -item[1])[:top]
+        ],
+        "deferred_imported": [m for m in DEFERRED_MODULES if m in cumulative],
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def get_health(url: str) -> Optional[Dict[str, Any]]:
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return json.loads(response.read())
+    except (urllib.error.URLError, ConnectionError, OSError):
+        return None
+
+
+def server_start(timeout: float = 120, warm_up: bool = True) -> Dict[str, Any]:
+    """
+    Seconds from launching uvicorn to the first /health 200 and to ready.
+    """
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/health"
+    env = {**os.environ, "STARTUP_WARM_UP": "1" if warm_up else "0"}
+
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", f"{APP_MODULE}:app", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        first_response = None
+        health = None
+        while time.perf_counter() - start < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"server exited with status {proc.returncode}")
+            health = get_health(url)
+            if health is not None:
+                if first_response is None:
+                    first_response = time.perf_counter() - start
+                if health.get("ready"):
+                    break
+                failed = {name: c.get("detail") for name, c in health.get("components", {}).items() if c["state"] == "failed"}
+                if failed:
+                    raise RuntimeError(f"components failed to load: {failed}")
+            time.sleep(HEALTH_POLL_SEC)
+        else:
+            raise RuntimeError(f"server not ready after {timeout} s")
+
+        return {
+            "first_response_sec": first_response,
+            "ready_sec": time.perf_counter() - start,
+            "components": health.get("components", {}),
+        }
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def print_profile(profile: Dict[str, Any]) -> None:
+    print(f"import {APP_MODULE}: {profile['total_ms']:.0f} ms")
+    for entry in profile["top_packages"]:
+        print(f"  {entry['package']:<24}{entry['cumulative_ms']:>9.1f} ms")
+    deferred = profile["deferred_imported"]
+    print(f"deferred modules imported: {', '.join(deferred) if deferred else 'none'}")
+
+
+def print_server(result: Dict[str, Any]) -> None:
+    print(f"first /health response: {result['first_response_sec']:.2f} s, ready: {result['ready_sec']:.2f} s")
+    for name, component in result["components"].items():
+        detail = f"  ({component['detail']})" if "detail" in component else ""
+        seconds = f"{component['load_seconds']:>7.2f} s" if "load_seconds" in component else " " * 9
+        print(f"  {name:<16}{component['state']:<12}{seconds}{detail}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Measure backend import time and time to first request.")
+    parser.add_argument("--top", type=int, default=15, help="Packages to list in the import profile")
+    parser.add_argument("--no-server", action="store_true", help="Only profile the import")
+    parser.add_argument("--no-warm-up", action="store_true", help="Start the server with STARTUP_WARM_UP=0")
+    parser.add_argument("--timeout", type=float, default=120, help="Seconds to wait for the server to be ready")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 if a deferred module is imported")
+    parser.add_argument("--json", help="Write the results to this file")
+    args = parser.parse_args(argv)
+
+    results: Dict[str, Any] = {"import": import_profile(top=args.top)}
+    print_profile(results["import"])
+
+    if not args.no_server:
+        results["server"] = server_start(args.timeout, warm_up=not args.no_warm_up)
+        print_server(results["server"])
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.check and results["import"]["deferred_imported"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
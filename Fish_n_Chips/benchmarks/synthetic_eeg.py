@@ -0,0 +1,377 @@
+"""
+Vectorized synthetic EEG recordings for benchmarks and load tests.
+
+Two signal models, both generated as whole arrays chunk by chunk (never
+sample by sample), so hour-long 64-channel recordings take seconds and can be
+streamed to disk without holding them in memory:
+    - "sinusoid": delta/theta/alpha/beta sinusoids with per-channel phase
+      offsets plus Gaussian noise, the model of the original
+      generate_test_eeg.py (fixed spectrum, used by the benchmarks)
+    - spectral profiles ("healthy", "decline"): band-limited noise per
+      frequency band of the feature pipeline, partly shared across channels
+
+Optional artifacts (eye blinks, muscle bursts, line noise) are added on top.
+All values are microvolts.
+"""
+import io
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from functools import lru_cache
+from scipy.signal import butter, sosfilt
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from backend.app.data_processing import REQUIRED_CHANNELS
+from backend.app.feature_extraction import BANDS
+
+# 10-10 montage names after the 16 model channels (old T3/T4/T5/T6 naming, as in the models)
+EXTRA_CHANNELS = [
+    'T6', 'O1', 'O2', 'Fpz', 'Oz', 'AF3', 'AF4', 'AF7', 'AF8', 'AFz',
+    'F1', 'F2', 'F5', 'F6', 'FC1', 'FC2', 'FC3', 'FC4', 'FC5', 'FC6',
+    'FCz', 'FT7', 'FT8', 'C1', 'C2', 'C5', 'C6', 'CP1', 'CP2', 'CP3',
+    'CP4', 'CP5', 'CP6', 'CPz', 'TP7', 'TP8', 'P1', 'P2', 'P5', 'P6',
+    'P7', 'P8', 'PO3', 'PO4', 'PO7', 'PO8', 'POz', 'Iz'
+]
+
+# Channel label conventions seen in uploaded files
+MODERN_NAMES = {'T3': 'T7', 'T4': 'T8', 'T5': 'P7', 'T6': 'P8'}
+NAMINGS = {
+    "standard": lambda name: name,
+    "upper": lambda name: name.upper(),
+    "edf": lambda name: f"EEG {name}-REF",
+    # T7/T8/P7/P8 instead of T3/T4/T5/T6: no longer matches REQUIRED_CHANNELS
+    "modern": lambda name: MODERN_NAMES.get(name, name),
+}
+
+SINUSOID_PROFILE = "sinusoid"
+
+# (amplitude uV, frequency Hz, phase offset per channel index)
+COMPONENTS = [
+    (20, 2, 0.5),   # delta
+    (15, 6, 0.3),   # theta
+    (25, 10, 0.2),  # alpha (dominant)
+    (10, 20, 0.1),  # beta
+]
+NOISE_STD = 5
+
+
+@dataclass
+class SpectralProfile:
+    # RMS amplitude (uV) of band-limited noise per band of BANDS
+    band_rms: Dict[str, float]
+    # White (broadband) noise standard deviation (uV)
+    noise_std: float = 2.0
+    # Share of each band's power common to all channels
+    common_fraction: float = 0.3
+
+
+PROFILES = {
+    # Dominant alpha, little slow activity
+    "healthy": SpectralProfile({"delta": 12, "theta": 7, "alpha": 18, "beta": 7, "gamma": 2}),
+    # EEG slowing: delta/theta up, alpha/beta down
+    "decline": SpectralProfile({"delta": 24, "theta": 16, "alpha": 7, "beta": 4, "gamma": 1.5}),
+}
+
+ARTIFACTS = ("blink", "muscle", "line")
+
+# Events per second, amplitude range (uV) and duration range (s)
+BLINK_RATE, BLINK_AMPLITUDE, BLINK_SIGMA_SEC = 0.2, (80, 200), 0.08
+MUSCLE_RATE, MUSCLE_AMPLITUDE, MUSCLE_DURATION = 0.1, (10, 30), (0.3, 1.0)
+LINE_AMPLITUDE = 3
+
+# Samples generated per step (bounds temporary memory for long recordings)
+CHUNK_SAMPLES = 256 * 60
+
+# EDF physical range (uV) mapped onto the full int16 range: 0.1 uV resolution
+EDF_PHYSICAL_MIN = -3276.8
+EDF_PHYSICAL_MAX = 3276.7
+
+
+def channel_names(n_channels: int, naming: str = "standard") -> List[str]:
+    """The 16 model channels first, then other montage positions, then EEG<n>."""
+    names = REQUIRED_CHANNELS + EXTRA_CHANNELS
+    names += [f"EEG{i}" for i in range(len(names), n_channels)]
+    return [NAMINGS[naming](name) for name in names[:n_channels]]
+
+
+def _region_weights(names: Sequence[str], prefixes: Tuple[str, ...], near: Tuple[str, ...]) -> np.ndarray:
+    """1 for channels in a region, 0.5 next to it, 0.1 elsewhere (by 10-20 label)."""
+    weights = []
+    for name in names:
+        label = name.replace("EEG ", "").replace("-REF", "").lower()
+        if label.startswith(prefixes):
+            weights.append(1.0)
+        elif label.startswith(near):
+            weights.append(0.5)
+        else:
+            weights.append(0.1)
+    return np.array(weights)
+
+
+@lru_cache(maxsize=None)
+def _band_sos(low: float, high: float, fs: float) -> np.ndarray:
+    return butter(4, [low, min(high, 0.45 * fs)], btype="bandpass", fs=fs, output="sos")
+
+
+class EEGSynthesizer:
+    """
+    Stateful generator of one continuous recording, one chunk at a time.
+
+    Filter states, the random stream and artifacts spanning chunk
+    boundaries carry over, so the chunks concatenate seamlessly.
+    """
+
+    def __init__(
+        self,
+        names: Sequence[str],
+        fs: float = 256,
+        profile: str = SINUSOID_PROFILE,
+        artifacts: Sequence[str] = (),
+        line_freq: float = 50,
+        seed: int = 42
+    ):
+        self.names = list(names)
+        self.n_channels = len(names)
+        self.fs = fs
+        self.profile = profile
+        self.artifacts = set(artifacts)
+        self.line_freq = line_freq
+        self.rng = np.random.default_rng(seed)
+        self.pos = 0
+
+        self._channels = np.arange(self.n_channels)
+        # Artifacts still active at the end of the previous chunk: (kind, start, length, amplitude)
+        self._events: List[Tuple[str, int, int, float]] = []
+        self._blink_weights = _region_weights(self.names, ("fp", "af"), ("f",))
+        self._muscle_weights = _region_weights(self.names, ("t", "ft", "tp"), ("f7", "f8", "c5", "c6"))
+
+        if profile != SINUSOID_PROFILE:
+            spectral = PROFILES[profile]
+            self._bands = []
+            for band, rms in spectral.band_rms.items():
+                low, high = BANDS[band]
+                sos = _band_sos(low, high, fs)
+                # Unit white noise keeps ~2 * bandwidth / fs of its power after the bandpass
+                gain = rms / np.sqrt(2 * (min(high, 0.45 * fs) - low) / fs)
+                self._bands.append([sos, np.float32(gain), np.zeros((sos.shape[0], self.n_channels, 2), dtype=np.float32)])
+            # Let the filters settle before the first sample is emitted
+            self._band_noise(int(2 * fs))
+
+    def _band_noise(self, n: int) -> np.ndarray:
+        spectral = PROFILES[self.profile]
+        common = np.float32(np.sqrt(spectral.common_fraction))
+        own = np.float32(np.sqrt(1 - spectral.common_fraction))
+
+        # [channels, n] float32 so sosfilt runs along contiguous rows without copies
+        out = self.rng.standard_normal((self.n_channels, n), dtype=np.float32)
+        out *= spectral.noise_std
+
+        # One white source for all bands: the bands don't overlap in frequency,
+        # so their filtered outputs are (nearly) independent anyway
+        white = self.rng.standard_normal((self.n_channels, n), dtype=np.float32)
+        white *= own
+        white += common * self.rng.standard_normal(n, dtype=np.float32)
+
+        for band in self._bands:
+            sos, gain, zi = band
+            filtered, band[2] = sosfilt(sos, white, axis=-1, zi=zi)
+            out += gain * filtered
+        return out.T
+
+    def _sinusoids(self, t: np.ndarray) -> np.ndarray:
+        out = self.rng.normal(0, NOISE_STD, size=(len(t), self.n_channels))
+        for amplitude, freq, phase in COMPONENTS:
+            # sin(wt + p) = sin(wt) cos(p) + cos(wt) sin(p): trig per sample, not per value
+            wt = 2 * np.pi * freq * t
+            out += np.sin(wt) * (amplitude * np.cos(phase * self._channels))
+            out += np.cos(wt) * (amplitude * np.sin(phase * self._channels))
+        return out
+
+    def _draw_events(self, n: int) -> None:
+        chunk_sec = n / self.fs
+        if "blink" in self.artifacts:
+            for start in self.rng.uniform(0, n, self.rng.poisson(BLINK_RATE * chunk_sec)):
+                # Gaussian bump, support +-4 sigma around its center
+                length = int(8 * BLINK_SIGMA_SEC * self.fs)
+                self._events.append(("blink", self.pos + int(start) - length // 2, length, self.rng.uniform(*BLINK_AMPLITUDE)))
+        if "muscle" in self.artifacts:
+            for start in self.rng.uniform(0, n, self.rng.poisson(MUSCLE_RATE * chunk_sec)):
+                length = int(self.rng.uniform(*MUSCLE_DURATION) * self.fs)
+                self._events.append(("muscle", self.pos + int(start), length, self.rng.uniform(*MUSCLE_AMPLITUDE)))
+
+    def _add_events(self, chunk: np.ndarray) -> None:
+        n = len(chunk)
+        remaining = []
+        for kind, start, length, amplitude in self._events:
+            lo, hi = max(start, self.pos), min(start + length, self.pos + n)
+            if lo < hi:
+                offsets = np.arange(lo, hi) - start
+                if kind == "blink":
+                    sigma = BLINK_SIGMA_SEC * self.fs
+                    shape = amplitude * np.exp(-0.5 * ((offsets - length / 2) / sigma) ** 2)
+                    chunk[lo - self.pos:hi - self.pos] += shape[:, np.newaxis] * self._blink_weights
+                else:
+                    burst = self.rng.normal(0, amplitude, size=(hi - lo, self.n_channels))
+                    chunk[lo - self.pos:hi - self.pos] += burst * self._muscle_weights
+            if start + length > self.pos + n:
+                remaining.append((kind, start, length, amplitude))
+        self._events = remaining
+
+    def generate(self, n: int) -> np.ndarray:
+        """The next n samples, float32 [n, channels]."""
+        t = (np.arange(self.pos, self.pos + n) / self.fs)[:, np.newaxis]
+
+        chunk = self._sinusoids(t) if self.profile == SINUSOID_PROFILE else self._band_noise(n)
+
+        if "line" in self.artifacts:
+            chunk += LINE_AMPLITUDE * np.sin(2 * np.pi * self.line_freq * t)
+        if self.artifacts & {"blink", "muscle"}:
+            self._draw_events(n)
+            self._add_events(chunk)
+
+        self.pos += n
+        return chunk.astype(np.float32)
+
+
+def iter_eeg_chunks(
+    n_samples: int,
+    n_channels: int = 16,
+    fs: float = 256,
+    seed: int = 42,
+    chunk_samples: int = CHUNK_SAMPLES,
+    profile: str = SINUSOID_PROFILE,
+    artifacts: Sequence[str] = (),
+    names: Optional[Sequence[str]] = None,
+    line_freq: float = 50
+) -> Iterator[np.ndarray]:
+    """
+    Yields consecutive float32 [chunk, channels] blocks of one recording.
+    """
+    synth = EEGSynthesizer(names or channel_names(n_channels), fs, profile, artifacts, line_freq, seed)
+    for start in range(0, n_samples, chunk_samples):
+        yield synth.generate(min(chunk_samples, n_samples - start))
+
+
+def generate_eeg(seconds: float, n_channels: int = 16, fs: float = 256, seed: int = 42, **options) -> np.ndarray:
+    """
+    A whole synthetic recording, float32 [samples, channels] in microvolts.
+
+    options are passed on to iter_eeg_chunks (profile, artifacts, ...).
+    """
+    n_samples = int(round(seconds * fs))
+    data = np.empty((n_samples, n_channels), dtype=np.float32)
+
+    pos = 0
+    for chunk in iter_eeg_chunks(n_samples, n_channels, fs, seed, **options):
+        data[pos:pos + len(chunk)] = chunk
+        pos += len(chunk)
+    return data
+
+
+def _csv_rows(chunk: np.ndarray) -> str:
+    return pd.DataFrame(chunk).to_csv(header=False, index=False, float_format="%.2f")
+
+
+def to_csv_text(data: np.ndarray, names: List[str]) -> str:
+    """CSV with a channel-name header row, two decimals (like generate_test_eeg.py)."""
+    return ",".join(names) + "\n" + _csv_rows(data)
+
+
+def to_npy_bytes(data: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    np.save(buffer, data)
+    return buffer.getvalue()
+
+
+def _edf_field(value, width: int) -> bytes:
+    return str(value).ljust(width)[:width].encode("latin-1")
+
+
+def edf_header(names: List[str], samples_per_record: int, n_records: int, record_duration: int = 1) -> bytes:
+    n_channels = len(names)
+    header = (
+        _edf_field(0, 8) + _edf_field("X X X X", 80) + _edf_field("Startdate X X X X", 80)
+        + _edf_field("01.01.24", 8) + _edf_field("00.00.00", 8) + _edf_field(256 * (n_channels + 1), 8)
+        + _edf_field("", 44) + _edf_field(n_records, 8) + _edf_field(record_duration, 8)
+        + _edf_field(n_channels, 4)
+    )
+    for width, value in ((16, None), (80, ""), (8, "uV"), (8, EDF_PHYSICAL_MIN), (8, EDF_PHYSICAL_MAX),
+                         (8, -32768), (8, 32767), (80, ""), (8, samples_per_record), (32, "")):
+        values = names if value is None else [value] * n_channels
+        header += b"".join(_edf_field(v, width) for v in values)
+    return header
+
+
+def edf_records(data: np.ndarray, samples_per_record: int) -> bytes:
+    """
+    Data records of [samples, channels] uV data; len(data) must be a whole
+    number of records.
+    """
+    # Digital value = physical / 0.1 uV, laid out record by record, channel by channel
+    scale = (EDF_PHYSICAL_MAX - EDF_PHYSICAL_MIN) / 65535
+    digital = np.clip(np.round((data - EDF_PHYSICAL_MIN) / scale - 32768), -32768, 32767).astype("<i2")
+    records = digital.reshape(-1, samples_per_record, data.shape[1]).transpose(0, 2, 1)
+    return np.ascontiguousarray(records).tobytes()
+
+
+def _pad_to_records(data: np.ndarray, samples_per_record: int) -> np.ndarray:
+    missing = -len(data) % samples_per_record
+    if missing == 0:
+        return data
+    return np.concatenate([data, np.zeros((missing, data.shape[1]), dtype=data.dtype)])
+
+
+def to_edf_bytes(data: np.ndarray, names: List[str], fs: int, record_duration: int = 1) -> bytes:
+    """
+    EDF file of [samples, channels] microvolt data, all channels at fs.
+
+    The last data record is zero-padded when the samples don't fill it.
+    """
+    samples_per_record = int(fs * record_duration)
+    n_records = -(-len(data) // samples_per_record)
+    return (
+        edf_header(names, samples_per_record, n_records, record_duration)
+        + edf_records(_pad_to_records(data, samples_per_record), samples_per_record)
+    )
+
+
+def write_recording(path: str, chunks: Iterable[np.ndarray], n_samples: int, names: List[str], fs: int) -> None:
+    """
+    Streams a recording to .csv, .edf or .npy (by extension), chunk by chunk.
+
+    n_samples is the total length of the chunks (EDF and npy headers need it
+    up front). Only one chunk is held in memory at a time.
+    """
+    lower = path.lower()
+
+    if lower.endswith(".csv"):
+        with open(path, "w", newline="") as f:
+            f.write(",".join(names) + "\n")
+            for chunk in chunks:
+                f.write(_csv_rows(chunk))
+
+    elif lower.endswith(".edf"):
+        samples_per_record = int(fs)
+        with open(path, "wb") as f:
+            f.write(edf_header(names, samples_per_record, -(-n_samples // samples_per_record)))
+            # Samples that don't fill a record yet wait for the next chunk
+            pending = np.empty((0, len(names)), dtype=np.float32)
+            for chunk in chunks:
+                pending = np.concatenate([pending, chunk])
+                whole = len(pending) - len(pending) % samples_per_record
+                f.write(edf_records(pending[:whole], samples_per_record))
+                pending = pending[whole:]
+            if len(pending):
+                f.write(edf_records(_pad_to_records(pending, samples_per_record), samples_per_record))
+
+    elif lower.endswith(".npy"):
+        out = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=(n_samples, len(names)))
+        pos = 0
+        for chunk in chunks:
+            out[pos:pos + len(chunk)] = chunk
+            pos += len(chunk)
+        out.flush()
+        del out
+
+    else:
+        raise ValueError(f"Unsupported recording format: {path}")
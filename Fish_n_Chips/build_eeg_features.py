@@ -0,0 +1,231 @@
+"""
+Build the EEG training set (window features + labels) from the raw CSV.
+
+Replaces the per-window pandas loop of notebooks/02: the CSV is read in
+float32 chunks, windowed with strided views (no per-window DataFrame
+slices) and feature extraction is spread over a process pool. Windows are
+the same as segment_data(): every step over the whole recording, each
+labelled with its majority 'status' (smallest label on ties, like
+Series.mode()[0]).
+
+Results are cached by source file, window parameters and feature pipeline
+version, so re-running with the same settings is instant.
+
+Usage (from the project root):
+    python build_eeg_features.py
+    python build_eeg_features.py --data EEG_data_set.csv --window-sec 4 --step-sec 2 --format parquet
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+import joblib
+import numpy as np
+import pandas as pd
+from concurrent.futures import Future, ProcessPoolExecutor
+from numpy.lib.stride_tricks import sliding_window_view
+from tqdm import tqdm
+from typing import Iterator, List, Optional, Tuple
+
+from backend.app.feature_cache import FEATURE_VERSION
+from backend.app.feature_extraction import CHANNEL_FEATURE_NAMES, connectivity_feature_names, extract_features_batch
+
+DATA_PATH = "EEG_data_set.csv"
+CACHE_DIR = os.path.join("cache", "training")
+MODELS_DIR = "models"
+
+# CSV rows per read (x 16 channels x 4 bytes = 32 MB at float32)
+CHUNK_ROWS = 500_000
+# Windows per feature-extraction task
+TASK_WINDOWS = 256
+
+
+def label_column(columns: List[str]) -> str:
+    for column in columns:
+        if column.lower() == "status":
+            return column
+    raise ValueError("No 'status' column in the dataset")
+
+
+def window_features(block: np.ndarray, window: int, step: int, fs: int, connectivity: bool) -> np.ndarray:
+    """
+    Features of every window of a contiguous [rows, channels] block (runs in a worker).
+    """
+    windows = sliding_window_view(block, window, axis=0)[::step].transpose(0, 2, 1)
+    return extract_features_batch(windows, fs, connectivity=connectivity).astype(np.float32)
+
+
+def window_labels(labels: np.ndarray, n_windows: int, window: int, step: int) -> np.ndarray:
+    """
+    Majority label of every window, computed from per-class cumulative counts.
+    """
+    classes, codes = np.unique(labels, return_inverse=True)
+    starts = np.arange(n_windows) * step
+
+    counts = np.empty((n_windows, len(classes)), dtype=np.int64)
+    for c in range(len(classes)):
+        cumulative = np.concatenate([[0], np.cumsum(codes == c)])
+        counts[:, c] = cumulative[starts + window] - cumulative[starts]
+
+    # argmax picks the first (smallest) class on ties, like Series.mode()[0]
+    return classes[np.argmax(counts, axis=1)]
+
+
+def run_inline(fn, *args) -> Future:
+    future = Future()
+    future.set_result(fn(*args))
+    return future
+
+
+def iter_blocks(path: str, feature_cols: List[str], status_col: str, window: int, step: int,
+                chunk_rows: int = CHUNK_ROWS) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Yields (data [rows, channels] float32, labels [rows]) blocks whose windows
+    continue seamlessly: the rows after the last complete window of one block
+    are carried into the next.
+    """
+    dtypes = {col: np.float32 for col in feature_cols}
+    tail_data = np.empty((0, len(feature_cols)), dtype=np.float32)
+    tail_labels = None
+
+    for chunk in pd.read_csv(path, usecols=feature_cols + [status_col], dtype=dtypes, chunksize=chunk_rows):
+        data = np.concatenate([tail_data, chunk[feature_cols].to_numpy(dtype=np.float32)])
+        labels = chunk[status_col].to_numpy()
+        if tail_labels is not None:
+            labels = np.concatenate([tail_labels, labels])
+
+        n_windows = (len(data) - window) // step + 1 if len(data) >= window else 0
+        if n_windows > 0:
+            yield data, labels
+
+        # Next window starts right after the last one of this block
+        next_start = n_windows * step
+        tail_data, tail_labels = data[next_start:], labels[next_start:]
+
+
+def cache_path(args: argparse.Namespace) -> str:
+    stat = os.stat(args.data)
+    key = json.dumps([
+        os.path.abspath(args.data), stat.st_size, stat.st_mtime, FEATURE_VERSION,
+        args.window_sec, args.step_sec, args.fs, args.connectivity,
+    ])
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+    stem = os.path.splitext(os.path.basename(args.data))[0]
+    extension = ".parquet" if args.format == "parquet" else ".npz"
+    return os.path.join(args.cache_dir, f"{stem}-w{args.window_sec:g}-s{args.step_sec:g}-{digest}{extension}")
+
+
+def feature_names(feature_cols: List[str], connectivity: bool) -> List[str]:
+    names = [f"{channel}_{name}" for channel in feature_cols for name in CHANNEL_FEATURE_NAMES]
+    return names + connectivity_feature_names(feature_cols) if connectivity else names
+
+
+def build_training_features(args: argparse.Namespace) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    columns = pd.read_csv(args.data, nrows=0).columns.tolist()
+    status_col = label_column(columns)
+    feature_cols = [c for c in columns if c != status_col]
+
+    window = int(args.window_sec * args.fs)
+    step = int(args.step_sec * args.fs)
+
+    X_parts: List[Future] = []
+    y_parts: List[np.ndarray] = []
+
+    # spawn: workers import only what window_features needs. One worker runs
+    # in-process, which avoids the pool start-up on single-core machines.
+    pool = ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn")) \
+        if args.workers > 1 else None
+    submit = pool.submit if pool else run_inline
+    try:
+        for data, labels in tqdm(iter_blocks(args.data, feature_cols, status_col, window, step, args.chunk_rows),
+                                 desc="CSV chunks", unit="chunk"):
+            n_windows = (len(data) - window) // step + 1
+            y_parts.append(window_labels(labels, n_windows, window, step))
+
+            # Each task gets the contiguous rows of TASK_WINDOWS windows, not window copies
+            for first in range(0, n_windows, TASK_WINDOWS):
+                last = min(first + TASK_WINDOWS, n_windows) - 1
+                block = data[first * step:last * step + window]
+                X_parts.append(submit(window_features, block, window, step, args.fs, args.connectivity))
+
+            # Keep reading while workers run, but bound the queued blocks
+            while sum(not f.done() for f in X_parts) > 4 * args.workers:
+                time.sleep(0.05)
+
+        X = np.concatenate([f.result() for f in X_parts])
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+
+    y = np.concatenate(y_parts)
+    return X, y, feature_names(feature_cols, args.connectivity)
+
+
+def save(path: str, X: np.ndarray, y: np.ndarray, names: List[str]) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    if path.endswith(".parquet"):
+        df = pd.DataFrame(X, columns=names)
+        df["status"] = y
+        df.to_parquet(tmp_path, index=False)
+    else:
+        with open(tmp_path, "wb") as f:
+            np.savez(f, X=X, y=y, feature_names=np.array(names))
+    os.replace(tmp_path, path)
+
+
+def load(path: str) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    if path.endswith(".parquet"):
+        df = pd.read_parquet(path)
+        y = df.pop("status").to_numpy()
+        return df.to_numpy(dtype=np.float32), y, df.columns.tolist()
+    with np.load(path) as npz:
+        return npz["X"], npz["y"], npz["feature_names"].tolist()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Build EEG window features and labels for training.")
+    parser.add_argument("--data", default=DATA_PATH, help="Raw EEG CSV (channel columns + 'status')")
+    parser.add_argument("--window-sec", type=float, default=4)
+    parser.add_argument("--step-sec", type=float, default=2)
+    parser.add_argument("--fs", type=int, default=256)
+    parser.add_argument("--connectivity", action="store_true", help="Append cross-channel features")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="CSV rows read at a time")
+    parser.add_argument("--format", choices=["npz", "parquet"], default="npz", help="Cache format")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--models-dir", default=MODELS_DIR,
+                        help="Also write X_features.joblib / y_labels.joblib here (for notebook 03)")
+    parser.add_argument("--rebuild", action="store_true", help="Ignore the cache")
+    args = parser.parse_args(argv)
+
+    if args.format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            parser.error("--format parquet requires pyarrow (pip install pyarrow)")
+
+    path = cache_path(args)
+    start = time.perf_counter()
+    if os.path.exists(path) and not args.rebuild:
+        X, y, names = load(path)
+        print(f"Loaded cached features from {path}")
+    else:
+        X, y, names = build_training_features(args)
+        save(path, X, y, names)
+        print(f"Features cached to {path}")
+
+    print(f"X: {X.shape}, y: {y.shape} ({len(names)} features) in {time.perf_counter() - start:.1f} s")
+    print(f"Label distribution: {dict(zip(*np.unique(y, return_counts=True)))}")
+
+    if args.models_dir:
+        os.makedirs(args.models_dir, exist_ok=True)
+        joblib.dump(X, os.path.join(args.models_dir, "X_features.joblib"))
+        joblib.dump(y, os.path.join(args.models_dir, "y_labels.joblib"))
+        print(f"Features and labels saved to {args.models_dir}/")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,53 +1,118 @@
 """
-Generate a sample EEG CSV file for testing
-Creates 4 seconds of synthetic EEG data (16 channels, 256 Hz)
+Generate synthetic EEG files for testing, or drive load against the backend.
+
+With no arguments, writes sample_eeg_test.csv: 4 seconds, 16 channels,
+256 Hz (the upload format of /predict_file).
+
+Examples (from the project root):
+    python generate_test_eeg.py --seconds 3600 --channels 64 --profile decline -o long.edf
+    python generate_test_eeg.py --artifacts blink muscle line --naming edf -o noisy.edf
+    python generate_test_eeg.py --drive http://localhost:8000 --endpoint predict --rate 50 --duration 30
+    python generate_test_eeg.py --drive http://localhost:8000 --endpoint ws --sessions 20 --duration 30
 """
-import numpy as np
-import csv
-
-# Parameters
-sampling_rate = 256  # Hz
-duration = 4  # seconds
-n_channels = 16
-n_samples = sampling_rate * duration  # 1024 samples
-
-# Channel names (standard 10-20 system)
-channel_names = ['Fp1', 'Fp2', 'F3', 'F4', 'C3', 'C4', 'P3', 'P4',
-                 'O1', 'O2', 'F7', 'F8', 'T3', 'T4', 'T5', 'T6']
-
-# Generate synthetic EEG data
-# Real EEG is typically in the range of -100 to +100 microvolts
-# We'll generate realistic-looking signals with multiple frequency components
-np.random.seed(42)  # For reproducibility
-
-eeg_data = []
-time = np.linspace(0, duration, n_samples)
-
-for i in range(n_samples):
-    sample = []
-    for ch in range(n_channels):
-        # Mix of different frequency bands (delta, theta, alpha, beta)
-        delta = 20 * np.sin(2 * np.pi * 2 * time[i] + ch * 0.5)  # 2 Hz
-        theta = 15 * np.sin(2 * np.pi * 6 * time[i] + ch * 0.3)  # 6 Hz
-        alpha = 25 * np.sin(2 * np.pi * 10 * time[i] + ch * 0.2)  # 10 Hz (dominant)
-        beta = 10 * np.sin(2 * np.pi * 20 * time[i] + ch * 0.1)  # 20 Hz
-        noise = np.random.normal(0, 5)  # Background noise
-
-        # Combine all components
-        signal = delta + theta + alpha + beta + noise
-        sample.append(round(signal, 2))
-
-    eeg_data.append(sample)
-
-# Save to CSV
-output_file = 'sample_eeg_test.csv'
-with open(output_file, 'w', newline='') as f:
-    writer = csv.writer(f)
-    writer.writerow(channel_names)  # Header
-    writer.writerows(eeg_data)
-
-print(f"✅ Generated {output_file}")
-print(f"   - Channels: {n_channels}")
-print(f"   - Samples: {n_samples} ({duration} seconds at {sampling_rate} Hz)")
-print(f"   - File size: ~{len(eeg_data) * len(eeg_data[0]) * 6 / 1024:.1f} KB")
-print(f"\nYou can now upload this file to test the EEG analysis!")
+import argparse
+import os
+import time
+
+from benchmarks.load_driver import drive_http, drive_websocket, print_summary
+from benchmarks.synthetic_eeg import (
+    ARTIFACTS, NAMINGS, PROFILES, SINUSOID_PROFILE, CHUNK_SAMPLES,
+    channel_names, generate_eeg, iter_eeg_chunks, to_csv_text, to_edf_bytes, to_npy_bytes, write_recording
+)
+
+# Distinct recordings per load test (identical uploads would hit the feature cache)
+PAYLOAD_VARIANTS = 16
+
+
+def write_file(args: argparse.Namespace) -> None:
+    names = channel_names(args.channels, args.naming)
+    n_samples = int(round(args.seconds * args.fs))
+    chunks = iter_eeg_chunks(
+        n_samples, args.channels, args.fs, args.seed, CHUNK_SAMPLES,
+        profile=args.profile, artifacts=args.artifacts, names=names, line_freq=args.line_freq
+    )
+
+    start = time.perf_counter()
+    write_recording(args.output, chunks, n_samples, names, args.fs)
+    elapsed = time.perf_counter() - start
+
+    print(f"✅ Generated {args.output}")
+    print(f"   - Channels: {args.channels} ({args.naming} names)")
+    print(f"   - Samples: {n_samples} ({args.seconds:g} seconds at {args.fs} Hz)")
+    print(f"   - Profile: {args.profile}, artifacts: {', '.join(args.artifacts) or 'none'}")
+    print(f"   - File size: {os.path.getsize(args.output) / 1024 ** 2:.1f} MB in {elapsed:.1f} s")
+
+
+def build_payloads(args: argparse.Namespace):
+    """Request bodies for the chosen endpoint, generated up front."""
+    names = channel_names(args.channels, args.naming)
+    options = {"profile": args.profile, "artifacts": args.artifacts, "names": names, "line_freq": args.line_freq}
+    recordings = [generate_eeg(args.seconds, args.channels, args.fs, args.seed + i, **options) for i in range(PAYLOAD_VARIANTS)]
+
+    if args.endpoint == "predict":
+        # Binary .npy body: one window of the 16 model channels
+        return [
+            {"data": to_npy_bytes(recording[:, :16]), "headers": {"Content-Type": "application/x-npy"},
+             "params": {"sampling_rate": args.fs}}
+            for recording in recordings
+        ]
+
+    extension = os.path.splitext(args.output)[1].lower() if args.output else ".edf"
+    if extension == ".csv":
+        files = [("load.csv", to_csv_text(recording, names).encode("utf-8")) for recording in recordings]
+    else:
+        files = [("load.edf", to_edf_bytes(recording, names, args.fs)) for recording in recordings]
+    return [{"files": {"file": file}} for file in files]
+
+
+def drive(args: argparse.Namespace) -> None:
+    base = args.drive.rstrip("/")
+
+    if args.endpoint == "ws":
+        ws_base = "ws" + base[len("http"):] if base.startswith("http") else base
+        url = f"{ws_base}/ws/simulate?hop_sec={args.hop_sec}&format={args.ws_format}"
+        print(f"Driving {url} with {args.sessions} sessions for {args.duration:g} s")
+        print_summary(drive_websocket(url, args.sessions, args.duration))
+        return
+
+    path = "/predict" if args.endpoint == "predict" else "/predict_file"
+    payloads = build_payloads(args)
+    print(f"Driving {base}{path} at {args.rate:g} req/s for {args.duration:g} s")
+    print_summary(drive_http(base + path, payloads, args.rate, args.duration, args.concurrency))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic EEG files and backend load generation.")
+    parser.add_argument("-o", "--output", help="Output file (.csv, .edf or .npy); default sample_eeg_test.csv")
+    parser.add_argument("--seconds", type=float, default=4)
+    parser.add_argument("--channels", type=int, default=16)
+    parser.add_argument("--fs", type=int, default=256, help="Sampling rate (Hz)")
+    parser.add_argument("--profile", choices=[SINUSOID_PROFILE] + list(PROFILES), default=SINUSOID_PROFILE)
+    parser.add_argument("--artifacts", nargs="*", choices=ARTIFACTS, default=[])
+    parser.add_argument("--line-freq", type=float, default=50, help="Line noise frequency (Hz)")
+    parser.add_argument("--naming", choices=list(NAMINGS), default="standard", help="Channel label style")
+    parser.add_argument("--seed", type=int, default=42)
+
+    load = parser.add_argument_group("load generation")
+    load.add_argument("--drive", metavar="URL", help="Backend base URL, e.g. http://localhost:8000")
+    load.add_argument("--endpoint", choices=["predict", "predict_file", "ws"], default="predict")
+    load.add_argument("--rate", type=float, default=10, help="HTTP requests per second")
+    load.add_argument("--duration", type=float, default=30, help="Seconds of load")
+    load.add_argument("--concurrency", type=int, default=32, help="Max HTTP requests in flight")
+    load.add_argument("--sessions", type=int, default=10, help="Concurrent websocket sessions")
+    load.add_argument("--hop-sec", type=float, default=0.25, help="/ws/simulate update interval")
+    load.add_argument("--ws-format", choices=["json", "binary"], default="json")
+    args = parser.parse_args()
+
+    if args.channels < 16:
+        print(f"⚠️ {args.channels} channels: the backend requires the 16 model channels")
+
+    if args.drive:
+        drive(args)
+    else:
+        args.output = args.output or "sample_eeg_test.csv"
+        write_file(args)
+
+
+if __name__ == "__main__":
+    main()